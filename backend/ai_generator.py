@@ -1,5 +1,7 @@
+import asyncio
 import anthropic
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Sequence, Tuple
+from metrics import CLAUDE_ANSWER, CLAUDE_SUMMARY, CLAUDE_TOOL_FOLLOWUP
 
 class AIGenerator:
     """Handles interactions with Anthropic's Claude API for generating responses"""
@@ -29,66 +31,190 @@ All responses must be:
 Provide only the direct answer to what was asked.
 """
     
-    def __init__(self, api_key: str, model: str):
-        self.client = anthropic.Anthropic(api_key=api_key)
+    # Used off the request path to fold trimmed conversation turns into a rolling summary
+    SUMMARY_PROMPT = """Summarize the conversation below between a user and a course materials assistant so that it can replace the conversation as context for later questions.
+Keep the courses, lessons and topics discussed, the facts given, and any open questions. Extend the existing summary if there is one.
+Reply with the summary only, in a few short sentences."""
+    
+    def __init__(self, api_key: str, model: str, max_concurrent_requests: int = 8):
+        self.client = anthropic.AsyncAnthropic(api_key=api_key)
         self.model = model
         
+        # Bound the number of in-flight Claude calls shared by all requests
+        self.request_slots = asyncio.Semaphore(max_concurrent_requests)
+        
         # Pre-build base API parameters
         self.base_params = {
             "model": self.model,
             "temperature": 0,
             "max_tokens": 800
         }
+        
+        # Requests render tools, then system, then messages, so a cache breakpoint
+        # on the system block makes tools + system prompt a reusable cached prefix
+        self.system_blocks = [{
+            "type": "text",
+            "text": self.SYSTEM_PROMPT,
+            "cache_control": {"type": "ephemeral"}
+        }]
+        
+        # Request templates, rebuilt only when a different tool definition sequence is passed in
+        self._plain_template = {**self.base_params, "system": self.system_blocks}
+        self._template_tools = None
+        self._tool_template: Dict[str, Any] = {}
+        self._followup_template: Dict[str, Any] = {}
+        
+        # Token usage reported by the API, summed over all calls
+        self.usage_totals = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0
+        }
+    
+    async def _create_message(self, latency, **api_params):
+        """Call the Messages API while holding one of the concurrency slots, timing it into latency"""
+        async with self.request_slots:
+            with latency.time():
+                response = await self.client.messages.create(**api_params)
+        self._record_usage(response)
+        return response
     
-    def generate_response(self, query: str,
-                         conversation_history: Optional[str] = None,
-                         tools: Optional[List] = None,
-                         tool_manager=None) -> str:
+    def _record_usage(self, response):
+        """Add a response's token counts, including prompt cache reads and writes"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        for key in self.usage_totals:
+            self.usage_totals[key] += getattr(usage, key, None) or 0
+    
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """Summed token usage and the share of input tokens served from the prompt cache"""
+        stats = dict(self.usage_totals)
+        total_input = (stats["input_tokens"] + stats["cache_creation_input_tokens"]
+                       + stats["cache_read_input_tokens"])
+        stats["cache_read_ratio"] = stats["cache_read_input_tokens"] / total_input if total_input else 0.0
+        return stats
+    
+    def _templates_for(self, tools: Sequence) -> Dict[str, Any]:
+        """Return the first-call template for a tool sequence, rebuilding both tool templates on change"""
+        if tools is not self._template_tools:
+            self._tool_template = {
+                **self._plain_template,
+                "tools": tools,
+                "tool_choice": {"type": "auto"}
+            }
+            # Keep the tools so the cached prefix still matches, but forbid further calls
+            self._followup_template = {
+                **self._plain_template,
+                "tools": tools,
+                "tool_choice": {"type": "none"}
+            }
+            self._template_tools = tools
+        return self._tool_template
+    
+    def _build_params(self, query: str,
+                      conversation_history: Optional[List[Dict[str, Any]]] = None,
+                      tools: Optional[Sequence] = None,
+                      conversation_summary: Optional[str] = None) -> Dict[str, Any]:
+        """Assemble the parameters for the first Claude call of a query"""
+        # History goes after the cached prefix as real turns, so the prefix never changes
+        user_message = {"role": "user", "content": query}
+        messages = [*conversation_history, user_message] if conversation_history else [user_message]
+        
+        template = self._templates_for(tools) if tools else self._plain_template
+        api_params = {**template, "messages": messages}
+        
+        # A summary of older turns follows the cache breakpoint, so it does not disturb the cached prefix
+        if conversation_summary:
+            api_params["system"] = [
+                *self.system_blocks,
+                {"type": "text", "text": f"Summary of the earlier conversation:\n{conversation_summary}"}
+            ]
+        return api_params
+    
+    async def generate_response(self, query: str,
+                         conversation_history: Optional[List[Dict[str, Any]]] = None,
+                         tools: Optional[Sequence] = None,
+                         tool_manager=None,
+                         conversation_summary: Optional[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """
         Generate AI response with optional tool usage and conversation context.
         
         Args:
             query: The user's question or request
-            conversation_history: Previous messages for context
+            conversation_history: Previous turns as Messages API messages
             tools: Available tools the AI can use
             tool_manager: Manager to execute tools
+            conversation_summary: Summary of turns trimmed from the history
             
         Returns:
-            Generated response as string
+            Tuple of (generated response, sources of the tool calls it used)
         """
-        
-        # Build system content efficiently - avoid string ops when possible
-        system_content = (
-            f"{self.SYSTEM_PROMPT}\n\nPrevious conversation:\n{conversation_history}"
-            if conversation_history 
-            else self.SYSTEM_PROMPT
-        )
-        
-        # Prepare API call parameters efficiently
-        api_params = {
-            **self.base_params,
-            "messages": [{"role": "user", "content": query}],
-            "system": system_content
-        }
-        
-        # Add tools if available
-        if tools:
-            api_params["tools"] = tools
-            api_params["tool_choice"] = {"type": "auto"}
+        api_params = self._build_params(query, conversation_history, tools, conversation_summary)
         
         # Get response from Claude
-        response = self.client.messages.create(**api_params)
+        response = await self._create_message(CLAUDE_ANSWER, **api_params)
         
         # Handle tool execution if needed
         if response.stop_reason == "tool_use" and tool_manager:
-            return self._handle_tool_execution(response, api_params, tool_manager)
+            return await self._handle_tool_execution(response, api_params, tool_manager)
         
         # Return direct response
-        return response.content[0].text
+        return response.content[0].text, []
     
-    def _handle_tool_execution(self, initial_response, base_params: Dict[str, Any], tool_manager):
+    async def stream_response(self, query: str,
+                              conversation_history: Optional[List[Dict[str, Any]]] = None,
+                              tools: Optional[Sequence] = None,
+                              tool_manager=None,
+                              conversation_summary: Optional[str] = None) -> AsyncIterator[Tuple[str, Any]]:
         """
-        Handle execution of tool calls and get follow-up response.
+        Stream the AI response as text deltas.
+        
+        Text of the first call is held back until Claude has decided whether
+        to search. Text written before a tool call ("I'll search...") is
+        dropped, as generate_response drops it, so both return the same
+        answer. A tool-backed answer streams as soon as the search results
+        have been sent back; a direct answer is sent once the first call ends.
+        
+        Args:
+            query: The user's question or request
+            conversation_history: Previous turns as Messages API messages
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+            conversation_summary: Summary of turns trimmed from the history
+            
+        Yields:
+            ("token", text) for each text delta in the order Claude produces
+            them, and ("sources", sources list) once the tools have run
+        """
+        api_params = self._build_params(query, conversation_history, tools, conversation_summary)
+        
+        async with self.request_slots:
+            with CLAUDE_ANSWER.time():
+                async with self.client.messages.stream(**api_params) as stream:
+                    first_turn = [text async for text in stream.text_stream]
+                    response = await stream.get_final_message()
+        self._record_usage(response)
+        
+        if response.stop_reason != "tool_use" or not tool_manager:
+            for text in first_turn:
+                yield "token", text
+            return
+        
+        final_params, sources = await self._run_tools(response, api_params, tool_manager)
+        yield "sources", sources
+        async with self.request_slots:
+            with CLAUDE_TOOL_FOLLOWUP.time():
+                async with self.client.messages.stream(**final_params) as stream:
+                    async for text in stream.text_stream:
+                        yield "token", text
+                    self._record_usage(await stream.get_final_message())
+    
+    async def _run_tools(self, initial_response, base_params: Dict[str, Any],
+                         tool_manager) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Execute the tool calls of a response and build the follow-up request.
         
         Args:
             initial_response: The response containing tool use requests
@@ -96,19 +222,16 @@ Provide only the direct answer to what was asked.
             tool_manager: Manager to execute tools
             
         Returns:
-            Final response text after tool execution
+            Tuple of (API parameters for the final call including the tool
+            results, sources returned by the tools)
         """
-        # Start with existing messages
-        messages = base_params["messages"].copy()
-        
-        # Add AI's tool use response
-        messages.append({"role": "assistant", "content": initial_response.content})
-        
-        # Execute all tool calls and collect results
+        # Execute all tool calls and collect results; sources stay local to this request
         tool_results = []
+        sources = []
         for content_block in initial_response.content:
             if content_block.type == "tool_use":
-                tool_result = tool_manager.execute_tool(
+                # Tools hit ChromaDB and the embedding model, so run them off the event loop
+                tool_result = await tool_manager.execute_tool_async(
                     content_block.name, 
                     **content_block.input
                 )
@@ -116,20 +239,59 @@ Provide only the direct answer to what was asked.
                 tool_results.append({
                     "type": "tool_result",
                     "tool_use_id": content_block.id,
-                    "content": tool_result
+                    "content": tool_result.content
                 })
+                sources.extend(tool_result.sources)
         
-        # Add tool results as single message
+        # Existing messages, the AI's tool use response and the tool results as a single message
+        messages = [*base_params["messages"], {"role": "assistant", "content": initial_response.content}]
         if tool_results:
             messages.append({"role": "user", "content": tool_results})
         
-        # Prepare final API call without tools
-        final_params = {
-            **self.base_params,
-            "messages": messages,
-            "system": base_params["system"]
-        }
+        self._templates_for(base_params["tools"])
+        return {**self._followup_template, "system": base_params["system"], "messages": messages}, sources
+    
+    async def _handle_tool_execution(self, initial_response, base_params: Dict[str, Any], tool_manager):
+        """
+        Handle execution of tool calls and get follow-up response.
+        
+        Args:
+            initial_response: The response containing tool use requests
+            base_params: Base API parameters
+            tool_manager: Manager to execute tools
+            
+        Returns:
+            Tuple of (final response text after tool execution, tool sources)
+        """
+        final_params, sources = await self._run_tools(initial_response, base_params, tool_manager)
         
         # Get final response
-        final_response = self.client.messages.create(**final_params)
-        return final_response.content[0].text
\ No newline at end of file
+        final_response = await self._create_message(CLAUDE_TOOL_FOLLOWUP, **final_params)
+        return final_response.content[0].text, sources
+    
+    async def summarize(self, previous_summary: Optional[str],
+                        messages: List[Dict[str, Any]], max_tokens: int = 300) -> str:
+        """
+        Fold conversation turns into a rolling summary.
+        
+        Args:
+            previous_summary: Summary of even older turns, if any
+            messages: Turns to fold in, as Messages API messages
+            max_tokens: Upper bound on the summary length
+            
+        Returns:
+            The updated summary
+        """
+        transcript = "\n".join(f"{message['role'].title()}: {message['content']}" for message in messages)
+        if previous_summary:
+            transcript = f"Existing summary:\n{previous_summary}\n\nConversation:\n{transcript}"
+        
+        response = await self._create_message(
+            CLAUDE_SUMMARY,
+            model=self.model,
+            temperature=0,
+            max_tokens=max_tokens,
+            system=self.SUMMARY_PROMPT,
+            messages=[{"role": "user", "content": transcript}]
+        )
+        return response.content[0].text
\ No newline at end of file
@@ -0,0 +1,120 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
+import numpy as np
+from cache import LRUCache
+
+
+@dataclass
+class CachedAnswer:
+    """A generated answer and the context it was produced from"""
+    query: str                          # Normalized query text
+    answer: str
+    sources: List[Dict[str, Any]]
+    generation: int                     # VectorStore generation the answer was retrieved against
+    embedding: Optional[np.ndarray] = None  # Unit-length query embedding for the semantic tier
+    context: Optional[FrozenSet[str]] = None  # Chunk IDs retrieved for the query, checked by the semantic tier
+
+
+class AnswerCache:
+    """
+    Cache of answers to stateless queries.
+    
+    Lookups first try the normalized query text, then (optionally) the most
+    similar cached query by cosine similarity among those that retrieve the
+    same chunks, so near-duplicates asking about different content (say,
+    lessons 2 and 3 of a course) never share an answer. An entry only counts
+    while the vector store is at the generation it was answered against, so
+    any content change invalidates it.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None,
+                 similarity_threshold: Optional[float] = 0.95):
+        self._entries = LRUCache(max_size, ttl)
+        self.similarity_threshold = similarity_threshold  # None disables the semantic tier
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+    
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.similarity_threshold is not None
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Case-fold, collapse whitespace and drop trailing punctuation"""
+        return re.sub(r'\s+', ' ', query.strip().lower()).rstrip(' ?!.')
+    
+    def get_exact(self, query: str, generation: int) -> Optional[CachedAnswer]:
+        """Look up an answer by normalized query text"""
+        entry = self._entries.get(self.normalize(query))
+        if entry is not None and entry.generation == generation:
+            with self._lock:
+                self.exact_hits += 1
+            return entry
+        return None
+    
+    def get_similar(self, embedding, generation: int, context: Optional[FrozenSet[str]]) -> Optional[CachedAnswer]:
+        """
+        Look up the answer to the most similar cached query, if it clears the
+        threshold and was answered from the same retrieved chunk IDs (context).
+        Scans every cached answer, so call it off the event loop.
+        """
+        if not self.semantic_enabled or not context:
+            return None
+        
+        candidates = [entry for entry in self._entries.values()
+                      if entry.embedding is not None and entry.generation == generation
+                      and entry.context == context]
+        if candidates:
+            matrix = np.vstack([entry.embedding for entry in candidates])
+            similarities = matrix @ self._unit(embedding)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.similarity_threshold:
+                with self._lock:
+                    self.semantic_hits += 1
+                return candidates[best]
+        return None
+    
+    def record_miss(self):
+        """Count a lookup that neither tier could answer"""
+        with self._lock:
+            self.misses += 1
+    
+    def put(self, query: str, answer: str, sources: List[Dict[str, Any]],
+            generation: int, embedding=None, context: Optional[FrozenSet[str]] = None):
+        """Cache an answer produced against the given store generation"""
+        key = self.normalize(query)
+        semantic = embedding is not None and bool(context)
+        self._entries.set(key, CachedAnswer(
+            query=key,
+            answer=answer,
+            sources=sources,
+            generation=generation,
+            embedding=self._unit(embedding) if semantic else None,
+            context=context if semantic else None
+        ))
+    
+    def clear(self):
+        """Drop every cached answer"""
+        self._entries.clear()
+    
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers"""
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0
+            }
@@ -5,12 +5,17 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
+import json
 import os
 
 from config import config
 from rag_system import RAGSystem
+from metrics import RAGSystemCollector
 
 # Initialize FastAPI app
 app = FastAPI(title="Course Materials RAG System", root_path="")
@@ -31,8 +36,12 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Initialize RAG system
+# Initialize RAG system (cheap: the vector store and models load during warm-up)
 rag_system = RAGSystem(config)
+REGISTRY.register(RAGSystemCollector(rag_system))
+
+# Startup progress reported by /readyz: starting -> warming_up -> loading_documents -> ready (or failed)
+startup_state = {"stage": "starting", "error": None, "timings": {}}
 
 # Pydantic models for request/response
 class QueryRequest(BaseModel):
@@ -69,10 +78,10 @@ async def query_documents(request: QueryRequest):
         # Create session if not provided
         session_id = request.session_id
         if not session_id:
-            session_id = rag_system.session_manager.create_session()
+            session_id = await rag_system.create_session()
         
         # Process query using RAG system
-        answer, sources = rag_system.query(request.query, session_id)
+        answer, sources = await rag_system.query(request.query, session_id)
         
         return QueryResponse(
             answer=answer,
@@ -82,11 +91,42 @@ async def query_documents(request: QueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse_event(event: str, data) -> str:
+    """Encode one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/query/stream")
+async def query_documents_stream(request: QueryRequest):
+    """Process a query and stream the answer as Server-Sent Events"""
+    session_id = request.session_id
+    if not session_id:
+        session_id = await rag_system.create_session()
+    
+    async def event_stream():
+        yield _sse_event("session", {"session_id": session_id})
+        try:
+            async for event, payload in rag_system.query_stream(request.query, session_id):
+                if event == "token":
+                    yield _sse_event("token", {"text": payload})
+                else:
+                    yield _sse_event(event, {event: payload})
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+        yield _sse_event("done", {})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/courses", response_model=CourseStats)
 async def get_course_stats():
     """Get course analytics and statistics"""
     try:
-        analytics = rag_system.get_course_analytics()
+        # Off the loop: during warm-up this waits for the vector store to open
+        loop = asyncio.get_running_loop()
+        analytics = await loop.run_in_executor(rag_system.search_executor, rag_system.get_course_analytics)
         return CourseStats(
             total_courses=analytics["total_courses"],
             course_titles=analytics["course_titles"]
@@ -101,16 +141,32 @@ async def cleanup_session(request: SessionCleanupRequest):
     if not request.session_id:
         return {"detail": "No active session"}
 
-    rag_system.session_manager.clear_session(request.session_id)
+    await rag_system.clear_session(request.session_id)
     return {"detail": "Session cleared"}
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and answering requests"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: models are warm and the initial documents are indexed (503 until then)"""
+    return JSONResponse(
+        status_code=200 if startup_state["stage"] == "ready" else 503,
+        content=startup_state
+    )
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics of this worker process"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.on_event("startup")
 async def startup_event():
-    """Load initial documents on startup"""
-    import asyncio
+    """Warm up models and load initial documents on startup"""
     from concurrent.futures import ThreadPoolExecutor
     
-    # Load documents in background to not block server startup
     def load_docs():
         docs_path = "../docs"
         if os.path.exists(docs_path):
@@ -121,10 +177,22 @@ async def startup_event():
             except Exception as e:
                 print(f"Error loading documents: {e}")
     
-    # Start loading in background thread
+    # Warm up and load documents in the background so the server accepts connections at once
+    def warm_up():
+        try:
+            startup_state["stage"] = "warming_up"
+            startup_state["timings"] = rag_system.warm_up()
+            startup_state["stage"] = "loading_documents"
+            load_docs()
+            startup_state["stage"] = "ready"
+        except Exception as e:
+            print(f"Error warming up: {e}")
+            startup_state["stage"] = "failed"
+            startup_state["error"] = str(e)
+    
     loop = asyncio.get_event_loop()
     executor = ThreadPoolExecutor(max_workers=1)
-    loop.run_in_executor(executor, load_docs)
+    loop.run_in_executor(executor, warm_up)
 
 # Custom static file handler with no-cache headers for development
 from fastapi.staticfiles import StaticFiles
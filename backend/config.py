@@ -14,15 +14,72 @@ class Config:
     
     # Embedding model settings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_CACHE_SIZE: int = 2048     # Query embeddings kept in the LRU cache
+    EMBEDDING_CACHE_TTL: float = 3600    # Seconds before a cached query embedding expires
+    EMBEDDING_BATCH_SIZE: int = 256      # Chunks embedded and written to Chroma per batch
+    EMBEDDING_PROCESSES: int = 0         # Encoder processes during ingestion (0 or 1 = in-process)
+    # "torch" (sentence-transformers) or "onnx" (ONNX Runtime, needs the onnx extra and an exported model)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    EMBEDDING_ONNX_PATH: str = "./models/all-MiniLM-L6-v2-onnx-int8"  # Written by `python embeddings.py`
+    EMBEDDING_THREADS: int = 0           # Inference threads per encode call (0 = library default)
+    # Unix socket of a shared embedding_server.py; "" loads the model in every worker process
+    EMBEDDING_SERVER_SOCKET: str = os.getenv("EMBEDDING_SERVER_SOCKET", "")
+    EMBEDDING_MICRO_BATCH: bool = True         # Encode concurrent query embeddings together
+    EMBEDDING_MICRO_BATCH_WAIT: float = 0.002  # Seconds to wait for more queries once several are queued
+    EMBEDDING_MICRO_BATCH_SIZE: int = 32       # Query embeddings encoded together at most
     
     # Document processing settings
     CHUNK_SIZE: int = 800       # Size of text chunks for vector storage
     CHUNK_OVERLAP: int = 100     # Characters to overlap between chunks
     MAX_RESULTS: int = 5         # Maximum search results to return
-    MAX_HISTORY: int = 2         # Number of conversation messages to remember
+    MAX_HISTORY: int = 10        # Conversation exchanges remembered at most
+    HISTORY_TOKEN_BUDGET: int = 1500  # Approximate tokens of history sent with each query
+    SUMMARIZE_HISTORY: bool = False   # Summarize turns trimmed from the history in the background (one extra Claude call each)
+    SUMMARY_MAX_TOKENS: int = 300     # Upper bound on a conversation summary
+    COURSE_MATCH_MAX_DISTANCE: float = 1.3  # Max squared L2 distance for vector course-name matches
+    HYBRID_SEARCH: bool = True           # Fuse BM25 keyword ranking with vector ranking
+    HYBRID_CANDIDATES: int = 20          # Results taken from each ranking before fusion
+    RRF_K: int = 60                      # Reciprocal rank fusion constant
+    TOOL_RESULT_CACHE_SIZE: int = 512    # Cached search tool results (0 disables the cache)
+    
+    # Cross-encoder re-ranking of search candidates (downloads a second model when enabled)
+    RERANK: bool = False
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20          # Candidates fetched from the vector store for re-ranking
+    RERANK_TOP_K: int = 3                # Chunks kept after re-ranking and sent to Claude
+    RERANK_TIME_BUDGET: float = 0.25     # Seconds of scoring per query before keeping the vector order
+    RERANK_BATCH_SIZE: int = 16          # Query/chunk pairs scored per forward pass
+    
+    # Answer cache for queries without conversation history
+    ANSWER_CACHE_SIZE: int = 1024        # Cached answers (0 disables the cache)
+    ANSWER_CACHE_TTL: float = 3600       # Seconds before a cached answer expires
+    ANSWER_CACHE_SEMANTIC: bool = False  # Also reuse answers to near-identical queries that retrieve the same chunks
+    ANSWER_CACHE_SIMILARITY: float = 0.95  # Min cosine similarity for a semantic hit
+    
+    # Concurrency settings
+    MAX_CONCURRENT_LLM_CALLS: int = 16  # In-flight Claude requests allowed per worker
+    SEARCH_WORKERS: int = 4             # Threads for blocking vector search / embedding work (also caps a micro-batch)
+    
+    # Ingestion settings
+    INGEST_WORKERS: int = 4      # Processes used to parse and chunk changed documents
+    INGEST_STREAM_BYTES: int = 8 << 20  # Larger files are parsed lesson by lesson in this process instead
+    
+    # Session storage ("memory" for one worker, "sqlite" to share sessions across workers)
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")
+    SESSION_DB_PATH: str = "./chroma_db/sessions.sqlite3"
+    MAX_SESSIONS: int = 10000            # In-memory sessions kept before evicting the least recently used
+    SESSION_IDLE_TTL: float = 3600       # Seconds of inactivity before a session expires
+    SESSION_WORKERS: int = 2             # Threads for session store calls (kept apart from SEARCH_WORKERS)
+    
+    # Vector storage ("chroma", or "numpy" for brute-force search over a memory-mapped matrix)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma")
+    NUMPY_STORE_PATH: str = "./chroma_db/numpy_store"
+    NUMPY_STORE_DTYPE: str = "float32"   # "float16" halves the matrix at a small cost in accuracy
     
     # Database paths
     CHROMA_PATH: str = "./chroma_db"  # ChromaDB storage location
+    INGEST_MANIFEST_PATH: str = "./chroma_db/ingest_manifest.json"  # Fingerprints of ingested files
+    LEXICAL_INDEX_PATH: str = "./chroma_db/lexical_index.pkl"        # Persisted BM25 index
 
 config = Config()
 
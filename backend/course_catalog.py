@@ -0,0 +1,130 @@
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from models import Course
+
+
+@dataclass
+class CatalogEntry:
+    """Course metadata held in memory for fast lookups"""
+    title: str
+    course_link: Optional[str] = None
+    instructor: Optional[str] = None
+    lessons: Dict[int, Dict[str, Any]] = field(default_factory=dict)  # lesson_number -> lesson metadata
+
+
+class CourseCatalogIndex:
+    """
+    In-memory mirror of the course_catalog collection.
+    
+    Writers swap in a new dict under a lock, so readers can use the current
+    mapping without locking.
+    """
+    
+    def __init__(self):
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._lock = threading.Lock()
+        self.version = 0  # Bumped on every change so dependents can rebuild lazily
+    
+    @staticmethod
+    def _entry_from_metadata(metadata: Dict[str, Any]) -> CatalogEntry:
+        """Build an entry from a course_catalog metadata record"""
+        lessons = json.loads(metadata.get('lessons_json') or '[]')
+        return CatalogEntry(
+            title=metadata['title'],
+            course_link=metadata.get('course_link'),
+            instructor=metadata.get('instructor'),
+            lessons={lesson['lesson_number']: lesson for lesson in lessons}
+        )
+    
+    @staticmethod
+    def _entry_from_course(course: Course) -> CatalogEntry:
+        """Build an entry from a Course model"""
+        return CatalogEntry(
+            title=course.title,
+            course_link=course.course_link,
+            instructor=course.instructor,
+            lessons={
+                lesson.lesson_number: {
+                    "lesson_number": lesson.lesson_number,
+                    "lesson_title": lesson.title,
+                    "lesson_link": lesson.lesson_link
+                }
+                for lesson in course.lessons
+            }
+        )
+    
+    def load(self, metadatas: List[Dict[str, Any]]):
+        """Replace the index with the given catalog metadata records"""
+        entries = {}
+        for metadata in metadatas:
+            entry = self._entry_from_metadata(metadata)
+            entries[entry.title] = entry
+        with self._lock:
+            self._entries = entries
+            self.version += 1
+    
+    def add_course(self, course: Course):
+        """Add or replace a course in the index"""
+        entry = self._entry_from_course(course)
+        with self._lock:
+            entries = dict(self._entries)
+            entries[entry.title] = entry
+            self._entries = entries
+            self.version += 1
+    
+    def remove_course(self, course_title: str):
+        """Remove a course from the index if present"""
+        with self._lock:
+            if course_title in self._entries:
+                entries = dict(self._entries)
+                del entries[course_title]
+                self._entries = entries
+                self.version += 1
+    
+    def clear(self):
+        """Drop every course from the index"""
+        with self._lock:
+            self._entries = {}
+            self.version += 1
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, course_title: str) -> bool:
+        return course_title in self._entries
+    
+    def titles(self) -> List[str]:
+        """All course titles in insertion order"""
+        return list(self._entries)
+    
+    def get(self, course_title: str) -> Optional[CatalogEntry]:
+        """Get the entry for a course title"""
+        return self._entries.get(course_title)
+    
+    def get_course_link(self, course_title: str) -> Optional[str]:
+        """Get the course link for a course title"""
+        entry = self._entries.get(course_title)
+        return entry.course_link if entry else None
+    
+    def get_lesson_link(self, course_title: str, lesson_number: int) -> Optional[str]:
+        """Get the lesson link for a course title and lesson number"""
+        entry = self._entries.get(course_title)
+        if not entry:
+            return None
+        lesson = entry.lessons.get(lesson_number)
+        return lesson.get('lesson_link') if lesson else None
+    
+    def all_metadata(self) -> List[Dict[str, Any]]:
+        """Course metadata with parsed lessons, as returned by get_all_courses_metadata"""
+        return [
+            {
+                "title": entry.title,
+                "instructor": entry.instructor,
+                "course_link": entry.course_link,
+                "lesson_count": len(entry.lessons),
+                "lessons": list(entry.lessons.values())
+            }
+            for entry in self._entries.values()
+        ]
@@ -0,0 +1,149 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from cache import LRUCache
+from course_catalog import CourseCatalogIndex
+
+
+def normalize_title(text: str) -> str:
+    """Lowercase and reduce a title to space-separated alphanumeric tokens"""
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized string, padded to catch word edges"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class _TitleIndex:
+    """Lexical lookup structures over the catalog titles"""
+    version: int
+    titles: Set[str] = field(default_factory=set)
+    by_normalized: Dict[str, str] = field(default_factory=dict)
+    normalized: Dict[str, str] = field(default_factory=dict)        # title -> normalized title
+    tokens: Dict[str, Set[str]] = field(default_factory=dict)       # title -> token set
+    trigrams: Dict[str, Set[str]] = field(default_factory=dict)     # title -> trigram set
+    by_trigram: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
+
+
+class CourseNameResolver:
+    """
+    Resolves a user-supplied course name to a catalog title, cheapest tier first:
+    exact match, case-insensitive match, title prefix, all query tokens present,
+    trigram similarity, and finally a vector search with a distance cutoff.
+    Resolutions are memoized per catalog version.
+    """
+
+    def __init__(self,
+                 catalog_index: CourseCatalogIndex,
+                 vector_lookup: Callable[[str], Optional[Tuple[str, float]]],
+                 max_distance: float = 1.3,
+                 min_similarity: float = 0.6,
+                 memo_size: int = 1024):
+        self.catalog_index = catalog_index
+        self.vector_lookup = vector_lookup    # name -> (title, distance) of the nearest catalog entry
+        self.max_distance = max_distance      # Largest vector distance accepted as a match
+        self.min_similarity = min_similarity  # Smallest share of query trigrams a fuzzy match must contain
+        self._index = _TitleIndex(version=-1)
+        self._memo = LRUCache(memo_size)
+
+    def _current_index(self) -> _TitleIndex:
+        """Return the title index, rebuilding it if the catalog has changed"""
+        version = self.catalog_index.version
+        index = self._index
+        if index.version == version:
+            return index
+
+        index = _TitleIndex(version=version)
+        for title in self.catalog_index.titles():
+            normalized = normalize_title(title)
+            title_trigrams = trigrams(normalized)
+            index.titles.add(title)
+            index.by_normalized.setdefault(normalized, title)
+            index.normalized[title] = normalized
+            index.tokens[title] = set(normalized.split())
+            index.trigrams[title] = title_trigrams
+            for trigram in title_trigrams:
+                index.by_trigram[trigram].add(title)
+        self._index = index
+        return index
+
+    def resolve(self, course_name: str) -> Optional[str]:
+        """Return the best matching course title, or None if nothing is close enough"""
+        index = self._current_index()
+        memo_key = (index.version, course_name)
+        cached = self._memo.get(memo_key)
+        if cached is not None:
+            return cached or None
+
+        title = self._resolve_lexical(index, course_name)
+        if title is None:
+            title = self._resolve_vector(course_name)
+
+        # Store misses as "" so they are memoized too
+        self._memo.set(memo_key, title or "")
+        return title
+
+    def _resolve_lexical(self, index: _TitleIndex, course_name: str) -> Optional[str]:
+        """Match against titles without touching the embedding model"""
+        if course_name in index.titles:
+            return course_name
+
+        query = normalize_title(course_name)
+        if not query:
+            return None
+        if query in index.by_normalized:
+            return index.by_normalized[query]
+
+        query_trigrams = trigrams(query)
+
+        # Prefix of the title, e.g. "mcp" -> "MCP: Build Rich-Context AI Apps ..."
+        candidates = [t for t, normalized in index.normalized.items() if normalized.startswith(query)]
+        if candidates:
+            return self._best_by_similarity(index, candidates, query_trigrams)[0]
+
+        # Every query token appears in the title, e.g. "computer use"
+        query_tokens = set(query.split())
+        candidates = [t for t, tokens in index.tokens.items() if query_tokens <= tokens]
+        if candidates:
+            return self._best_by_similarity(index, candidates, query_trigrams)[0]
+
+        # Fuzzy match on trigram overlap for typos and partial words
+        candidates = set()
+        for trigram in query_trigrams:
+            candidates.update(index.by_trigram.get(trigram, ()))
+        if candidates:
+            title, similarity = self._best_by_similarity(index, list(candidates), query_trigrams)
+            if similarity >= self.min_similarity:
+                return title
+
+        return None
+
+    @staticmethod
+    def _best_by_similarity(index: _TitleIndex, candidates: List[str],
+                            query_trigrams: Set[str]) -> Tuple[str, float]:
+        """
+        Pick the candidate containing the largest share of the query's trigrams.
+        Ties go to the higher Jaccard similarity, then the shorter title, then
+        alphabetical order, so resolution is deterministic.
+        """
+        def score(title: str) -> Tuple[float, float, int, str]:
+            title_trigrams = index.trigrams[title]
+            shared = len(query_trigrams & title_trigrams)
+            containment = shared / len(query_trigrams)
+            jaccard = shared / len(query_trigrams | title_trigrams)
+            return (-containment, -jaccard, len(title), title)
+
+        best = min(candidates, key=score)
+        return best, -score(best)[0]
+
+    def _resolve_vector(self, course_name: str) -> Optional[str]:
+        """Fall back to the nearest catalog embedding within the distance cutoff"""
+        match = self.vector_lookup(course_name)
+        if match is None:
+            return None
+        title, distance = match
+        return title if distance <= self.max_distance else None
@@ -1,6 +1,8 @@
+import itertools
 import os
 import re
-from typing import List, Tuple
+from collections import deque
+from typing import Deque, Iterator, List, Optional, Tuple
 from models import Course, Lesson, CourseChunk
 
 class DocumentProcessor:
@@ -22,90 +24,130 @@ class DocumentProcessor:
     
 
 
-    def chunk_text(self, text: str) -> List[str]:
-        """Split text into sentence-based chunks with overlap using config settings"""
-        
+    # Sentence boundary: periods/!/? followed by whitespace and a capital letter,
+    # ignoring common abbreviations
+    SENTENCE_BOUNDARY = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])')
+    
+    def iter_sentences(self, text: str) -> Iterator[str]:
+        """Lazily split text into cleaned, non-empty sentences"""
         # Clean up the text
         text = re.sub(r'\s+', ' ', text.strip())  # Normalize whitespace
         
-        # Better sentence splitting that handles abbreviations
-        # This regex looks for periods followed by whitespace and capital letters
-        # but ignores common abbreviations
-        sentence_endings = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])')
-        sentences = sentence_endings.split(text)
-        
-        # Clean sentences
-        sentences = [s.strip() for s in sentences if s.strip()]
+        start = 0
+        for boundary in self.SENTENCE_BOUNDARY.finditer(text):
+            sentence = text[start:boundary.start()].strip()
+            if sentence:
+                yield sentence
+            start = boundary.end()
+        sentence = text[start:].strip()
+        if sentence:
+            yield sentence
+    
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        """
+        Yield sentence-based chunks with overlap in a single pass.
         
-        chunks = []
-        i = 0
+        A sliding window of sentences is extended while the joined chunk fits
+        in chunk_size (a chunk always takes at least one sentence), emitted, and
+        then shrunk from the front so only the trailing sentences that fit in
+        chunk_overlap carry over - always dropping at least one sentence.
+        """
+        window: Deque[str] = deque()
+        window_chars = 0  # Sum of sentence lengths in the window, without separators
+        sentences = self.iter_sentences(text)
+        pending = next(sentences, None)
         
-        while i < len(sentences):
-            current_chunk = []
-            current_size = 0
-            
-            # Build chunk starting from sentence i
-            for j in range(i, len(sentences)):
-                sentence = sentences[j]
-                
-                # Calculate size with space
-                space_size = 1 if current_chunk else 0
-                total_addition = len(sentence) + space_size
-                
-                # Check if adding this sentence would exceed chunk size
-                if current_size + total_addition > self.chunk_size and current_chunk:
+        while pending is not None or window:
+            # Extend the window while the next sentence fits
+            while pending is not None:
+                joined_size = window_chars + len(window) - 1 if window else 0
+                addition = len(pending) + (1 if window else 0)
+                if window and joined_size + addition > self.chunk_size:
                     break
-                
-                current_chunk.append(sentence)
-                current_size += total_addition
+                window.append(pending)
+                window_chars += len(pending)
+                pending = next(sentences, None)
             
-            # Add chunk if we have content
-            if current_chunk:
-                chunks.append(' '.join(current_chunk))
-                
-                # Calculate overlap for next chunk
-                if hasattr(self, 'chunk_overlap') and self.chunk_overlap > 0:
-                    # Find how many sentences to overlap
-                    overlap_size = 0
-                    overlap_sentences = 0
-                    
-                    # Count backwards from end of current chunk
-                    for k in range(len(current_chunk) - 1, -1, -1):
-                        sentence_len = len(current_chunk[k]) + (1 if k < len(current_chunk) - 1 else 0)
-                        if overlap_size + sentence_len <= self.chunk_overlap:
-                            overlap_size += sentence_len
-                            overlap_sentences += 1
-                        else:
-                            break
-                    
-                    # Move start position considering overlap
-                    next_start = i + len(current_chunk) - overlap_sentences
-                    i = max(next_start, i + 1)  # Ensure we make progress
-                else:
-                    # No overlap - move to next sentence after current chunk
-                    i += len(current_chunk)
-            else:
-                # No sentences fit, move to next
-                i += 1
+            yield ' '.join(window)
+            
+            # Count trailing sentences that fit in the overlap
+            overlap_sentences = 0
+            if self.chunk_overlap > 0:
+                overlap_size = 0
+                for k, sentence in enumerate(reversed(window)):
+                    sentence_len = len(sentence) + (1 if k > 0 else 0)
+                    if overlap_size + sentence_len > self.chunk_overlap:
+                        break
+                    overlap_size += sentence_len
+                    overlap_sentences += 1
+            
+            # Ensure we make progress
+            for _ in range(max(len(window) - overlap_sentences, 1)):
+                window_chars -= len(window.popleft())
+    
+    def chunk_text(self, text: str) -> List[str]:
+        """Split text into sentence-based chunks with overlap using config settings"""
+        return list(self.iter_chunks(text))
+    
+    def _lesson_chunks(self, course: Course, lesson_number: int, lesson_title: str,
+                       lesson_link: Optional[str], lesson_content: List[str],
+                       first_index: int, is_last: bool) -> Iterator[CourseChunk]:
+        """Record a finished lesson on the course and yield its chunks"""
+        lesson_text = '\n'.join(lesson_content).strip()
+        if not lesson_text:
+            return
         
-        return chunks
-
-
-
-
+        # Add lesson to course
+        course.lessons.append(Lesson(
+            lesson_number=lesson_number,
+            title=lesson_title,
+            lesson_link=lesson_link
+        ))
+        
+        for idx, chunk in enumerate(self.iter_chunks(lesson_text)):
+            if is_last:
+                # For any chunk of the final lesson, add lesson context & course title
+                chunk_with_context = f"Course {course.title} Lesson {lesson_number} content: {chunk}"
+            elif idx == 0:
+                # For the first chunk of each lesson, add lesson context
+                chunk_with_context = f"Lesson {lesson_number} content: {chunk}"
+            else:
+                chunk_with_context = chunk
+            
+            yield CourseChunk(
+                content=chunk_with_context,
+                course_title=course.title,
+                lesson_number=lesson_number,
+                chunk_index=first_index + idx
+            )
     
-    def process_course_document(self, file_path: str) -> Tuple[Course, List[CourseChunk]]:
+    def stream_course_document(self, file_path: str) -> Tuple[Course, Iterator[CourseChunk]]:
         """
-        Process a course document with expected format:
+        Parse a course document line by line.
+        
+        The metadata header is read immediately so the returned Course has its
+        title, link and instructor; its lessons are appended as the chunk
+        iterator is consumed, so only one lesson is held in memory at a time.
+        The iterator opens the file again when it starts and closes it when it
+        is exhausted or closed, so abandoning it leaves no file open.
+        Expected format:
         Line 1: Course Title: [title]
         Line 2: Course Link: [url]
         Line 3: Course Instructor: [instructor]
         Following lines: Lesson markers and content
         """
-        content = self.read_file(file_path)
         filename = os.path.basename(file_path)
         
-        lines = content.strip().split('\n')
+        # Skip leading whitespace, then take the first four lines as the header
+        header = []
+        header_line_count = 0  # Lines read, including the skipped blank ones
+        with self._open_document(file_path) as file:
+            for line in self._lines(file):
+                header_line_count += 1
+                if header or line.strip():
+                    header.append(line.lstrip() if not header else line)
+                    if len(header) == 4:
+                        break
         
         # Extract course metadata from first three lines
         course_title = filename  # Default fallback
@@ -113,25 +155,25 @@ class DocumentProcessor:
         instructor_name = "Unknown"
         
         # Parse course title from first line
-        if len(lines) >= 1 and lines[0].strip():
-            title_match = re.match(r'^Course Title:\s*(.+)$', lines[0].strip(), re.IGNORECASE)
+        if header and header[0].strip():
+            title_match = re.match(r'^Course Title:\s*(.+)$', header[0].strip(), re.IGNORECASE)
             if title_match:
                 course_title = title_match.group(1).strip()
             else:
-                course_title = lines[0].strip()
+                course_title = header[0].strip()
         
         # Parse remaining lines for course metadata
-        for i in range(1, min(len(lines), 4)):  # Check first 4 lines for metadata
-            line = lines[i].strip()
+        for line in header[1:4]:  # Check first 4 lines for metadata
+            line = line.strip()
             if not line:
                 continue
-                
+            
             # Try to match course link
             link_match = re.match(r'^Course Link:\s*(.+)$', line, re.IGNORECASE)
             if link_match:
                 course_link = link_match.group(1).strip()
                 continue
-                
+            
             # Try to match instructor
             instructor_match = re.match(r'^Course Instructor:\s*(.+)$', line, re.IGNORECASE)
             if instructor_match:
@@ -146,115 +188,113 @@ class DocumentProcessor:
             lessons=[]
         )
         
-        # Process lessons and create chunks
-        course_chunks = []
-        current_lesson = None
-        lesson_title = None
-        lesson_link = None
-        lesson_content = []
-        chunk_counter = 0
-        
         # Start processing from line 4 (after metadata)
         start_index = 3
-        if len(lines) > 3 and not lines[3].strip():
+        if len(header) > 3 and not header[3].strip():
             start_index = 4  # Skip empty line after instructor
         
-        i = start_index
-        while i < len(lines):
-            line = lines[i]
+        return course, self._iter_lesson_chunks(course, file_path, header, start_index, header_line_count)
+    
+    @staticmethod
+    def _open_document(file_path: str):
+        # Decoding with errors='ignore' matches read_file's fallback and is identical for valid UTF-8
+        return open(file_path, 'r', encoding='utf-8', errors='ignore')
+    
+    @staticmethod
+    def _lines(file) -> Iterator[str]:
+        """Lines of a text file without their newline"""
+        return (line[:-1] if line.endswith('\n') else line for line in file)
+    
+    def _iter_lesson_chunks(self, course: Course, file_path: str, header: List[str],
+                            start_index: int, header_line_count: int) -> Iterator[CourseChunk]:
+        """Walk the document body, yielding each lesson's chunks once the lesson ends"""
+        with self._open_document(file_path) as file:
+            lines = itertools.islice(self._lines(file), header_line_count, None)
+            body = itertools.chain(header[start_index:], lines)
             
-            # Check for lesson markers (e.g., "Lesson 0: Introduction")
-            lesson_match = re.match(r'^Lesson\s+(\d+):\s*(.+)$', line.strip(), re.IGNORECASE)
+            current_lesson = None
+            lesson_title = None
+            lesson_link = None
+            lesson_content = []
+            chunk_counter = 0
+            # Raw body lines are only kept until the first chunk, for the no-lessons fallback
+            raw_lines: Optional[List[str]] = []
+            pending = None
             
-            if lesson_match:
-                # Process previous lesson if it exists
-                if current_lesson is not None and lesson_content:
-                    lesson_text = '\n'.join(lesson_content).strip()
-                    if lesson_text:
-                        # Add lesson to course
-                        lesson = Lesson(
-                            lesson_number=current_lesson,
-                            title=lesson_title,
-                            lesson_link=lesson_link
-                        )
-                        course.lessons.append(lesson)
-                        
-                        # Create chunks for this lesson
-                        chunks = self.chunk_text(lesson_text)
-                        for idx, chunk in enumerate(chunks):
-                            # For the first chunk of each lesson, add lesson context
-                            if idx == 0:
-                                chunk_with_context = f"Lesson {current_lesson} content: {chunk}"
-                            else:
-                                chunk_with_context = chunk
-                            
-                            course_chunk = CourseChunk(
-                                content=chunk_with_context,
-                                course_title=course.title,
-                                lesson_number=current_lesson,
-                                chunk_index=chunk_counter
-                            )
-                            course_chunks.append(course_chunk)
-                            chunk_counter += 1
-                
-                # Start new lesson
-                current_lesson = int(lesson_match.group(1))
-                lesson_title = lesson_match.group(2).strip()
-                lesson_link = None
-                
-                # Check if next line is a lesson link
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    link_match = re.match(r'^Lesson Link:\s*(.+)$', next_line, re.IGNORECASE)
-                    if link_match:
-                        lesson_link = link_match.group(1).strip()
-                        i += 1  # Skip the link line so it's not added to content
-                
-                lesson_content = []
-            else:
-                # Add line to current lesson content
-                lesson_content.append(line)
+            while True:
+                if pending is not None:
+                    line, pending = pending, None
+                else:
+                    line = next(body, None)
+                    if line is None:
+                        break
+                    if raw_lines is not None:
+                        raw_lines.append(line)
                 
-            i += 1
-        
-        # Process the last lesson
-        if current_lesson is not None and lesson_content:
-            lesson_text = '\n'.join(lesson_content).strip()
-            if lesson_text:
-                lesson = Lesson(
-                    lesson_number=current_lesson,
-                    title=lesson_title,
-                    lesson_link=lesson_link
-                )
-                course.lessons.append(lesson)
+                # Check for lesson markers (e.g., "Lesson 0: Introduction")
+                lesson_match = re.match(r'^Lesson\s+(\d+):\s*(.+)$', line.strip(), re.IGNORECASE)
                 
-                chunks = self.chunk_text(lesson_text)
-                for idx, chunk in enumerate(chunks):
-                    # For any chunk of each lesson, add lesson context & course title
-                  
-                    chunk_with_context = f"Course {course_title} Lesson {current_lesson} content: {chunk}"
+                if lesson_match:
+                    # Process previous lesson if it exists
+                    if current_lesson is not None and lesson_content:
+                        for chunk in self._lesson_chunks(course, current_lesson, lesson_title, lesson_link,
+                                                         lesson_content, chunk_counter, is_last=False):
+                            raw_lines = None
+                            chunk_counter += 1
+                            yield chunk
                     
-                    course_chunk = CourseChunk(
-                        content=chunk_with_context,
-                        course_title=course.title,
-                        lesson_number=current_lesson,
-                        chunk_index=chunk_counter
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
-        
-        # If no lessons found, treat entire content as one document
-        if not course_chunks and len(lines) > 2:
-            remaining_content = '\n'.join(lines[start_index:]).strip()
-            if remaining_content:
-                chunks = self.chunk_text(remaining_content)
-                for chunk in chunks:
-                    course_chunk = CourseChunk(
-                        content=chunk,
-                        course_title=course.title,
-                        chunk_index=chunk_counter
-                    )
-                    course_chunks.append(course_chunk)
+                    # Start new lesson
+                    current_lesson = int(lesson_match.group(1))
+                    lesson_title = lesson_match.group(2).strip()
+                    lesson_link = None
+                    lesson_content = []
+                    
+                    # Check if next line is a lesson link
+                    next_line = next(body, None)
+                    if next_line is not None:
+                        if raw_lines is not None:
+                            raw_lines.append(next_line)
+                        link_match = re.match(r'^Lesson Link:\s*(.+)$', next_line.strip(), re.IGNORECASE)
+                        if link_match:
+                            lesson_link = link_match.group(1).strip()  # Skip the link line so it's not added to content
+                        else:
+                            pending = next_line
+                else:
+                    # Add line to current lesson content
+                    lesson_content.append(line)
+            
+            # Process the last lesson
+            if current_lesson is not None and lesson_content:
+                for chunk in self._lesson_chunks(course, current_lesson, lesson_title, lesson_link,
+                                                 lesson_content, chunk_counter, is_last=True):
+                    raw_lines = None
                     chunk_counter += 1
-        
-        return course, course_chunks
+                    yield chunk
+            
+            # If no lessons found, treat entire content as one document
+            if chunk_counter == 0 and raw_lines is not None:
+                remaining_content = '\n'.join(raw_lines).strip()
+                if remaining_content:
+                    for chunk in self.iter_chunks(remaining_content):
+                        yield CourseChunk(
+                            content=chunk,
+                            course_title=course.title,
+                            chunk_index=chunk_counter
+                        )
+                        chunk_counter += 1
+    
+    def process_course_document(self, file_path: str) -> Tuple[Course, List[CourseChunk]]:
+        """
+        Process a course document with expected format:
+        Line 1: Course Title: [title]
+        Line 2: Course Link: [url]
+        Line 3: Course Instructor: [instructor]
+        Following lines: Lesson markers and content
+        """
+        course, chunks = self.stream_course_document(file_path)
+        return course, list(chunks)
+
+
+def process_course_file(file_path: str, chunk_size: int, chunk_overlap: int) -> Tuple[Course, List[CourseChunk]]:
+    """Parse and chunk one course document (module-level so worker processes can run it)"""
+    return DocumentProcessor(chunk_size, chunk_overlap).process_course_document(file_path)
@@ -0,0 +1,242 @@
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from embeddings import EmbeddingBackend
+
+# Wire format (network byte order), one response per request on a persistent connection:
+#   request:  uint32 text count, count x uint32 UTF-8 byte lengths, then the UTF-8 texts
+#   response: uint8 status, uint32 rows, uint32 dimension, then rows x dimension little-endian float32
+#             (on error the status is 1 and rows is the byte length of a UTF-8 message sent instead)
+STATUS_OK = 0
+STATUS_ERROR = 1
+MAX_TEXTS = 4096               # Texts accepted in one request
+MAX_REQUEST_BYTES = 64 << 20   # UTF-8 bytes accepted in one request
+
+_COUNT = struct.Struct("!I")
+_RESPONSE = struct.Struct("!BII")
+_VECTOR_DTYPE = np.dtype("<f4")
+
+
+def _recv_exact(conn: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly size bytes, or None if the peer closed the connection first"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = conn.recv_into(view[received:])
+        if not count:
+            return None
+        received += count
+    return bytes(buffer)
+
+
+def _send_request(conn: socket.socket, texts: List[str]):
+    encoded = [text.encode("utf-8") for text in texts]
+    lengths = struct.pack(f"!{len(encoded)}I", *(len(data) for data in encoded))
+    conn.sendall(b"".join([_COUNT.pack(len(encoded)), lengths] + encoded))
+
+
+def _recv_request(conn: socket.socket) -> Optional[List[str]]:
+    """Read one request (None when the client disconnected); raises ValueError on limits"""
+    header = _recv_exact(conn, _COUNT.size)
+    if header is None:
+        return None
+    (count,) = _COUNT.unpack(header)
+    if count > MAX_TEXTS:
+        raise ValueError(f"Too many texts in one request: {count} > {MAX_TEXTS}")
+    length_data = _recv_exact(conn, 4 * count)
+    if length_data is None:
+        return None
+    lengths = struct.unpack(f"!{count}I", length_data)
+    total = sum(lengths)
+    if total > MAX_REQUEST_BYTES:
+        raise ValueError(f"Request too large: {total} bytes")
+    payload = _recv_exact(conn, total)
+    if payload is None:
+        return None
+
+    texts, offset = [], 0
+    for length in lengths:
+        texts.append(payload[offset:offset + length].decode("utf-8"))
+        offset += length
+    return texts
+
+
+def _send_response(conn: socket.socket, embeddings: np.ndarray):
+    embeddings = np.ascontiguousarray(embeddings, dtype=_VECTOR_DTYPE)
+    conn.sendall(_RESPONSE.pack(STATUS_OK, *embeddings.shape) + embeddings.tobytes())
+
+
+def _send_error(conn: socket.socket, message: str):
+    data = message.encode("utf-8")
+    conn.sendall(_RESPONSE.pack(STATUS_ERROR, len(data), 0) + data)
+
+
+def _recv_response(conn: socket.socket) -> np.ndarray:
+    header = _recv_exact(conn, _RESPONSE.size)
+    if header is None:
+        raise ConnectionError("Embedding server closed the connection")
+    status, rows, dimension = _RESPONSE.unpack(header)
+    if status != STATUS_OK:
+        message = _recv_exact(conn, rows) or b""
+        raise RuntimeError(f"Embedding server error: {message.decode('utf-8', 'replace')}")
+
+    data = _recv_exact(conn, rows * dimension * _VECTOR_DTYPE.itemsize)
+    if data is None:
+        raise ConnectionError("Embedding server closed the connection")
+    return np.frombuffer(data, dtype=_VECTOR_DTYPE).reshape(rows, dimension).astype(np.float32)
+
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server: EmbeddingServer = self.server
+        while True:
+            try:
+                texts = _recv_request(self.request)
+            except (ValueError, UnicodeDecodeError) as e:
+                _send_error(self.request, str(e))
+                return  # The rest of the request is unread, so the connection is out of sync
+            if texts is None:
+                return
+
+            try:
+                with server.encode_slots:
+                    embeddings = server.embedder.encode(texts) if texts else np.empty((0, server.dimension), dtype=np.float32)
+            except Exception as e:
+                print(f"Error embedding {len(texts)} texts: {e}")
+                _send_error(self.request, str(e))
+                continue
+            _send_response(self.request, embeddings)
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves an embedding backend to other processes over a Unix domain socket,
+    so several uvicorn workers share one copy of the model.
+
+    Each client connection gets a thread, but at most `concurrency` encode
+    calls run at once, so CPU use stays at concurrency x the backend's
+    thread count however many workers are connected.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, embedder: EmbeddingBackend, concurrency: int = 1):
+        self.embedder = embedder
+        # Also warms up the model; empty requests are answered with this many columns
+        self.dimension = embedder.encode(["warm up"]).shape[1]
+        self.encode_slots = threading.BoundedSemaphore(max(1, concurrency))
+        if os.path.exists(socket_path):
+            # Left behind by a server that did not shut down cleanly, unless one is still listening
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+                raise OSError(f"An embedding server is already listening on {socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(socket_path)
+            finally:
+                probe.close()
+        super().__init__(socket_path, _EmbeddingRequestHandler)
+        os.chmod(socket_path, 0o600)  # Only processes of the same user may connect
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class RemoteEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeds through an EmbeddingServer instead of loading a model in this process.
+
+    Connections are pooled, so concurrent callers each use their own. A
+    connection that breaks (e.g. the server restarted) is replaced once
+    before the error is raised.
+    """
+
+    def __init__(self, socket_path: str, connect_timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout  # Seconds to wait for the server to come up
+        self._idle: List[socket.socket] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                conn.connect(self.socket_path)
+                return conn
+            except (FileNotFoundError, ConnectionRefusedError):
+                conn.close()
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(f"No embedding server listening on {self.socket_path}")
+                time.sleep(0.1)
+
+    def _acquire(self) -> socket.socket:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def _release(self, conn: socket.socket):
+        with self._lock:
+            self._idle.append(conn)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                _send_request(conn, texts)
+                embeddings = _recv_response(conn)
+            except RuntimeError:
+                conn.close()  # The server answered with an error and may have dropped the connection
+                raise
+            except OSError:
+                # After a server restart every pooled connection is dead, not just this one
+                conn.close()
+                self.close()
+                if attempt:
+                    raise
+                continue
+            self._release(conn)
+            return embeddings
+
+    def close(self):
+        """Close the pooled connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from config import config
+    from embeddings import create_embedding_backend
+
+    parser = argparse.ArgumentParser(description="Serve the embedding model to every uvicorn worker")
+    parser.add_argument("--socket", default=config.EMBEDDING_SERVER_SOCKET or "/tmp/ragchatbot-embeddings.sock")
+    parser.add_argument("--threads", type=int, default=config.EMBEDDING_THREADS,
+                        help="Inference threads per encode call (0 = library default)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Encode calls run at once")
+    args = parser.parse_args()
+
+    embedder = create_embedding_backend(config.EMBEDDING_BACKEND, config.EMBEDDING_MODEL,
+                                        config.EMBEDDING_ONNX_PATH, args.threads)
+    server = EmbeddingServer(args.socket, embedder, args.concurrency)
+    print(f"Serving {config.EMBEDDING_BACKEND} embeddings of {config.EMBEDDING_MODEL} on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,332 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_CONFIG_FILE = "embedding_config.json"
+
+
+class EmbeddingBackend(ABC):
+    """
+    Turns text into embedding vectors for the vector stores.
+
+    Implementations load their model when constructed and must be safe to
+    call from several threads at once.
+    """
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as a float32 array of shape (len(texts), dimension)"""
+
+    @contextmanager
+    def parallel(self, processes: int) -> Iterator[Callable[[List[str]], np.ndarray]]:
+        """
+        Yield an encode function that uses several processes while the context
+        is open (plain encode unless overridden). Only callers handed the
+        function use the processes; encode itself is unaffected.
+        """
+        yield self.encode
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Full-precision PyTorch inference through sentence-transformers"""
+
+    # Loaded models shared by every backend in the process, keyed by name
+    _models: Dict[str, Any] = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, model_name: str, batch_size: int = 32, threads: int = 0):
+        # Imported here because it pulls in torch
+        import sentence_transformers
+        import torch
+
+        if threads:
+            torch.set_num_threads(threads)  # Process-wide: the intra-op pool is shared by every model
+
+        with self._models_lock:
+            if model_name not in self._models:
+                self._models[model_name] = sentence_transformers.SentenceTransformer(model_name, device="cpu")
+            self.model = self._models[model_name]
+        self.batch_size = batch_size
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True,
+                                 show_progress_bar=False)
+
+    @contextmanager
+    def parallel(self, processes: int) -> Iterator[Callable[[List[str]], np.ndarray]]:
+        """Yield an encode function backed by a sentence-transformers multi-process pool"""
+        if processes < 2:
+            yield self.encode
+            return
+
+        pool = self.model.start_multi_process_pool(target_devices=["cpu"] * processes)
+        # The pool numbers each call's chunks from 0 on one shared output queue,
+        # so concurrent calls would receive each other's vectors
+        pool_lock = threading.Lock()
+
+        def encode_with_pool(texts: List[str]) -> np.ndarray:
+            with pool_lock:
+                return self.model.encode(texts, pool=pool, batch_size=min(len(texts), 64),
+                                         convert_to_numpy=True)
+
+        try:
+            yield encode_with_pool
+        finally:
+            self.model.stop_multi_process_pool(pool)
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """
+    ONNX Runtime inference of a model written by export_onnx_model().
+
+    Tokenization, mean pooling and normalization mirror the sentence-transformers
+    pipeline, so vectors stay interchangeable with SentenceTransformerBackend.
+    Only local files are read; nothing is downloaded at runtime.
+    """
+
+    def __init__(self, model_dir: str, batch_size: int = 32, threads: int = 0):
+        # Imported here because onnxruntime is an optional dependency (the onnx extra)
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE)) as f:
+            self.settings = json.load(f)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(self.settings["max_length"])
+        self.tokenizer.enable_padding(pad_id=self.settings["pad_id"], pad_token=self.settings["pad_token"])
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, ONNX_MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.batch_size = batch_size
+        self.dimension = self.settings["dimension"]
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        # Batch texts of similar length together so little of each batch is padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for offset in range(0, len(order), self.batch_size):
+            rows = order[offset:offset + self.batch_size]
+            embeddings[rows] = self._encode_batch([texts[i] for i in rows])
+        return embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feed = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": mask,
+        }
+        if "token_type_ids" in self.input_names:
+            feed["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+        token_embeddings = self.session.run(None, feed)[0]
+
+        # Mean over the real (unpadded) tokens
+        weights = mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        if self.settings["normalize"]:
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled
+
+
+class MicroBatchingEmbedder(EmbeddingBackend):
+    """
+    Encodes concurrent small encode calls (typically one query each) together.
+
+    Texts are queued for a background thread that encodes them in one call
+    and hands each caller its vectors. Texts arriving during an encode form
+    the next batch; once several are queued it also waits up to max_wait
+    seconds for more, or until max_batch_size are queued. A lone query is
+    encoded at once. Calls of max_batch_size texts or more, such as
+    ingestion batches, go straight to the wrapped backend. If a batch fails,
+    its texts are retried one by one so only the failing callers see the error.
+    """
+
+    def __init__(self, embedder: EmbeddingBackend, max_batch_size: int = 32, max_wait: float = 0.005):
+        self.embedder = embedder
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, Future]] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None  # Started on first use, after any worker fork
+        self.batches = 0
+        self.texts = 0
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts or len(texts) >= self.max_batch_size:
+            return self.embedder.encode(texts)
+
+        futures = [Future() for _ in texts]
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+            self._pending.extend(zip(texts, futures))
+            self._condition.notify()
+        return np.array([future.result() for future in futures], dtype=np.float32)
+
+    def _next_batch(self) -> List[Tuple[str, Future]]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            # A lone query under light load is encoded at once; only linger when others are arriving
+            deadline = time.monotonic() + (self.max_wait if len(self._pending) > 1 else 0)
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._encode_batch(batch)
+            except BaseException as e:
+                # The thread must survive: later callers would wait on their futures forever
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _encode_batch(self, batch: List[Tuple[str, Future]]):
+        # Concurrent requests often ask for the same text; encode it once
+        unique = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = self.embedder.encode(unique)
+        except Exception:
+            # Encode each text alone so one bad text fails only the callers that sent it
+            vectors = self._encode_each(unique)
+        else:
+            if len(embeddings) != len(unique):
+                raise RuntimeError(f"Embedding backend returned {len(embeddings)} vectors for {len(unique)} texts")
+            vectors = dict(zip(unique, embeddings))
+        for text, future in batch:
+            if isinstance(vectors[text], Exception):
+                future.set_exception(vectors[text])
+            else:
+                future.set_result(vectors[text])
+        self.batches += 1
+        self.texts += len(batch)
+
+    def _encode_each(self, texts: List[str]) -> Dict[str, Any]:
+        """Map each text to its vector, or to the exception raised while encoding it"""
+        results = {}
+        for text in texts:
+            try:
+                results[text] = self.embedder.encode([text])[0]
+            except Exception as e:
+                results[text] = e
+        return results
+
+    def parallel(self, processes: int):
+        return self.embedder.parallel(processes)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batches encoded and texts per batch"""
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+def create_embedding_backend(backend: str, model_name: str, onnx_path: Optional[str] = None,
+                             threads: int = 0) -> EmbeddingBackend:
+    """Build the embedding backend named by backend ("torch" or "onnx")"""
+    if backend == "torch":
+        return SentenceTransformerBackend(model_name, threads=threads)
+    if backend == "onnx":
+        if not onnx_path or not os.path.exists(os.path.join(onnx_path, ONNX_MODEL_FILE)):
+            raise ValueError(f"No exported ONNX model at {onnx_path}; "
+                             f"run `python embeddings.py {model_name} --output {onnx_path}` first")
+        return OnnxEmbeddingBackend(onnx_path, threads=threads)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = True) -> Dict[str, Any]:
+    """
+    Export a sentence-transformers model to ONNX for OnnxEmbeddingBackend.
+
+    Args:
+        model_name: sentence-transformers model name or local path
+        output_dir: Directory for model.onnx, the tokenizer and pooling settings
+        quantize: Quantize the weights to int8 (dynamic quantization)
+
+    Returns:
+        The pooling settings written next to the model
+    """
+    # Export-time only: needs torch and the onnx extra, never imported by the server
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    model = SentenceTransformer(model_name, device="cpu")
+    pooling = [module for module in model if isinstance(module, Pooling)]
+    if len(pooling) != 1 or pooling[0].get_pooling_mode_str() != "mean":
+        raise ValueError(f"{model_name} does not use mean pooling, which is all the ONNX backend implements")
+
+    tokenizer = model.tokenizer
+    transformer = model[0].auto_model.eval()
+    sample = tokenizer(["warm up", "export a sentence embedding model"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["token_embeddings"]}
+
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    float_path = model_path + ".float32" if quantize else model_path
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            float_path,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17
+        )
+    if quantize:
+        quantize_dynamic(float_path, model_path, weight_type=QuantType.QInt8)
+        os.remove(float_path)
+
+    tokenizer.save_pretrained(output_dir)  # Writes tokenizer.json, read by the tokenizers library
+    settings = {
+        "model_name": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "max_length": model.max_seq_length,
+        "normalize": any(isinstance(module, Normalize) for module in model),
+        "pad_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token,
+        "quantized": quantize,
+    }
+    with open(os.path.join(output_dir, ONNX_CONFIG_FILE), "w") as f:
+        json.dump(settings, f, indent=2)
+    return settings
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export an embedding model for EMBEDDING_BACKEND=onnx")
+    parser.add_argument("model", nargs="?", default="all-MiniLM-L6-v2")
+    parser.add_argument("--output", default="./models/all-MiniLM-L6-v2-onnx-int8")
+    parser.add_argument("--no-quantize", action="store_true", help="Keep float32 weights")
+    args = parser.parse_args()
+    print(json.dumps(export_onnx_model(args.model, args.output, quantize=not args.no_quantize), indent=2))
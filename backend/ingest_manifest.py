@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+
+@dataclass
+class FileFingerprint:
+    """What we know about an ingested file the last time it was indexed"""
+    mtime_ns: int
+    size: int
+    sha256: str
+    course_title: Optional[str] = None
+    chunk_count: int = 0
+
+
+def hash_file(file_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """
+    Persisted record of ingested files, keyed by absolute path.
+
+    Lets ingestion skip files whose size and mtime are unchanged without
+    reading them, and files whose content hash is unchanged without parsing them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, FileFingerprint] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load the manifest from disk (missing or corrupt files start empty)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                raw = json.load(file)
+            self._entries = {path: FileFingerprint(**entry) for path, entry in raw.items()}
+        except FileNotFoundError:
+            self._entries = {}
+        except Exception as e:
+            print(f"Error loading ingest manifest {self.path}: {e}")
+            self._entries = {}
+
+    def save(self):
+        """Atomically write the manifest to disk"""
+        with self._lock:
+            raw = {path: asdict(entry) for path, entry in self._entries.items()}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(raw, file, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, file_path: str) -> Optional[FileFingerprint]:
+        """Get the recorded fingerprint for a file"""
+        return self._entries.get(os.path.abspath(file_path))
+
+    def record(self, file_path: str, fingerprint: FileFingerprint):
+        """Record the fingerprint of a successfully ingested file"""
+        with self._lock:
+            self._entries[os.path.abspath(file_path)] = fingerprint
+
+    def remove(self, file_path: str) -> Optional[FileFingerprint]:
+        """Forget a file"""
+        with self._lock:
+            return self._entries.pop(os.path.abspath(file_path), None)
+
+    def paths_under(self, folder_path: str) -> List[str]:
+        """Recorded file paths that live directly in a folder"""
+        folder = os.path.abspath(folder_path)
+        return [path for path in self._entries if os.path.dirname(path) == folder]
+
+    def paths_for_course(self, course_title: str) -> List[str]:
+        """Recorded file paths that produced a course"""
+        return [path for path, entry in self._entries.items() if entry.course_title == course_title]
+
+    def clear(self):
+        """Forget every file"""
+        with self._lock:
+            self._entries = {}
@@ -0,0 +1,318 @@
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Words plus dotted/underscored/hyphenated identifiers such as tool_use or messages.create
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._\-/][a-z0-9]+)*")
+COMPOUND_SEPARATORS = re.compile(r"[._\-/]")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from has have how i if in into is it its "
+    "of on or our so that the their then there these they this to was we were what "
+    "when which will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens without stopwords. Compound identifiers are kept
+    whole and also split into their parts, so both "tool_use" and "tool" match.
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in COMPOUND_SEPARATORS.split(token)
+                          if part and part not in STOPWORDS)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists by summing 1 / (k + rank) per list.
+
+    Returns:
+        (id, fused score) pairs, best first; ties keep first-seen order
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 inverted index over course content chunks.
+
+    Postings are compact arrays (document number, term frequency) per term;
+    scoring runs in numpy over the postings of the query terms only.
+    Removed chunks are tombstoned and dropped when the index is compacted,
+    which happens on save once they make up a large share of it.
+    """
+
+    FORMAT_VERSION = 1
+    NO_LESSON = -1   # lesson_number stored for chunks without one
+    REMOVED = -1     # course number marking a removed chunk
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._postings: Dict[str, Tuple[array, array]] = {}  # term -> (doc numbers, term frequencies)
+        self._chunk_ids: List[Optional[str]] = []            # doc number -> chunk id
+        self._doc_numbers: Dict[str, int] = {}               # chunk id -> doc number
+        self._lengths = array('I')                           # doc number -> token count
+        self._courses = array('i')                           # doc number -> course number (REMOVED if deleted)
+        self._lessons = array('i')                           # doc number -> lesson number (NO_LESSON if none)
+        self._course_names: List[str] = []
+        self._course_numbers: Dict[str, int] = {}
+        self._total_length = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._doc_numbers)
+
+    def add(self, chunk_id: str, text: str, course_title: str, lesson_number: Optional[int]):
+        """Index a chunk, replacing any chunk with the same id"""
+        self.add_many([(chunk_id, text, course_title, lesson_number)])
+
+    def add_many(self, chunks: Iterable[Tuple[str, str, str, Optional[int]]]):
+        """Index (chunk id, text, course title, lesson number) tuples, replacing existing ids"""
+        # Tokenize outside the lock; it is the expensive part
+        prepared = [(chunk_id, Counter(tokenize(text)), course_title, lesson_number)
+                    for chunk_id, text, course_title, lesson_number in chunks]
+        with self._lock:
+            for chunk_id, counts, course_title, lesson_number in prepared:
+                if chunk_id in self._doc_numbers:
+                    self._remove_doc(chunk_id)
+                self._add_doc(chunk_id, counts, course_title, lesson_number)
+            self.dirty = True
+
+    def _add_doc(self, chunk_id: str, counts: Counter, course_title: str, lesson_number: Optional[int]):
+        doc = len(self._chunk_ids)
+        for term, frequency in counts.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = (array('I'), array('B'))
+            posting[0].append(doc)
+            posting[1].append(min(frequency, 255))
+
+        course = self._course_numbers.get(course_title)
+        if course is None:
+            course = self._course_numbers[course_title] = len(self._course_names)
+            self._course_names.append(course_title)
+
+        length = sum(counts.values())
+        self._chunk_ids.append(chunk_id)
+        self._doc_numbers[chunk_id] = doc
+        self._lengths.append(length)
+        self._courses.append(course)
+        self._lessons.append(self.NO_LESSON if lesson_number is None else lesson_number)
+        self._total_length += length
+
+    def _remove_doc(self, chunk_id: str):
+        doc = self._doc_numbers.pop(chunk_id)
+        self._chunk_ids[doc] = None
+        self._courses[doc] = self.REMOVED
+        self._total_length -= self._lengths[doc]
+
+    def remove(self, chunk_ids: Iterable[str]):
+        """Remove chunks by id (unknown ids are ignored)"""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                if chunk_id in self._doc_numbers:
+                    self._remove_doc(chunk_id)
+                    self.dirty = True
+
+    def remove_course(self, course_title: str):
+        """Remove every chunk of a course"""
+        with self._lock:
+            course = self._course_numbers.get(course_title)
+            if course is None:
+                return
+            courses = np.frombuffer(self._courses, dtype=np.int32)
+            docs = np.flatnonzero(courses == course).tolist()
+            del courses
+            for doc in docs:
+                self._remove_doc(self._chunk_ids[doc])
+            self.dirty = self.dirty or bool(docs)
+
+    def clear(self):
+        """Drop every chunk"""
+        with self._lock:
+            self._reset()
+            self.dirty = True
+
+    def search(self, query: str, limit: int,
+               course_title: Optional[str] = None,
+               lesson_number: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Rank chunks by BM25 against the query, optionally within one course and/or lesson.
+
+        Returns:
+            (chunk id, score) pairs, best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            live = len(self._doc_numbers)
+            if not terms or not live or limit <= 0:
+                return []
+            course = None
+            if course_title is not None:
+                course = self._course_numbers.get(course_title)
+                if course is None:
+                    return []
+
+            # Views over the arrays must not outlive the lock, since appends may reallocate them
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+            courses = np.frombuffer(self._courses, dtype=np.int32)
+            lessons = np.frombuffer(self._lessons, dtype=np.int32)
+            average_length = self._total_length / live
+
+            doc_parts, score_parts = [], []
+            for term in terms:
+                posting = self._postings.get(term)
+                if posting is None:
+                    continue
+                docs = np.frombuffer(posting[0], dtype=np.uint32)
+                frequencies = np.frombuffer(posting[1], dtype=np.uint8).astype(np.float32)
+                idf = math.log(1 + (live - len(docs) + 0.5) / (len(docs) + 0.5))
+                norms = self.k1 * (1 - self.b + self.b * lengths[docs] / average_length)
+                doc_parts.append(docs)
+                score_parts.append(idf * frequencies * (self.k1 + 1) / (frequencies + norms))
+            if not doc_parts:
+                return []
+
+            # Concatenating copies the postings, so no view into them escapes the lock
+            docs = np.concatenate(doc_parts)
+            scores = np.concatenate(score_parts)
+            del doc_parts
+            keep = courses[docs] != self.REMOVED if course is None else courses[docs] == course
+            if lesson_number is not None:
+                keep &= lessons[docs] == lesson_number
+            docs, scores = docs[keep], scores[keep]
+            del lengths, courses, lessons
+            chunk_ids = self._chunk_ids
+
+            if not len(docs):
+                return []
+            unique_docs, inverse = np.unique(docs, return_inverse=True)
+            totals = np.bincount(inverse, weights=scores)
+            if len(totals) > limit:
+                top = np.argpartition(-totals, limit - 1)[:limit]
+            else:
+                top = np.arange(len(totals))
+            top = top[np.argsort(-totals[top], kind="stable")]
+            return [(chunk_ids[unique_docs[i]], float(totals[i])) for i in top]
+
+    def _compact(self):
+        """Drop removed chunks from the postings and renumber the rest (lock held)"""
+        courses = np.frombuffer(self._courses, dtype=np.int32)
+        alive = courses != self.REMOVED
+        if alive.all():
+            return
+        renumber = np.full(len(alive), -1, dtype=np.int64)
+        renumber[alive] = np.arange(int(alive.sum()))
+
+        postings = {}
+        for term, (docs, frequencies) in self._postings.items():
+            old_docs = np.frombuffer(docs, dtype=np.uint32)
+            keep = alive[old_docs]
+            if not keep.any():
+                continue
+            new_docs, new_frequencies = array('I'), array('B')
+            new_docs.frombytes(renumber[old_docs[keep]].astype(np.uint32).tobytes())
+            new_frequencies.frombytes(np.frombuffer(frequencies, dtype=np.uint8)[keep].tobytes())
+            postings[term] = (new_docs, new_frequencies)
+
+        def kept(values: array, dtype) -> array:
+            compacted = array(values.typecode)
+            compacted.frombytes(np.frombuffer(values, dtype=dtype)[alive].tobytes())
+            return compacted
+
+        lengths = kept(self._lengths, np.uint32)
+        lesson_numbers = kept(self._lessons, np.int32)
+        course_numbers = kept(self._courses, np.int32)
+        del courses
+        self._postings = postings
+        self._lengths, self._lessons, self._courses = lengths, lesson_numbers, course_numbers
+        self._chunk_ids = [chunk_id for chunk_id in self._chunk_ids if chunk_id is not None]
+        self._doc_numbers = {chunk_id: doc for doc, chunk_id in enumerate(self._chunk_ids)}
+
+    def save(self, compact_ratio: float = 0.2):
+        """
+        Atomically write the index to its path, compacting first if more than
+        compact_ratio of the indexed chunks have been removed.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            removed = len(self._chunk_ids) - len(self._doc_numbers)
+            if removed and removed > compact_ratio * len(self._chunk_ids):
+                self._compact()
+            state = {
+                "version": self.FORMAT_VERSION,
+                "postings": self._postings,
+                "chunk_ids": self._chunk_ids,
+                "lengths": self._lengths,
+                "courses": self._courses,
+                "lessons": self._lessons,
+                "course_names": self._course_names,
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as file:
+                pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def load(self) -> bool:
+        """
+        Load the index from its path.
+
+        Returns:
+            True if a saved index was loaded (missing or unreadable files leave it empty)
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'rb') as file:
+                state = pickle.load(file)
+            if state.get("version") != self.FORMAT_VERSION:
+                return False
+        except Exception as e:
+            print(f"Error loading lexical index {self.path}: {e}")
+            return False
+
+        with self._lock:
+            self._reset()
+            self._postings = state["postings"]
+            self._chunk_ids = state["chunk_ids"]
+            self._lengths = state["lengths"]
+            self._courses = state["courses"]
+            self._lessons = state["lessons"]
+            self._course_names = state["course_names"]
+            self._course_numbers = {name: number for number, name in enumerate(self._course_names)}
+            self._doc_numbers = {chunk_id: doc for doc, chunk_id in enumerate(self._chunk_ids)
+                                 if chunk_id is not None}
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+            alive = np.frombuffer(self._courses, dtype=np.int32) != self.REMOVED
+            self._total_length = int(lengths[alive].sum())
+            del lengths, alive
+        return True
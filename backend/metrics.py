@@ -0,0 +1,96 @@
+from typing import Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily
+from prometheus_client.registry import Collector
+
+# From cache hits and single embeddings (~1 ms) up to long Claude answers
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+QUERY_SECONDS = Histogram(
+    "rag_query_seconds", "RAGSystem.query / query_stream time, including answer cache hits",
+    ["mode"], buckets=LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds", "Time spent in each stage of answering a query",
+    ["stage"], buckets=LATENCY_BUCKETS
+)
+CLAUDE_SECONDS = Histogram(
+    "rag_claude_request_seconds", "Messages API call time, streamed calls until their final message",
+    ["call"], buckets=LATENCY_BUCKETS
+)
+TOOL_CALLS = Counter("rag_tool_calls_total", "Tool invocations requested by Claude", ["tool"])
+
+INGESTED_CHUNKS = Counter("rag_ingested_chunks_total", "Chunks embedded and stored by add_course_folder")
+INGESTED_COURSES = Counter("rag_ingested_courses_total", "Courses added or updated by add_course_folder")
+INGEST_SECONDS = Histogram(
+    "rag_ingest_seconds", "add_course_folder run time",
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+)
+INGEST_CHUNKS_PER_SECOND = Gauge(
+    "rag_ingest_chunks_per_second", "Throughput of the last add_course_folder run that wrote chunks"
+)
+
+# Bound once, so the hot path skips the label lookup
+QUERY = QUERY_SECONDS.labels("query")
+QUERY_STREAM = QUERY_SECONDS.labels("stream")
+SESSION_LOOKUP = STAGE_SECONDS.labels("session_lookup")
+ANSWER_CACHE_LOOKUP = STAGE_SECONDS.labels("answer_cache")
+EMBEDDING = STAGE_SECONDS.labels("embedding")
+COURSE_RESOLUTION = STAGE_SECONDS.labels("course_resolution")
+VECTOR_QUERY = STAGE_SECONDS.labels("vector_query")
+LEXICAL_QUERY = STAGE_SECONDS.labels("lexical_query")
+RERANK = STAGE_SECONDS.labels("rerank")
+FORMAT = STAGE_SECONDS.labels("format")
+CLAUDE_ANSWER = CLAUDE_SECONDS.labels("answer")
+CLAUDE_TOOL_FOLLOWUP = CLAUDE_SECONDS.labels("tool_followup")
+CLAUDE_SUMMARY = CLAUDE_SECONDS.labels("summary")
+
+
+class RAGSystemCollector(Collector):
+    """
+    Exports the counters RAGSystem already keeps (cache hits, Anthropic token
+    usage, re-ranking and embedding batches) when /metrics is scraped, so
+    they cost nothing on the query path.
+    """
+
+    def __init__(self, rag_system):
+        self.rag_system = rag_system
+
+    def describe(self):
+        return []  # Nothing to check at registration; the names are fixed
+
+    def collect(self) -> Iterator[CounterMetricFamily]:
+        stats = self.rag_system.get_cache_stats()
+
+        lookups = CounterMetricFamily("rag_cache_lookups", "Cache lookups by cache and result",
+                                      labels=["cache", "result"])
+        for cache in ("query_embeddings", "tool_results"):
+            if stats[cache]:
+                lookups.add_metric([cache, "hit"], stats[cache]["hits"])
+                lookups.add_metric([cache, "miss"], stats[cache]["misses"])
+        if stats["answers"]:
+            lookups.add_metric(["answers", "exact_hit"], stats["answers"]["exact_hits"])
+            lookups.add_metric(["answers", "semantic_hit"], stats["answers"]["semantic_hits"])
+            lookups.add_metric(["answers", "miss"], stats["answers"]["misses"])
+        yield lookups
+
+        tokens = CounterMetricFamily("rag_anthropic_tokens", "Token usage reported by the Messages API",
+                                     labels=["type"])
+        for key, value in stats["prompt"].items():
+            if key.endswith("_tokens"):
+                tokens.add_metric([key[:-len("_tokens")]], value)
+        yield tokens
+
+        if stats["reranker"]:
+            reranks = CounterMetricFamily("rag_rerank_queries", "Queries re-ranked or left in vector order",
+                                          labels=["outcome"])
+            reranks.add_metric(["reranked"], stats["reranker"]["reranked"])
+            reranks.add_metric(["fallback"], stats["reranker"]["fallbacks"])
+            yield reranks
+
+        if stats["embedding_batches"]:
+            yield CounterMetricFamily("rag_embedding_batches", "Micro-batches of query embeddings encoded",
+                                      value=stats["embedding_batches"]["batches"])
+            yield CounterMetricFamily("rag_embedding_batched_texts", "Query embeddings encoded in micro-batches",
+                                      value=stats["embedding_batches"]["texts"])
@@ -0,0 +1,555 @@
+import io
+import os
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from embeddings import EmbeddingBackend, SentenceTransformerBackend
+from models import Course
+from vector_store import VectorStore
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so keep to a single writer
+    fcntl = None
+
+
+def _append_column(column: np.ndarray, size: int, values: List[int]) -> np.ndarray:
+    """Write values after the first size entries, growing the buffer geometrically when full"""
+    needed = size + len(values)
+    if needed > len(column):
+        grown = np.empty(max(needed, 2 * len(column), 1024), dtype=column.dtype)
+        grown[:size] = column[:size]
+        column = grown
+    column[size:needed] = values
+    return column
+
+
+def _file_stamp(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Identity of a file's current contents (replacing or rewriting it changes the stamp)"""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class _Snapshot(NamedTuple):
+    """Consistent view of the store for one search, taken under the lock"""
+    size: int
+    segments: List[np.ndarray]   # Row blocks in order: the memory-mapped file, then unsaved batches
+    courses: np.ndarray
+    lessons: np.ndarray
+    chunk_indexes: np.ndarray
+    ids: List[Optional[str]]
+    documents: List[Optional[str]]
+    hashes: List[Optional[str]]
+    course_names: List[str]
+    course_numbers: Dict[str, int]
+    removed: int
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Brute-force vector storage in a memory-mapped .npy matrix.
+
+    Embeddings are normalized and kept as rows of one matrix, with course,
+    lesson and chunk index in parallel numpy columns, so a filtered top-k is
+    a vectorized dot product over the matching rows plus argpartition.
+    Flushed rows are memory-mapped read-only, which lets every worker process
+    share the same pages. Writes stay in memory until flush(), which appends
+    them to the file in place, or rewrites it once removed rows pile up.
+
+    One process should write at a time; the others pick up its flushed
+    changes on their next search. Distances are squared L2 between unit
+    vectors (2 - 2 * cosine), the scale Chroma reports.
+    """
+
+    FORMAT_VERSION = 1
+    NO_LESSON = -1          # lesson_number stored for chunks without one
+    REMOVED = -1            # course number marking a removed row
+    COMPACT_RATIO = 0.2     # Share of removed rows that makes a flush rewrite the matrix
+    REFRESH_INTERVAL = 1.0  # Seconds between checks for changes flushed by other processes
+    SCORE_BLOCK = 65536     # Rows converted to float32 at a time when scoring float16 storage
+
+    def __init__(self, store_path: str, embedding_model: str, max_results: int = 5,
+                 embedding_cache_size: int = 1024, embedding_cache_ttl: Optional[float] = None,
+                 course_match_max_distance: float = 1.3, embedding_batch_size: int = 256,
+                 lexical_index_path: Optional[str] = None, hybrid_candidates: int = 20,
+                 rrf_k: int = 60, dtype: str = "float32", embedder: Optional[EmbeddingBackend] = None):
+        self.path = store_path
+        self.dtype = np.dtype(dtype)  # Storage precision: float32, or float16 to halve the matrix
+
+        # Vectors are normalized on the way in, so a dot product is the cosine similarity
+        self.embedder = embedder or SentenceTransformerBackend(embedding_model)
+
+        self._lock = threading.RLock()
+        self._last_refresh = time.monotonic()
+        os.makedirs(store_path, exist_ok=True)
+        self._load()
+
+        self._setup(max_results, embedding_cache_size, embedding_cache_ttl, course_match_max_distance,
+                    embedding_batch_size, lexical_index_path, hybrid_candidates, rrf_k)
+        self._lexical_stamp = _file_stamp(lexical_index_path)
+
+    def _reset(self):
+        self._saved: Optional[np.ndarray] = None   # Memory-mapped flushed rows
+        self._pending: List[np.ndarray] = []       # Row batches written since the last flush
+        self._saved_rows = 0
+        self._size = 0                             # Rows, including removed ones
+        self._removed = 0
+        self._ids: List[Optional[str]] = []        # row -> chunk id (None once removed)
+        self._documents: List[Optional[str]] = []
+        self._hashes: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}            # chunk id -> row
+        self._courses = np.empty(0, dtype=np.int32)        # row -> course number (REMOVED if deleted)
+        self._lessons = np.empty(0, dtype=np.int32)        # row -> lesson number (NO_LESSON if none)
+        self._chunk_indexes = np.empty(0, dtype=np.int32)  # row -> chunk_index
+        self._course_names: List[str] = []
+        self._course_numbers: Dict[str, int] = {}
+        self._catalog: Dict[str, Tuple[Dict[str, Any], np.ndarray]] = {}  # title -> (metadata, embedding)
+        self._catalog_matrix: Optional[Tuple[List[str], np.ndarray]] = None
+        self._file_generation = 0                  # Suffix of the current vectors file
+        self._disk_stamp = None                    # Stamp of the columns file this state came from
+        self._dirty = False
+        self._needs_rewrite = False
+
+    def _columns_path(self) -> str:
+        return os.path.join(self.path, "columns.pkl")
+
+    def _vectors_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"vectors-{generation}.npy")
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Scale rows to unit length (zero rows stay zero)"""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    # Persistence
+
+    def _load(self):
+        """Replace the in-memory state with the last flushed store (empty if there is none)"""
+        self._reset()
+        stamp = _file_stamp(self._columns_path())
+        if stamp is None:
+            return
+        try:
+            with open(self._columns_path(), 'rb') as file:
+                state = pickle.load(file)
+            if state.get("version") != self.FORMAT_VERSION:
+                print(f"Ignoring vector store {self.path} written in an older format")
+                return
+            rows = state["rows"]
+            saved = None
+            if rows:
+                saved = np.load(self._vectors_path(state["file_generation"]), mmap_mode="r")[:rows]
+        except Exception as e:
+            print(f"Error loading vector store {self.path}: {e}")
+            return
+
+        self._saved = saved
+        self._saved_rows = self._size = rows
+        self._ids = state["ids"]
+        self._documents = state["documents"]
+        self._hashes = state["hashes"]
+        self._courses = state["courses"]
+        self._lessons = state["lessons"]
+        self._chunk_indexes = state["chunk_indexes"]
+        self._course_names = state["course_names"]
+        self._course_numbers = {name: number for number, name in enumerate(self._course_names)}
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids) if chunk_id is not None}
+        self._removed = rows - len(self._rows)
+        self._catalog = state["catalog"]
+        self._file_generation = state["file_generation"]
+        self._disk_stamp = stamp
+        # Stored at another precision - convert on the next flush
+        if saved is not None and saved.dtype != self.dtype:
+            self._needs_rewrite = self._dirty = True
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the store directory across processes (where supported)"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.path, "store.lock"), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def flush(self):
+        """
+        Write rows and metadata changed since the last flush, then the lexical
+        index.
+        
+        Raises:
+            RuntimeError: Another process flushed in the meantime. Its store is
+                loaded instead and the local changes are dropped, so callers
+                must not record them as stored.
+        """
+        with self._lock:
+            if self._dirty:
+                with self._file_lock():
+                    if _file_stamp(self._columns_path()) != self._disk_stamp:
+                        self._reload()
+                        raise RuntimeError(f"Vector store {self.path} was changed by another process; "
+                                           f"unflushed writes were dropped and the store reloaded")
+                    self._save()
+        super().flush()
+        if self.lexical_index is not None:
+            self._lexical_stamp = _file_stamp(self.lexical_index.path)
+
+    def _save(self):
+        """Persist the vectors, then the columns file that commits them (both locks held)"""
+        if self._needs_rewrite or self._removed > self.COMPACT_RATIO * self._size:
+            self._rewrite_vectors()
+        elif self._size > self._saved_rows and not self._append_vectors():
+            self._rewrite_vectors()
+
+        state = {
+            "version": self.FORMAT_VERSION,
+            "file_generation": self._file_generation,
+            "rows": self._size,
+            "ids": self._ids,
+            "documents": self._documents,
+            "hashes": self._hashes,
+            "courses": self._courses[:self._size].copy(),
+            "lessons": self._lessons[:self._size].copy(),
+            "chunk_indexes": self._chunk_indexes[:self._size].copy(),
+            "course_names": self._course_names,
+            "catalog": self._catalog,
+        }
+        tmp_path = f"{self._columns_path()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._columns_path())
+        self._disk_stamp = _file_stamp(self._columns_path())
+
+        # Serve flushed rows from the page cache rather than private memory
+        vectors_path = self._vectors_path(self._file_generation)
+        self._saved = np.load(vectors_path, mmap_mode="r")[:self._size] if self._size else None
+        self._pending = []
+        self._saved_rows = self._size
+        self._dirty = self._needs_rewrite = False
+
+        # Other processes keep their mappings of replaced files until they reload
+        for name in os.listdir(self.path):
+            if name.startswith("vectors-") and os.path.join(self.path, name) != vectors_path:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError as e:
+                    print(f"Error removing stale vectors file {name}: {e}")
+
+    def _append_vectors(self) -> bool:
+        """
+        Append unsaved rows to the current vectors file in place, rewriting
+        only its header's shape. Returns False if the file cannot be extended.
+        """
+        if self._saved is None or self._saved.dtype != self.dtype:
+            return False
+        dim = self._saved.shape[1]
+        with open(self._vectors_path(self._file_generation), 'r+b') as file:
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+                write_header = np.lib.format.write_array_header_1_0
+            elif version == (2, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+                write_header = np.lib.format.write_array_header_2_0
+            else:
+                return False
+            data_start = file.tell()
+            header = io.BytesIO()
+            write_header(header, {
+                "descr": np.lib.format.dtype_to_descr(dtype),
+                "fortran_order": False,
+                "shape": (self._size, dim),
+            })
+            # numpy pads headers so the row count can grow in place; bail out if it cannot
+            if fortran_order or dtype != self.dtype or len(header.getvalue()) != data_start:
+                return False
+
+            # Seek past the committed rows, overwriting anything a failed flush left behind
+            file.seek(data_start + self._saved_rows * dim * dtype.itemsize)
+            for batch in self._pending:
+                file.write(np.ascontiguousarray(batch, dtype=self.dtype).tobytes())
+            file.truncate()
+            file.seek(0)
+            file.write(header.getvalue())
+        return True
+
+    def _rewrite_vectors(self):
+        """Write the live rows to a new vectors file and drop removed rows from the columns"""
+        alive = self._courses[:self._size] != self.REMOVED
+        live = int(alive.sum())
+        segments = ([self._saved] if self._saved is not None else []) + self._pending
+        self._file_generation += 1
+        if live:
+            output = np.lib.format.open_memmap(self._vectors_path(self._file_generation), mode="w+",
+                                               dtype=self.dtype, shape=(live, segments[0].shape[1]))
+            written, start = 0, 0
+            for segment in segments:
+                keep = alive[start:start + len(segment)]
+                count = int(keep.sum())
+                output[written:written + count] = segment[keep]
+                written += count
+                start += len(segment)
+            output.flush()
+            del output
+
+        self._ids = [chunk_id for chunk_id in self._ids if chunk_id is not None]
+        self._documents = [document for document, keep in zip(self._documents, alive) if keep]
+        self._hashes = [content_hash for content_hash, keep in zip(self._hashes, alive) if keep]
+        self._courses = self._courses[:self._size][alive]
+        self._lessons = self._lessons[:self._size][alive]
+        self._chunk_indexes = self._chunk_indexes[:self._size][alive]
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._size, self._removed, self._saved_rows = live, 0, 0
+        self._saved, self._pending = None, []
+
+    def _reload(self):
+        """Pick up a store flushed by another process, together with its catalog and lexical index"""
+        self._load()
+        self.catalog_index.load(self._catalog_records())
+        if self.lexical_index is not None:
+            self.lexical_index.load()
+            self._lexical_stamp = _file_stamp(self.lexical_index.path)
+        self._bump_generation()
+
+    def _refresh(self):
+        """Reload anything other processes have flushed, checking at most every REFRESH_INTERVAL"""
+        now = time.monotonic()
+        if now - self._last_refresh < self.REFRESH_INTERVAL:
+            return
+        self._last_refresh = now
+        with self._lock:
+            if not self._dirty and _file_stamp(self._columns_path()) != self._disk_stamp:
+                self._reload()
+            elif self.lexical_index is not None and not self.lexical_index.dirty:
+                stamp = _file_stamp(self.lexical_index.path)
+                if stamp != self._lexical_stamp:
+                    self.lexical_index.load()
+                    self._lexical_stamp = stamp
+
+    # Reads
+
+    def _snapshot(self) -> _Snapshot:
+        with self._lock:
+            size = self._size
+            return _Snapshot(
+                size=size,
+                segments=([self._saved] if self._saved is not None else []) + self._pending,
+                courses=self._courses[:size],
+                lessons=self._lessons[:size],
+                chunk_indexes=self._chunk_indexes[:size],
+                ids=self._ids,
+                documents=self._documents,
+                hashes=self._hashes,
+                course_names=self._course_names,
+                course_numbers=self._course_numbers,
+                removed=self._removed
+            )
+
+    def _metadata(self, snapshot: _Snapshot, row: int) -> Dict[str, Any]:
+        """Chroma-style metadata for a row"""
+        metadata = {
+            "course_title": snapshot.course_names[snapshot.courses[row]],
+            "chunk_index": int(snapshot.chunk_indexes[row]),
+            "content_hash": snapshot.hashes[row],
+        }
+        if snapshot.lessons[row] != self.NO_LESSON:
+            metadata["lesson_number"] = int(snapshot.lessons[row])
+        return metadata
+
+    def _dot(self, vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Dot product of every row with the query, in float32"""
+        if vectors.dtype == np.float32:
+            return vectors @ query
+        return np.concatenate([
+            vectors[start:start + self.SCORE_BLOCK].astype(np.float32) @ query
+            for start in range(0, len(vectors), self.SCORE_BLOCK)
+        ] or [np.empty(0, dtype=np.float32)])
+
+    def _scores(self, snapshot: _Snapshot, query: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Similarity of the query to every row, or only to the given sorted rows"""
+        if rows is None:
+            return np.concatenate([self._dot(segment, query) for segment in snapshot.segments])
+        parts, start = [], 0
+        for segment in snapshot.segments:
+            end = start + len(segment)
+            low, high = np.searchsorted(rows, [start, end])
+            if high > low:
+                # Fancy indexing reads only the selected rows from the mapped file
+                parts.append(self._dot(segment[rows[low:high] - start], query))
+            start = end
+        return np.concatenate(parts)
+
+    def _query_content(self, query_embedding, n_results: int, course_title: Optional[str],
+                       lesson_number: Optional[int]) -> List[Tuple[str, str, Dict[str, Any], float]]:
+        self._refresh()
+        snapshot = self._snapshot()
+        if not snapshot.size or n_results <= 0:
+            return []
+
+        rows = None
+        if course_title is not None or lesson_number is not None or snapshot.removed:
+            if course_title is None:
+                mask = snapshot.courses != self.REMOVED
+            else:
+                course = snapshot.course_numbers.get(course_title)
+                if course is None:
+                    return []
+                mask = snapshot.courses == course
+            if lesson_number is not None:
+                mask &= snapshot.lessons == lesson_number
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                return []
+
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32))
+        scores = self._scores(snapshot, query, rows)
+        k = min(n_results, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        hits = []
+        for position in top:
+            row = int(position if rows is None else rows[position])
+            chunk_id = snapshot.ids[row]
+            if chunk_id is None:  # Removed while we were scoring
+                continue
+            distance = max(0.0, 2.0 - 2.0 * float(scores[position]))
+            hits.append((chunk_id, snapshot.documents[row], self._metadata(snapshot, row), distance))
+        return hits
+
+    def _get_content(self, chunk_ids: List[str]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        with self._lock:
+            snapshot = self._snapshot()
+            rows = [(chunk_id, self._rows.get(chunk_id)) for chunk_id in chunk_ids]
+        return [(chunk_id, snapshot.documents[row], self._metadata(snapshot, row))
+                for chunk_id, row in rows if row is not None]
+
+    def _content_count(self) -> int:
+        return len(self._rows)
+
+    def _content_pages(self, page_size: int) -> Iterator[Tuple[List[str], List[str], List[Dict[str, Any]]]]:
+        snapshot = self._snapshot()
+        live = [row for row in range(snapshot.size) if snapshot.ids[row] is not None]
+        for start in range(0, len(live), page_size):
+            page = live[start:start + page_size]
+            yield ([snapshot.ids[row] for row in page],
+                   [snapshot.documents[row] for row in page],
+                   [self._metadata(snapshot, row) for row in page])
+
+    def _stored_hashes(self, course_title: str) -> Dict[str, Optional[str]]:
+        with self._lock:
+            course = self._course_numbers.get(course_title)
+            if course is None:
+                return {}
+            rows = np.flatnonzero(self._courses[:self._size] == course)
+            return {self._ids[row]: self._hashes[row] for row in rows}
+
+    # Catalog
+
+    def _catalog_records(self) -> List[Dict[str, Any]]:
+        return [metadata for metadata, _ in self._catalog.values()]
+
+    def _load_catalog_index(self):
+        self.catalog_index.load(self._catalog_records())
+
+    def _nearest_course(self, course_name: str) -> Optional[Tuple[str, float]]:
+        self._refresh()
+        with self._lock:
+            if self._catalog_matrix is None:
+                titles = list(self._catalog)
+                vectors = [embedding for _, embedding in self._catalog.values()]
+                self._catalog_matrix = (titles, np.vstack(vectors) if vectors else None)
+            titles, matrix = self._catalog_matrix
+        if not titles:
+            return None
+
+        query = self._normalize(np.asarray(self.embed_query(course_name), dtype=np.float32))
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        return titles[best], max(0.0, 2.0 - 2.0 * float(scores[best]))
+
+    def add_course_metadata(self, course: Course):
+        """Add course information to the catalog for semantic search"""
+        embedding = self._normalize(np.asarray(self.embedder.encode([course.title])[0], dtype=np.float32))
+        with self._lock:
+            self._catalog[course.title] = (self._catalog_metadata(course), embedding)
+            self._catalog_matrix = None
+            self._dirty = True
+        self.catalog_index.add_course(course)
+        self._bump_generation()
+
+    # Writes
+
+    def _course_number(self, course_title: str) -> int:
+        course = self._course_numbers.get(course_title)
+        if course is None:
+            course = self._course_numbers[course_title] = len(self._course_names)
+            self._course_names.append(course_title)
+        return course
+
+    def _remove_row(self, chunk_id: str):
+        row = self._rows.pop(chunk_id)
+        self._ids[row] = self._documents[row] = self._hashes[row] = None
+        self._courses[row] = self.REMOVED
+        self._removed += 1
+        self._dirty = True
+
+    def _store_chunks(self, ids: List[str], documents: List[str], embeddings,
+                      metadatas: List[Dict[str, Any]], upsert: bool):
+        # Re-adding an id replaces it either way, as keeping duplicates would skew search
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32)).astype(self.dtype)
+        with self._lock:
+            for chunk_id in ids:
+                if chunk_id in self._rows:
+                    self._remove_row(chunk_id)
+
+            start = self._size
+            self._courses = _append_column(self._courses, start, [
+                self._course_number(metadata["course_title"]) for metadata in metadatas])
+            self._lessons = _append_column(self._lessons, start, [
+                self.NO_LESSON if metadata.get("lesson_number") is None else metadata["lesson_number"]
+                for metadata in metadatas])
+            self._chunk_indexes = _append_column(self._chunk_indexes, start, [
+                metadata.get("chunk_index", 0) for metadata in metadatas])
+            self._ids.extend(ids)
+            self._documents.extend(documents)
+            self._hashes.extend(metadata.get("content_hash") for metadata in metadatas)
+            self._rows.update((chunk_id, start + i) for i, chunk_id in enumerate(ids))
+            self._pending = self._pending + [vectors]
+            self._size += len(ids)
+            self._dirty = True
+
+    def _delete_chunks(self, chunk_ids: List[str]):
+        with self._lock:
+            for chunk_id in chunk_ids:
+                if chunk_id in self._rows:
+                    self._remove_row(chunk_id)
+
+    def _delete_course(self, course_title: str):
+        with self._lock:
+            course = self._course_numbers.get(course_title)
+            if course is not None:
+                for row in np.flatnonzero(self._courses[:self._size] == course):
+                    self._remove_row(self._ids[row])
+            if self._catalog.pop(course_title, None) is not None:
+                self._catalog_matrix = None
+                self._dirty = True
+
+    def _clear_storage(self):
+        with self._lock:
+            disk_stamp, generation = self._disk_stamp, self._file_generation
+            self._reset()
+            self._disk_stamp, self._file_generation = disk_stamp, generation
+            self._needs_rewrite = self._dirty = True
@@ -1,10 +1,24 @@
-from typing import List, Tuple, Optional, Dict
+from typing import Any, AsyncIterator, Callable, FrozenSet, Iterable, Iterator, List, Tuple, Optional, Dict
+import asyncio
+import multiprocessing
 import os
-from document_processor import DocumentProcessor
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from document_processor import DocumentProcessor, process_course_file
+from ingest_manifest import IngestManifest, FileFingerprint, hash_file
+from answer_cache import AnswerCache, CachedAnswer
 from vector_store import VectorStore
+from numpy_vector_store import NumpyVectorStore
+from embeddings import EmbeddingBackend, MicroBatchingEmbedder, create_embedding_backend
+from embedding_server import RemoteEmbeddingBackend
 from ai_generator import AIGenerator
 from session_manager import SessionManager
+from session_store import create_session_store
 from search_tools import ToolManager, CourseSearchTool
+from reranker import CrossEncoderReranker
+from metrics import (ANSWER_CACHE_LOOKUP, INGEST_CHUNKS_PER_SECOND, INGEST_SECONDS, INGESTED_CHUNKS,
+                     INGESTED_COURSES, QUERY, QUERY_STREAM, SESSION_LOOKUP)
 from models import Course, Lesson, CourseChunk
 
 class RAGSystem:
@@ -15,15 +29,139 @@ class RAGSystem:
         
         # Initialize core components
         self.document_processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
-        self.vector_store = VectorStore(config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS)
-        self.ai_generator = AIGenerator(config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL)
-        self.session_manager = SessionManager(config.MAX_HISTORY)
+        # Opened on first use: opening loads the embedding model (see warm_up)
+        self._vector_store = None
+        self._vector_store_lock = threading.Lock()
+        self.ai_generator = AIGenerator(
+            config.ANTHROPIC_API_KEY,
+            config.ANTHROPIC_MODEL,
+            max_concurrent_requests=config.MAX_CONCURRENT_LLM_CALLS
+        )
+        self.session_manager = SessionManager(
+            config.MAX_HISTORY,
+            create_session_store(
+                config.SESSION_BACKEND,
+                config.SESSION_DB_PATH,
+                config.MAX_SESSIONS,
+                config.SESSION_IDLE_TTL
+            ),
+            max_history_tokens=config.HISTORY_TOKEN_BUDGET
+        )
+        # Background summarization of trimmed turns, chained per session so updates never interleave
+        self._summary_tasks: Dict[str, asyncio.Task] = {}
+        self.ingest_manifest = IngestManifest(config.INGEST_MANIFEST_PATH)
+        
+        # Answers to history-free queries, invalidated by any vector store write
+        self.answer_cache = None
+        if config.ANSWER_CACHE_SIZE > 0:
+            self.answer_cache = AnswerCache(
+                config.ANSWER_CACHE_SIZE,
+                config.ANSWER_CACHE_TTL,
+                config.ANSWER_CACHE_SIMILARITY if config.ANSWER_CACHE_SEMANTIC else None
+            )
+        
+        # Bounded pool so blocking retrieval never runs on the event loop
+        self.search_executor = ThreadPoolExecutor(
+            max_workers=config.SEARCH_WORKERS,
+            thread_name_prefix="vector-search"
+        )
+        
+        # Separate pool for session store calls, so SQLite lock waits never hold up searches
+        self.session_executor = ThreadPoolExecutor(
+            max_workers=config.SESSION_WORKERS,
+            thread_name_prefix="session-store"
+        )
         
         # Initialize search tools
-        self.tool_manager = ToolManager()
-        self.search_tool = CourseSearchTool(self.vector_store)
+        self.tool_manager = ToolManager(executor=self.search_executor)
+        self.reranker = None
+        if config.RERANK:
+            self.reranker = CrossEncoderReranker(
+                config.RERANK_MODEL,
+                time_budget=config.RERANK_TIME_BUDGET,
+                batch_size=config.RERANK_BATCH_SIZE
+            )
+        self.search_tool = CourseSearchTool(
+            lambda: self.vector_store,
+            config.TOOL_RESULT_CACHE_SIZE,
+            reranker=self.reranker,
+            rerank_candidates=config.RERANK_CANDIDATES,
+            rerank_top_k=config.RERANK_TOP_K
+        )
         self.tool_manager.register_tool(self.search_tool)
     
+    @property
+    def vector_store(self) -> VectorStore:
+        """The vector store, opened by whichever caller needs it first"""
+        store = self._vector_store
+        if store is None:
+            with self._vector_store_lock:
+                if self._vector_store is None:
+                    self._vector_store = self._create_vector_store(self.config)
+                store = self._vector_store
+        return store
+    
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Open the vector store and run the models once, so the first query does
+        not pay for loading them. Safe to call while queries are being served.
+        
+        Returns:
+            Seconds spent on each step
+        """
+        timings = {}
+        start = time.perf_counter()
+        store = self.vector_store
+        timings["open_vector_store"] = round(time.perf_counter() - start, 3)
+        
+        start = time.perf_counter()
+        store.warm_up()
+        timings["embedding_model"] = round(time.perf_counter() - start, 3)
+        
+        if self.reranker:
+            start = time.perf_counter()
+            self.reranker.warm_up()
+            timings["reranker"] = round(time.perf_counter() - start, 3)
+        return timings
+    
+    @staticmethod
+    def _create_embedder(config) -> EmbeddingBackend:
+        """
+        Use the shared embedding server if one is configured, else load the
+        model in this process; concurrent query embeddings are micro-batched.
+        Queries are embedded on the search executor, so a batch holds at most
+        SEARCH_WORKERS of them.
+        """
+        if config.EMBEDDING_SERVER_SOCKET:
+            embedder = RemoteEmbeddingBackend(config.EMBEDDING_SERVER_SOCKET)
+        else:
+            embedder = create_embedding_backend(config.EMBEDDING_BACKEND, config.EMBEDDING_MODEL,
+                                                config.EMBEDDING_ONNX_PATH, config.EMBEDDING_THREADS)
+        if config.EMBEDDING_MICRO_BATCH:
+            embedder = MicroBatchingEmbedder(embedder, config.EMBEDDING_MICRO_BATCH_SIZE,
+                                             config.EMBEDDING_MICRO_BATCH_WAIT)
+        return embedder
+    
+    @staticmethod
+    def _create_vector_store(config) -> VectorStore:
+        """Build the vector store named by config.VECTOR_BACKEND ("chroma" or "numpy")"""
+        options = dict(
+            embedding_cache_size=config.EMBEDDING_CACHE_SIZE,
+            embedding_cache_ttl=config.EMBEDDING_CACHE_TTL,
+            course_match_max_distance=config.COURSE_MATCH_MAX_DISTANCE,
+            embedding_batch_size=config.EMBEDDING_BATCH_SIZE,
+            lexical_index_path=config.LEXICAL_INDEX_PATH if config.HYBRID_SEARCH else None,
+            hybrid_candidates=config.HYBRID_CANDIDATES,
+            rrf_k=config.RRF_K,
+            embedder=RAGSystem._create_embedder(config)
+        )
+        if config.VECTOR_BACKEND == "chroma":
+            return VectorStore(config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS, **options)
+        if config.VECTOR_BACKEND == "numpy":
+            return NumpyVectorStore(config.NUMPY_STORE_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS,
+                                    dtype=config.NUMPY_STORE_DTYPE, **options)
+        raise ValueError(f"Unknown vector backend: {config.VECTOR_BACKEND}")
+    
     def add_course_document(self, file_path: str) -> Tuple[Course, int]:
         """
         Add a single course document to the knowledge base.
@@ -35,16 +173,17 @@ class RAGSystem:
             Tuple of (Course object, number of chunks created)
         """
         try:
-            # Process the document
-            course, course_chunks = self.document_processor.process_course_document(file_path)
-            
-            # Add course metadata to vector store for semantic search
-            self.vector_store.add_course_metadata(course)
+            # Parse lazily so chunks are embedded lesson by lesson
+            course, course_chunks = self.document_processor.stream_course_document(file_path)
             
             # Add course content chunks to vector store
-            self.vector_store.add_course_content(course_chunks)
+            chunk_count = self.vector_store.add_course_content(course_chunks)
+            
+            # Lessons are complete once the chunks have been consumed
+            self.vector_store.add_course_metadata(course)
+            self.vector_store.flush()
             
-            return course, len(course_chunks)
+            return course, chunk_count
         except Exception as e:
             print(f"Error processing course document {file_path}: {e}")
             return None, 0
@@ -53,53 +192,200 @@ class RAGSystem:
         """
         Add all course documents from a folder.
         
+        Files whose fingerprint matches the ingest manifest are skipped without
+        being parsed; changed files are parsed in a process pool, except large
+        ones (INGEST_STREAM_BYTES), which are streamed lesson by lesson so their
+        memory use stays flat. New courses are embedded together, edited courses
+        are upserted chunk by chunk and courses whose file was deleted are
+        removed. An error partway through a streamed file is raised, since its
+        course is already partly written.
+        
         Args:
             folder_path: Path to folder containing course documents
             clear_existing: Whether to clear existing data first
             
         Returns:
-            Tuple of (total courses added, total chunks created)
+            Tuple of (total courses added or updated, total chunks written)
         """
         total_courses = 0
         total_chunks = 0
+        started = time.perf_counter()
         
         # Clear existing data if requested
         if clear_existing:
             print("Clearing existing data for fresh rebuild...")
             self.vector_store.clear_all_data()
+            self.ingest_manifest.clear()
         
         if not os.path.exists(folder_path):
             print(f"Folder {folder_path} does not exist")
             return 0, 0
         
-        # Get existing course titles to avoid re-processing
+        self._remove_deleted_files(folder_path)
+        
+        # Get existing course titles to decide between adding and updating
         existing_course_titles = set(self.vector_store.get_existing_course_titles())
         
-        # Process each file in the folder
-        for file_name in os.listdir(folder_path):
+        changed_files = self._find_changed_files(folder_path, existing_course_titles)
+        processed = []
+        
+        def new_course_chunks(encode) -> Iterator[CourseChunk]:
+            """Apply updates and yield chunks of new courses, so batches span documents"""
+            nonlocal total_courses, total_chunks
+            for file_path, fingerprint, course, course_chunks in self._process_files(changed_files):
+                chunk_count = 0
+                
+                def counted_chunks() -> Iterator[CourseChunk]:
+                    nonlocal chunk_count
+                    for chunk in course_chunks:
+                        chunk_count += 1
+                        yield chunk
+                
+                # An edited title line leaves the old course behind - drop it
+                previous = self.ingest_manifest.get(file_path)
+                if previous and previous.course_title and previous.course_title != course.title:
+                    self.vector_store.remove_course(previous.course_title)
+                    existing_course_titles.discard(previous.course_title)
+                    print(f"Removed renamed course: {previous.course_title}")
+                
+                if course.title not in existing_course_titles:
+                    # This is a new course - add it to the vector store
+                    yield from counted_chunks()
+                    # A streamed course has all its lessons only once its chunks are consumed
+                    self.vector_store.add_course_metadata(course)
+                    total_courses += 1
+                    total_chunks += chunk_count
+                    print(f"Added new course: {course.title} ({chunk_count} chunks)")
+                    existing_course_titles.add(course.title)
+                else:
+                    # Known course with an edited document - re-embed only what changed
+                    written, deleted = self.vector_store.upsert_course(course, counted_chunks(), encode)
+                    total_courses += 1
+                    total_chunks += written
+                    print(f"Updated course: {course.title} ({written} chunks re-embedded, {deleted} removed)")
+                
+                fingerprint.course_title = course.title
+                fingerprint.chunk_count = chunk_count
+                processed.append((file_path, fingerprint))
+        
+        if changed_files:
+            # Only these writes use the encoder processes; queries served meanwhile encode in-process
+            with self.vector_store.bulk_encoding(self.config.EMBEDDING_PROCESSES) as encode:
+                self.vector_store.add_course_content(new_course_chunks(encode), encode)
+        
+        # Only remember files once their chunks are stored (flush raises if they were not)
+        self.vector_store.flush()
+        for file_path, fingerprint in processed:
+            self.ingest_manifest.record(file_path, fingerprint)
+        self.ingest_manifest.save()
+        
+        elapsed = time.perf_counter() - started
+        INGEST_SECONDS.observe(elapsed)
+        INGESTED_COURSES.inc(total_courses)
+        INGESTED_CHUNKS.inc(total_chunks)
+        if total_chunks:
+            INGEST_CHUNKS_PER_SECOND.set(total_chunks / elapsed)
+        return total_courses, total_chunks
+    
+    def _remove_deleted_files(self, folder_path: str):
+        """Remove courses whose source file has disappeared from the folder"""
+        for file_path in self.ingest_manifest.paths_under(folder_path):
+            if os.path.exists(file_path):
+                continue
+            fingerprint = self.ingest_manifest.remove(file_path)
+            if fingerprint and fingerprint.course_title:
+                self.vector_store.remove_course(fingerprint.course_title)
+                print(f"Removed course with deleted file: {fingerprint.course_title}")
+    
+    def remove_course(self, course_title: str) -> bool:
+        """
+        Remove a course from the knowledge base and forget its source files.
+        
+        Args:
+            course_title: Title of the course to remove
+            
+        Returns:
+            True if the course existed
+        """
+        removed = self.vector_store.remove_course(course_title)
+        self.vector_store.flush()
+        for file_path in self.ingest_manifest.paths_for_course(course_title):
+            self.ingest_manifest.remove(file_path)
+        self.ingest_manifest.save()
+        return removed
+    
+    def _find_changed_files(self, folder_path: str, indexed_titles: set) -> List[Tuple[str, FileFingerprint]]:
+        """
+        Fingerprint the course documents in a folder and return the ones that need parsing.
+        
+        A file is unchanged if its size and mtime match the manifest, or failing
+        that, if its content hash does; either way its course must still be indexed.
+        """
+        changed = []
+        for file_name in sorted(os.listdir(folder_path)):
             file_path = os.path.join(folder_path, file_name)
-            if os.path.isfile(file_path) and file_name.lower().endswith(('.pdf', '.docx', '.txt')):
+            if not (os.path.isfile(file_path) and file_name.lower().endswith(('.pdf', '.docx', '.txt'))):
+                continue
+            
+            stat = os.stat(file_path)
+            known = self.ingest_manifest.get(file_path)
+            indexed = known is not None and known.course_title in indexed_titles
+            if indexed and known.mtime_ns == stat.st_mtime_ns and known.size == stat.st_size:
+                continue
+            
+            sha256 = hash_file(file_path)
+            if indexed and known.sha256 == sha256:
+                # Touched but not edited - refresh the stat fields only
+                known.mtime_ns, known.size = stat.st_mtime_ns, stat.st_size
+                self.ingest_manifest.record(file_path, known)
+                continue
+            
+            changed.append((file_path, FileFingerprint(stat.st_mtime_ns, stat.st_size, sha256)))
+        return changed
+    
+    def _process_files(self, files: List[Tuple[str, FileFingerprint]]) -> Iterator[Tuple[str, FileFingerprint, Course, Iterable[CourseChunk]]]:
+        """
+        Parse and chunk documents. Files of INGEST_STREAM_BYTES or more are
+        streamed here, their Course filling in as the chunks are consumed; the
+        rest are parsed in worker processes, unless there would be only one.
+        """
+        pooled = [(file_path, fingerprint) for file_path, fingerprint in files
+                  if fingerprint.size < self.config.INGEST_STREAM_BYTES]
+        workers = min(self.config.INGEST_WORKERS, len(pooled))
+        if workers <= 1:
+            pooled = []
+        pooled_paths = {file_path for file_path, _ in pooled}
+        
+        # Spawn rather than fork: the parent already runs Chroma and torch threads
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) if pooled else None
+        try:
+            futures = {
+                pool.submit(process_course_file, file_path, self.config.CHUNK_SIZE, self.config.CHUNK_OVERLAP): (file_path, fingerprint)
+                for file_path, fingerprint in pooled
+            }
+            # Streamed while the workers parse the smaller files
+            for file_path, fingerprint in files:
+                if file_path in pooled_paths:
+                    continue
                 try:
-                    # Check if this course might already exist
-                    # We'll process the document to get the course ID, but only add if new
-                    course, course_chunks = self.document_processor.process_course_document(file_path)
-                    
-                    if course and course.title not in existing_course_titles:
-                        # This is a new course - add it to the vector store
-                        self.vector_store.add_course_metadata(course)
-                        self.vector_store.add_course_content(course_chunks)
-                        total_courses += 1
-                        total_chunks += len(course_chunks)
-                        print(f"Added new course: {course.title} ({len(course_chunks)} chunks)")
-                        existing_course_titles.add(course.title)
-                    elif course:
-                        print(f"Course already exists: {course.title} - skipping")
+                    course, course_chunks = self.document_processor.stream_course_document(file_path)
                 except Exception as e:
-                    print(f"Error processing {file_name}: {e}")
-        
-        return total_courses, total_chunks
+                    print(f"Error processing {os.path.basename(file_path)}: {e}")
+                    continue
+                yield file_path, fingerprint, course, course_chunks
+            
+            for future in as_completed(futures):
+                file_path, fingerprint = futures[future]
+                try:
+                    course, course_chunks = future.result()
+                    yield file_path, fingerprint, course, course_chunks
+                except Exception as e:
+                    print(f"Error processing {os.path.basename(file_path)}: {e}")
+        finally:
+            if pool is not None:
+                pool.shutdown()
     
-    def query(self, query: str, session_id: Optional[str] = None) -> Tuple[str, List[str]]:
+    async def query(self, query: str, session_id: Optional[str] = None) -> Tuple[str, List[str]]:
         """
         Process a user query using the RAG system with tool-based search.
         
@@ -108,37 +394,205 @@ class RAGSystem:
             session_id: Optional session ID for conversation context
             
         Returns:
-            Tuple of (response, sources list - empty for tool-based approach)
+            Tuple of (response, sources of the searches made for this query)
         """
+        with QUERY.time():
+            return await self._query(query, session_id)
+    
+    async def _query(self, query: str, session_id: Optional[str]) -> Tuple[str, List[str]]:
         # Create prompt for the AI with clear instructions
         prompt = f"""Answer this question about course materials: {query}"""
         
         # Get conversation history if session exists
-        history = None
-        if session_id:
-            history = self.session_manager.get_conversation_history(session_id)
+        history, summary = await self._session_context(session_id)
+        
+        # Without history the answer depends only on the query and the indexed content
+        use_cache = self.answer_cache is not None and not history and not summary
+        if use_cache:
+            cached, generation, embedding, context = await self._lookup_cached_answer(query)
+            if cached:
+                if session_id:
+                    await self._record_exchange(session_id, query, cached.answer)
+                return cached.answer, cached.sources
         
-        # Generate response using AI with tools
-        response = self.ai_generator.generate_response(
+        # Generate response using AI with tools; sources come back with this request's tool calls
+        response, sources = await self.ai_generator.generate_response(
             query=prompt,
             conversation_history=history,
             tools=self.tool_manager.get_tool_definitions(),
-            tool_manager=self.tool_manager
+            tool_manager=self.tool_manager,
+            conversation_summary=summary
         )
         
-        # Get sources from the search tool
-        sources = self.tool_manager.get_last_sources()
-
-        # Reset sources after retrieving them
-        self.tool_manager.reset_sources()
-        
         # Update conversation history
         if session_id:
-            self.session_manager.add_exchange(session_id, query, response)
+            await self._record_exchange(session_id, query, response)
+        
+        if use_cache:
+            self.answer_cache.put(query, response, sources, generation, embedding, context)
         
         # Return response with sources from tool searches
         return response, sources
     
+    async def query_stream(self, query: str, session_id: Optional[str] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Process a user query and stream the answer as it is generated.
+        
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+            
+        Yields:
+            ("token", text) for each text delta, then ("sources", sources list)
+        """
+        with QUERY_STREAM.time():
+            prompt = f"""Answer this question about course materials: {query}"""
+            
+            history, summary = await self._session_context(session_id)
+            
+            use_cache = self.answer_cache is not None and not history and not summary
+            if use_cache:
+                cached, generation, embedding, context = await self._lookup_cached_answer(query)
+                if cached:
+                    yield "token", cached.answer
+                    yield "sources", cached.sources
+                    if session_id:
+                        await self._record_exchange(session_id, query, cached.answer)
+                    return
+            
+            answer_parts = []
+            sources = []
+            async for event, payload in self.ai_generator.stream_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+                conversation_summary=summary
+            ):
+                if event == "sources":
+                    sources = payload
+                    continue
+                answer_parts.append(payload)
+                yield "token", payload
+            
+            yield "sources", sources
+            
+            # Only record the exchange once the full answer has been streamed
+            answer = "".join(answer_parts)
+            if session_id:
+                await self._record_exchange(session_id, query, answer)
+            if use_cache:
+                self.answer_cache.put(query, answer, sources, generation, embedding, context)
+    
+    async def create_session(self) -> str:
+        """Create a conversation session without blocking the event loop"""
+        return await self._session_call(self.session_manager.create_session)
+    
+    async def clear_session(self, session_id: str):
+        """Clear a session's messages without blocking the event loop"""
+        await self._session_call(self.session_manager.clear_session, session_id)
+    
+    async def _session_call(self, fn: Callable, *args) -> Any:
+        """
+        Run a session store call on the session pool: the SQLite store can wait
+        up to its busy timeout for another worker's write lock, which must stall
+        neither the event loop nor the searches of other requests.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.session_executor, fn, *args)
+    
+    async def _session_context(self, session_id: Optional[str]) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """The session's history messages and summary of older turns (None, None without a session)"""
+        if not session_id:
+            return None, None
+        with SESSION_LOOKUP.time():
+            return await self._session_call(self._read_session, session_id)
+    
+    def _read_session(self, session_id: str) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        return (self.session_manager.get_history_messages(session_id),
+                self.session_manager.get_summary(session_id))
+    
+    async def _record_exchange(self, session_id: str, query: str, answer: str):
+        """Add an exchange to the session and summarize any trimmed turns in the background"""
+        evicted = await self._session_call(self.session_manager.add_exchange, session_id, query, answer)
+        if not evicted or not self.config.SUMMARIZE_HISTORY:
+            return
+        
+        previous = self._summary_tasks.get(session_id)
+        task = asyncio.create_task(self._summarize_turns(session_id, evicted, previous))
+        self._summary_tasks[session_id] = task
+        task.add_done_callback(
+            lambda done: self._summary_tasks.pop(session_id, None)
+            if self._summary_tasks.get(session_id) is done else None
+        )
+    
+    async def _summarize_turns(self, session_id: str, evicted: List, previous: Optional[asyncio.Task]):
+        """Fold trimmed turns into the session's rolling summary, after any earlier update"""
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            summary = await self.ai_generator.summarize(
+                await self._session_call(self.session_manager.get_summary, session_id),
+                [{"role": message.role, "content": message.content} for message in evicted],
+                max_tokens=self.config.SUMMARY_MAX_TOKENS
+            )
+            await self._session_call(self.session_manager.set_summary, session_id, summary)
+        except Exception as e:
+            print(f"Error summarizing session {session_id}: {e}")
+    
+    async def _lookup_cached_answer(self, query: str) -> Tuple[Optional[CachedAnswer], int, Any, Optional[FrozenSet[str]]]:
+        """
+        Look up a cached answer, exact text first and then by query similarity.
+        
+        Returns:
+            Tuple of (cached answer or None, current store generation, query
+            embedding and retrieved chunk IDs if the semantic tier computed them)
+        """
+        with ANSWER_CACHE_LOOKUP.time():
+            return await self._lookup_answer_tiers(query)
+    
+    async def _lookup_answer_tiers(self, query: str) -> Tuple[Optional[CachedAnswer], int, Any, Optional[FrozenSet[str]]]:
+        store = self._vector_store
+        if store is None:
+            # Opening waits for warm-up, which must not stall the event loop
+            loop = asyncio.get_running_loop()
+            store = await loop.run_in_executor(self.search_executor, lambda: self.vector_store)
+        generation = store.generation
+        cached = self.answer_cache.get_exact(query, generation)
+        embedding = context = None
+        
+        if cached is None and self.answer_cache.semantic_enabled:
+            # Embedding, retrieval and the similarity scan are CPU-bound, so run them on the search pool
+            loop = asyncio.get_running_loop()
+            cached, embedding, context = await loop.run_in_executor(
+                self.search_executor, self._lookup_similar_answer, query, generation
+            )
+        
+        if cached is None:
+            self.answer_cache.record_miss()
+        return cached, generation, embedding, context
+    
+    def _lookup_similar_answer(self, query: str, generation: int) -> Tuple[Optional[CachedAnswer], Any, Optional[FrozenSet[str]]]:
+        """Semantic tier: a cached answer to a similar query that retrieves the same chunks"""
+        normalized = AnswerCache.normalize(query)
+        embedding = self.vector_store.embed_query(normalized)
+        context = self.vector_store.context_ids(normalized)
+        return self.answer_cache.get_similar(embedding, generation, context), embedding, context
+    
+    def get_cache_stats(self) -> Dict:
+        """Get hit/miss counters for the query-path caches, prompt cache token usage, re-ranking and embedding batch counts"""
+        # Read without opening the store, so a scrape during startup does not load the model
+        store = self._vector_store
+        embedder = store.embedder if store else None
+        return {
+            "query_embeddings": store.get_embedding_cache_stats() if store else None,
+            "tool_results": self.search_tool.result_cache.stats(),
+            "prompt": self.ai_generator.get_usage_stats(),
+            "answers": self.answer_cache.stats() if self.answer_cache else None,
+            "reranker": self.reranker.stats() if self.reranker else None,
+            "embedding_batches": embedder.stats() if isinstance(embedder, MicroBatchingEmbedder) else None
+        }
+    
     def get_course_analytics(self) -> Dict:
         """Get analytics about the course catalog"""
         return {
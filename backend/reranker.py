@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class CrossEncoderReranker:
+    """
+    Re-orders search candidates by cross-encoder relevance to the query.
+
+    Pairs are scored in batches on the CPU; if the per-query time budget runs
+    out before every candidate is scored, the caller keeps the vector order.
+    The model loads in a background thread on first use, and queries fall
+    back to vector order until it is ready.
+    """
+
+    def __init__(self, model_name: str, time_budget: float = 0.25, batch_size: int = 16,
+                 max_length: int = 256):
+        self.model_name = model_name
+        self.time_budget = time_budget  # Seconds of scoring allowed per query
+        self.batch_size = batch_size    # Query/chunk pairs scored per forward pass
+        self.max_length = max_length    # Tokens per pair; longer chunks are truncated
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._loading = False
+        self._stats_lock = threading.Lock()
+        self.reranked = 0
+        self.fallbacks = 0
+        self._seconds = 0.0
+
+    def _load(self):
+        try:
+            from sentence_transformers import CrossEncoder
+            self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+        except Exception as e:
+            print(f"Error loading cross-encoder {self.model_name}: {e}")
+        finally:
+            with self._load_lock:
+                self._loading = False
+
+    def load(self, background: bool = True):
+        """Start loading the model (a no-op once it is loaded or loading)"""
+        with self._load_lock:
+            if self._model is not None or self._loading:
+                return
+            self._loading = True
+        if background:
+            threading.Thread(target=self._load, name="reranker-load", daemon=True).start()
+        else:
+            self._load()
+
+    def warm_up(self):
+        """Load the model now and run one pair through it, off the query path"""
+        self.load(background=False)
+        model = self._model
+        if model is not None:
+            model.predict([("warm up", "warm up")], show_progress_bar=False)
+
+    def rerank(self, query: str, documents: List[str], top_k: int) -> Optional[List[int]]:
+        """
+        Rank documents by relevance to the query.
+
+        Returns:
+            Indices of the top_k documents, best first, or None if the model is
+            not ready or the time budget ran out (keep the vector order then)
+        """
+        model = self._model
+        if model is None:
+            self.load()
+            self._record(None, 0.0)
+            return None
+
+        start = time.perf_counter()
+        deadline = start + self.time_budget
+        pairs = [(query, document) for document in documents]
+        scores: List[float] = []
+        try:
+            for offset in range(0, len(pairs), self.batch_size):
+                if time.perf_counter() > deadline:
+                    self._record(None, time.perf_counter() - start)
+                    return None
+                batch = model.predict(pairs[offset:offset + self.batch_size],
+                                      batch_size=self.batch_size, show_progress_bar=False)
+                scores.extend(float(score) for score in batch)
+        except Exception as e:
+            print(f"Error re-ranking results: {e}")
+            self._record(None, time.perf_counter() - start)
+            return None
+
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:top_k]
+        self._record(ranked, time.perf_counter() - start)
+        return ranked
+
+    def _record(self, ranked: Optional[List[int]], seconds: float):
+        with self._stats_lock:
+            if ranked is None:
+                self.fallbacks += 1
+            else:
+                self.reranked += 1
+            self._seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Queries re-ranked, queries left in vector order, and mean scoring time"""
+        with self._stats_lock:
+            calls = self.reranked + self.fallbacks
+            return {
+                "model_loaded": self._model is not None,
+                "reranked": self.reranked,
+                "fallbacks": self.fallbacks,
+                "mean_ms": round(self._seconds / calls * 1000, 3) if calls else 0.0,
+            }
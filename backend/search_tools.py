@@ -1,8 +1,23 @@
-from typing import Dict, Any, Optional, Protocol
+import asyncio
+import copy
+import functools
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, List, Optional, Protocol, Tuple, Union
 from abc import ABC, abstractmethod
+from cache import LRUCache
+from metrics import FORMAT, RERANK, TOOL_CALLS
+from reranker import CrossEncoderReranker
 from vector_store import VectorStore, SearchResults
 
 
+@dataclass
+class ToolResult:
+    """Output of a single tool call, owned by the request that made it"""
+    content: str                                                # Text sent back to Claude
+    sources: List[Dict[str, Any]] = field(default_factory=list)  # Sources shown in the UI
+
+
 class Tool(ABC):
     """Abstract base class for all tools"""
     
@@ -12,7 +27,7 @@ class Tool(ABC):
         pass
     
     @abstractmethod
-    def execute(self, **kwargs) -> str:
+    def execute(self, **kwargs) -> ToolResult:
         """Execute the tool with given parameters"""
         pass
 
@@ -20,9 +35,22 @@ class Tool(ABC):
 class CourseSearchTool(Tool):
     """Tool for searching course content with semantic course name matching"""
     
-    def __init__(self, vector_store: VectorStore):
-        self.store = vector_store
-        self.last_sources = []  # Track sources from last search
+    def __init__(self, vector_store: Union[VectorStore, Callable[[], VectorStore]], cache_size: int = 512,
+                 reranker: Optional[CrossEncoderReranker] = None,
+                 rerank_candidates: int = 20, rerank_top_k: int = 3):
+        # A callable defers opening the store until the first search
+        self._store = vector_store
+        # (store generation, arguments) -> (result text, sources)
+        self.result_cache = LRUCache(cache_size)
+        # Optional second stage: over-fetch candidates, keep the best rerank_top_k
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        self.rerank_top_k = rerank_top_k
+    
+    @property
+    def store(self) -> VectorStore:
+        """The vector store searched by this tool"""
+        return self._store() if callable(self._store) else self._store
     
     def get_tool_definition(self) -> Dict[str, Any]:
         """Return Anthropic tool definition for this tool"""
@@ -49,7 +77,7 @@ class CourseSearchTool(Tool):
             }
         }
     
-    def execute(self, query: str, course_name: Optional[str] = None, lesson_number: Optional[int] = None) -> str:
+    def execute(self, query: str, course_name: Optional[str] = None, lesson_number: Optional[int] = None) -> ToolResult:
         """
         Execute the search tool with given parameters.
         
@@ -59,19 +87,33 @@ class CourseSearchTool(Tool):
             lesson_number: Optional lesson filter
             
         Returns:
-            Formatted search results or error message
+            Formatted search results (or error message) and their sources
         """
         
+        # Any store write bumps the generation, so older entries can never match.
+        # Read it before searching so a concurrent write can only make us miss.
+        cache_key = (self.store.generation, query, course_name, lesson_number)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            text, sources = cached
+            return ToolResult(text, list(sources))
+        
         # Use the vector store's unified search interface
         results = self.store.search(
             query=query,
             course_name=course_name,
-            lesson_number=lesson_number
+            lesson_number=lesson_number,
+            limit=self.rerank_candidates if self.reranker else None
         )
+        # A ranking degraded by the rerank time budget is served but not cached
+        cacheable = True
+        if self.reranker and not results.error:
+            with RERANK.time():
+                results, cacheable = self._rerank(query, results)
         
-        # Handle errors
+        # Handle errors (not cached, they may be transient)
         if results.error:
-            return results.error
+            return ToolResult(results.error)
         
         # Handle empty results
         if results.is_empty():
@@ -80,13 +122,38 @@ class CourseSearchTool(Tool):
                 filter_info += f" in course '{course_name}'"
             if lesson_number:
                 filter_info += f" in lesson {lesson_number}"
-            return f"No relevant content found{filter_info}."
+            text = f"No relevant content found{filter_info}."
+            if cacheable:
+                self.result_cache.set(cache_key, (text, ()))
+            return ToolResult(text)
         
         # Format and return results
-        return self._format_results(results)
+        with FORMAT.time():
+            text, sources = self._format_results(results)
+        if cacheable:
+            self.result_cache.set(cache_key, (text, tuple(sources)))
+        return ToolResult(text, sources)
+    
+    def _rerank(self, query: str, results: SearchResults) -> Tuple[SearchResults, bool]:
+        """
+        Keep the top candidates by cross-encoder score, or in vector order if re-ranking is unavailable.
+        
+        Returns:
+            Tuple of (kept results, whether they were re-ranked rather than left in vector order)
+        """
+        order = self.reranker.rerank(query, results.documents, self.rerank_top_k)
+        reranked = order is not None
+        if not reranked:
+            order = range(min(self.rerank_top_k, len(results.documents)))
+        return SearchResults(
+            documents=[results.documents[i] for i in order],
+            metadata=[results.metadata[i] for i in order],
+            distances=[results.distances[i] for i in order],
+            ids=[results.ids[i] for i in order] if results.ids else []
+        ), reranked
     
-    def _format_results(self, results: SearchResults) -> str:
-        """Format search results with course and lesson context"""
+    def _format_results(self, results: SearchResults) -> Tuple[str, List[Dict[str, Any]]]:
+        """Format search results with course and lesson context, returning the text and its sources"""
         formatted = []
         sources = []  # Track sources for the UI
         link_cache = {}
@@ -125,47 +192,55 @@ class CourseSearchTool(Tool):
             
             formatted.append(f"{header}\n{doc}")
         
-        # Store sources for retrieval
-        self.last_sources = sources
-        
-        return "\n\n".join(formatted)
+        return "\n\n".join(formatted), sources
 
 class ToolManager:
     """Manages available tools for the AI"""
     
-    def __init__(self):
+    def __init__(self, executor: Optional[Executor] = None):
         self.tools = {}
+        # Executor used for blocking tool work (None means the loop's default executor)
+        self.executor = executor
+        # Definitions are built once at registration and shared by every request, so
+        # callers must treat them as read-only; the version changes whenever they do
+        self._definitions: List[Dict[str, Any]] = []
+        self.definitions_version = 0
     
     def register_tool(self, tool: Tool):
         """Register any tool that implements the Tool interface"""
-        tool_def = tool.get_tool_definition()
+        tool_def = copy.deepcopy(tool.get_tool_definition())
         tool_name = tool_def.get("name")
         if not tool_name:
             raise ValueError("Tool must have a 'name' in its definition")
         self.tools[tool_name] = tool
-
+        
+        definitions = {definition["name"]: definition for definition in self._definitions}
+        definitions[tool_name] = tool_def
+        self._definitions = list(definitions.values())
+        self.definitions_version += 1
     
-    def get_tool_definitions(self) -> list:
-        """Get all tool definitions for Anthropic tool calling"""
-        return [tool.get_tool_definition() for tool in self.tools.values()]
+    def get_tool_definitions(self) -> List[Dict[str, Any]]:
+        """
+        Get all tool definitions for Anthropic tool calling.
+        
+        Returns the same list (plain dicts, so the client can serialize it)
+        until another tool is registered, so callers can cache anything
+        derived from it by identity. Do not modify it.
+        """
+        return self._definitions
     
-    def execute_tool(self, tool_name: str, **kwargs) -> str:
+    def execute_tool(self, tool_name: str, **kwargs) -> ToolResult:
         """Execute a tool by name with given parameters"""
         if tool_name not in self.tools:
-            return f"Tool '{tool_name}' not found"
+            return ToolResult(f"Tool '{tool_name}' not found")
         
+        TOOL_CALLS.labels(tool_name).inc()
         return self.tools[tool_name].execute(**kwargs)
     
-    def get_last_sources(self) -> list:
-        """Get sources from the last search operation"""
-        # Check all tools for last_sources attribute
-        for tool in self.tools.values():
-            if hasattr(tool, 'last_sources') and tool.last_sources:
-                return tool.last_sources
-        return []
-
-    def reset_sources(self):
-        """Reset sources from all tools that track sources"""
-        for tool in self.tools.values():
-            if hasattr(tool, 'last_sources'):
-                tool.last_sources = []
+    async def execute_tool_async(self, tool_name: str, **kwargs) -> ToolResult:
+        """Execute a tool on the manager's executor without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(self.execute_tool, tool_name, **kwargs)
+        )
@@ -1,61 +1,63 @@
-from typing import Dict, List, Optional
-from dataclasses import dataclass
-
-@dataclass
-class Message:
-    """Represents a single message in a conversation"""
-    role: str     # "user" or "assistant"
-    content: str  # The message content
+import secrets
+from typing import Any, Dict, List, Optional
+from session_store import Message, SessionStore, InMemorySessionStore, estimate_tokens
 
 class SessionManager:
     """Manages conversation sessions and message history"""
     
-    def __init__(self, max_history: int = 5):
-        self.max_history = max_history
-        self.sessions: Dict[str, List[Message]] = {}
-        self.session_counter = 0
+    def __init__(self, max_history: int = 5, store: Optional[SessionStore] = None,
+                 max_history_tokens: Optional[int] = None):
+        self.max_history = max_history                # Exchanges remembered at most
+        self.max_history_tokens = max_history_tokens  # Approximate token budget for the history (None = unlimited)
+        self.store = store if store is not None else InMemorySessionStore()
     
     def create_session(self) -> str:
-        """Create a new conversation session"""
-        self.session_counter += 1
-        session_id = f"session_{self.session_counter}"
-        self.sessions[session_id] = []
+        """Create a new conversation session with an unguessable id"""
+        session_id = f"session_{secrets.token_urlsafe(16)}"
+        self.store.create(session_id)
         return session_id
     
-    def add_message(self, session_id: str, role: str, content: str):
-        """Add a message to the conversation history"""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = []
-        
-        message = Message(role=role, content=content)
-        self.sessions[session_id].append(message)
-        
+    @staticmethod
+    def _message(role: str, content: str) -> Message:
+        return Message(role=role, content=content, tokens=estimate_tokens(content))
+    
+    def add_message(self, session_id: str, role: str, content: str) -> List[Message]:
+        """Add a message to the conversation history, returning any older messages trimmed away"""
         # Keep conversation history within limits
-        if len(self.sessions[session_id]) > self.max_history * 2:
-            self.sessions[session_id] = self.sessions[session_id][-self.max_history * 2:]
+        return self.store.append(
+            session_id, [self._message(role, content)], self.max_history * 2, self.max_history_tokens
+        )
     
-    def add_exchange(self, session_id: str, user_message: str, assistant_message: str):
-        """Add a complete question-answer exchange"""
-        self.add_message(session_id, "user", user_message)
-        self.add_message(session_id, "assistant", assistant_message)
+    def add_exchange(self, session_id: str, user_message: str, assistant_message: str) -> List[Message]:
+        """Add a complete question-answer exchange, returning any older messages trimmed away"""
+        return self.store.append(
+            session_id,
+            [self._message("user", user_message), self._message("assistant", assistant_message)],
+            self.max_history * 2,
+            self.max_history_tokens
+        )
     
-    def get_conversation_history(self, session_id: Optional[str]) -> Optional[str]:
-        """Get formatted conversation history for a session"""
-        if not session_id or session_id not in self.sessions:
+    def get_history_messages(self, session_id: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """Get a session's history as alternating Messages API turns"""
+        if not session_id:
             return None
         
-        messages = self.sessions[session_id]
+        messages = self.store.get_messages(session_id)
         if not messages:
             return None
         
-        # Format messages for context
-        formatted_messages = []
-        for msg in messages:
-            formatted_messages.append(f"{msg.role.title()}: {msg.content}")
-        
-        return "\n".join(formatted_messages)
+        return [{"role": msg.role, "content": msg.content} for msg in messages]
+    
+    def get_summary(self, session_id: Optional[str]) -> Optional[str]:
+        """Get the rolling summary of turns trimmed from a session's history"""
+        if not session_id:
+            return None
+        return self.store.get_summary(session_id)
+    
+    def set_summary(self, session_id: str, summary: str):
+        """Replace the rolling summary of a session"""
+        self.store.set_summary(session_id, summary)
     
     def clear_session(self, session_id: str):
         """Clear all messages from a session"""
-        if session_id in self.sessions:
-            self.sessions[session_id] = []
\ No newline at end of file
+        self.store.clear(session_id)
\ No newline at end of file
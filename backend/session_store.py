@@ -0,0 +1,333 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class Message:
+    """Represents a single message in a conversation"""
+    role: str         # "user" or "assistant"
+    content: str      # The message content
+    tokens: int = 0   # Approximate prompt tokens, computed once when the message is added
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token plus per-message overhead)"""
+    return len(text) // 4 + 4
+
+
+def trim_history(messages: List[Message], max_messages: int,
+                 max_tokens: Optional[int]) -> Tuple[List[Message], List[Message]]:
+    """
+    Keep the newest messages that fit both limits, always keeping the latest
+    exchange and starting on a user turn.
+
+    Returns:
+        Tuple of (kept messages, evicted older messages)
+    """
+    keep_from = max(0, len(messages) - max_messages)
+    if max_tokens:
+        total = sum(message.tokens for message in messages[keep_from:])
+        while total > max_tokens and keep_from < len(messages) - 2:
+            total -= messages[keep_from].tokens
+            keep_from += 1
+    while keep_from < len(messages) - 1 and messages[keep_from].role != "user":
+        keep_from += 1
+    return messages[keep_from:], messages[:keep_from]
+
+
+class SessionStore(ABC):
+    """Storage backend for conversation sessions"""
+
+    @abstractmethod
+    def create(self, session_id: str):
+        """Start an empty session"""
+        pass
+
+    @abstractmethod
+    def get_messages(self, session_id: str) -> Optional[List[Message]]:
+        """Return a session's messages, or None if it does not exist or has expired"""
+        pass
+
+    @abstractmethod
+    def append(self, session_id: str, messages: List[Message], max_messages: int,
+               max_tokens: Optional[int] = None) -> List[Message]:
+        """
+        Append messages (creating the session if needed) and trim the history
+        to max_messages and max_tokens. Returns the messages trimmed away.
+        """
+        pass
+
+    @abstractmethod
+    def get_summary(self, session_id: str) -> Optional[str]:
+        """Return the summary of a session's trimmed-away turns, if any"""
+        pass
+
+    @abstractmethod
+    def set_summary(self, session_id: str, summary: str):
+        """Replace a session's summary (ignored if the session no longer exists)"""
+        pass
+
+    @abstractmethod
+    def clear(self, session_id: str):
+        """Remove all messages and the summary from a session"""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of live sessions"""
+        pass
+
+
+@dataclass
+class _Session:
+    """An in-memory session"""
+    last_seen: float = 0.0
+    messages: List[Message] = field(default_factory=list)
+    summary: Optional[str] = None
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local sessions, bounded by count (least recently used are evicted
+    first) and by idle time. Only suitable for a single worker process.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_ttl: Optional[float] = 3600):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl  # Seconds without activity before a session expires (None or 0 disables)
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_expired(self, session: "_Session", now: float) -> bool:
+        return bool(self.idle_ttl) and now - session.last_seen > self.idle_ttl
+
+    def _live(self, session_id: str, now: float) -> Optional["_Session"]:
+        """Return an unexpired session, dropping it if it has expired"""
+        session = self._sessions.get(session_id)
+        if session is not None and self._is_expired(session, now):
+            del self._sessions[session_id]
+            return None
+        return session
+
+    def _touch(self, session_id: str, session: "_Session", now: float):
+        """Store a session as most recently used, evicting from the other end when full"""
+        session.last_seen = now
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        # Least recently used sessions sit at the front, so expired ones can be dropped in order
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if not self._is_expired(oldest, now):
+                break
+            del self._sessions[oldest_id]
+
+    def create(self, session_id: str):
+        with self._lock:
+            self._touch(session_id, _Session(), time.monotonic())
+
+    def get_messages(self, session_id: str) -> Optional[List[Message]]:
+        now = time.monotonic()
+        with self._lock:
+            session = self._live(session_id, now)
+            if session is None:
+                return None
+            self._touch(session_id, session, now)
+            return list(session.messages)
+
+    def append(self, session_id: str, messages: List[Message], max_messages: int,
+               max_tokens: Optional[int] = None) -> List[Message]:
+        now = time.monotonic()
+        with self._lock:
+            session = self._live(session_id, now) or _Session()
+            session.messages, evicted = trim_history(session.messages + messages, max_messages, max_tokens)
+            self._touch(session_id, session, now)
+            return evicted
+
+    def get_summary(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            session = self._live(session_id, time.monotonic())
+            return session.summary if session else None
+
+    def set_summary(self, session_id: str, summary: str):
+        with self._lock:
+            session = self._live(session_id, time.monotonic())
+            if session is not None:
+                session.summary = summary
+
+    def clear(self, session_id: str):
+        with self._lock:
+            if session_id in self._sessions:
+                self._touch(session_id, _Session(), time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite database in WAL mode, so several worker processes
+    can share them. Sessions idle for longer than idle_ttl are purged
+    periodically.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            last_seen REAL NOT NULL,
+            summary TEXT
+        );
+        CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+        CREATE TABLE IF NOT EXISTS messages (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            tokens INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, seq);
+    """
+
+    def __init__(self, path: str, idle_ttl: Optional[float] = 3600, purge_interval: float = 60):
+        self.path = path
+        self.idle_ttl = idle_ttl              # Seconds without activity before a session expires (None or 0 disables)
+        self.purge_interval = purge_interval  # Minimum seconds between purges of expired sessions
+        self._local = threading.local()       # One connection per thread
+        self._last_purge = 0.0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(self.SCHEMA)
+        self._add_missing_columns(connection)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit mode; multi-statement writes open their own transactions
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _add_missing_columns(connection: sqlite3.Connection):
+        """Upgrade databases created before summaries and token counts were stored"""
+        for table, column, definition in (("sessions", "summary", "TEXT"),
+                                          ("messages", "tokens", "INTEGER NOT NULL DEFAULT 0")):
+            columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def _cutoff(self, now: float) -> float:
+        return now - self.idle_ttl if self.idle_ttl else float("-inf")
+
+    def _maybe_purge(self, connection: sqlite3.Connection, now: float):
+        """Delete expired sessions (and their messages), at most once per purge_interval"""
+        if not self.idle_ttl or now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        connection.execute("DELETE FROM sessions WHERE last_seen < ?", (self._cutoff(now),))
+
+    def create(self, session_id: str):
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO sessions (id, last_seen) VALUES (?, ?)", (session_id, now)
+        )
+        self._maybe_purge(connection, now)
+
+    def get_messages(self, session_id: str) -> Optional[List[Message]]:
+        now = time.time()
+        connection = self._connection()
+        touched = connection.execute(
+            "UPDATE sessions SET last_seen = ? WHERE id = ? AND last_seen >= ?",
+            (now, session_id, self._cutoff(now))
+        ).rowcount
+        if not touched:
+            return None
+        rows = connection.execute(
+            "SELECT role, content, tokens FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+        ).fetchall()
+        return [Message(role=role, content=content, tokens=tokens) for role, content, tokens in rows]
+
+    def append(self, session_id: str, messages: List[Message], max_messages: int,
+               max_tokens: Optional[int] = None) -> List[Message]:
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # An expired session starts over rather than resuming its old history
+            expired = connection.execute(
+                "SELECT 1 FROM sessions WHERE id = ? AND last_seen < ?", (session_id, self._cutoff(now))
+            ).fetchone()
+            if expired:
+                connection.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                connection.execute("UPDATE sessions SET summary = NULL WHERE id = ?", (session_id,))
+            connection.execute(
+                "INSERT INTO sessions (id, last_seen) VALUES (?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET last_seen = excluded.last_seen",
+                (session_id, now)
+            )
+            connection.executemany(
+                "INSERT INTO messages (session_id, role, content, tokens) VALUES (?, ?, ?, ?)",
+                [(session_id, message.role, message.content, message.tokens) for message in messages]
+            )
+            rows = connection.execute(
+                "SELECT seq, role, content, tokens FROM messages WHERE session_id = ? ORDER BY seq",
+                (session_id,)
+            ).fetchall()
+            history = [Message(role=role, content=content, tokens=tokens) for _, role, content, tokens in rows]
+            _, evicted = trim_history(history, max_messages, max_tokens)
+            if evicted:
+                connection.execute(
+                    "DELETE FROM messages WHERE session_id = ? AND seq <= ?",
+                    (session_id, rows[len(evicted) - 1][0])
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        self._maybe_purge(connection, now)
+        return evicted
+
+    def get_summary(self, session_id: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT summary FROM sessions WHERE id = ? AND last_seen >= ?",
+            (session_id, self._cutoff(time.time()))
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_summary(self, session_id: str, summary: str):
+        self._connection().execute("UPDATE sessions SET summary = ? WHERE id = ?", (summary, session_id))
+
+    def clear(self, session_id: str):
+        connection = self._connection()
+        connection.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        connection.execute("UPDATE sessions SET summary = NULL WHERE id = ?", (session_id,))
+
+    def __len__(self) -> int:
+        now = time.time()
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE last_seen >= ?", (self._cutoff(now),)
+        ).fetchone()[0]
+
+
+def create_session_store(backend: str, path: str, max_sessions: int,
+                         idle_ttl: Optional[float]) -> SessionStore:
+    """Build the session store named by backend ("memory" or "sqlite")"""
+    if backend == "memory":
+        return InMemorySessionStore(max_sessions, idle_ttl)
+    if backend == "sqlite":
+        return SQLiteSessionStore(path, idle_ttl)
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -1,9 +1,16 @@
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import hashlib
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Callable, FrozenSet, Iterable, Iterator, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from models import Course, CourseChunk
-from sentence_transformers import SentenceTransformer
+from cache import LRUCache
+from embeddings import EmbeddingBackend, SentenceTransformerBackend
+from course_catalog import CourseCatalogIndex
+from course_resolver import CourseNameResolver
+from lexical_index import LexicalIndex, reciprocal_rank_fusion
+from metrics import COURSE_RESOLUTION, EMBEDDING, LEXICAL_QUERY, VECTOR_QUERY
 
 @dataclass
 class SearchResults:
@@ -12,6 +19,7 @@ class SearchResults:
     metadata: List[Dict[str, Any]]
     distances: List[float]
     error: Optional[str] = None
+    ids: List[str] = field(default_factory=list)  # Chunk IDs, when the search reports them
     
     @classmethod
     def from_chroma(cls, chroma_results: Dict) -> 'SearchResults':
@@ -32,32 +40,159 @@ class SearchResults:
         return len(self.documents) == 0
 
 class VectorStore:
-    """Vector storage using ChromaDB for course content and metadata"""
+    """
+    Vector storage using ChromaDB for course content and metadata.
     
-    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5):
-        self.max_results = max_results
+    Chroma calls are confined to the storage hooks (_query_content,
+    _get_content, _store_chunks, _delete_chunks, ...), which other backends
+    such as NumpyVectorStore override.
+    """
+    
+    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5,
+                 embedding_cache_size: int = 1024, embedding_cache_ttl: Optional[float] = None,
+                 course_match_max_distance: float = 1.3, embedding_batch_size: int = 256,
+                 lexical_index_path: Optional[str] = None, hybrid_candidates: int = 20,
+                 rrf_k: int = 60, embedder: Optional[EmbeddingBackend] = None):
+        # Imported here so importing this module stays cheap until a store is opened
+        import chromadb
+        from chromadb.config import Settings
+        
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(
             path=chroma_path,
             settings=Settings(anonymized_telemetry=False)
         )
         
-        # Set up sentence transformer embedding function
-        self.embedding_function = chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=embedding_model
-        )
+        # Embeddings are computed here and handed to Chroma, never by a Chroma embedding function
+        self.embedder = embedder or SentenceTransformerBackend(embedding_model)
         
         # Create collections for different types of data
         self.course_catalog = self._create_collection("course_catalog")  # Course titles/instructors
         self.course_content = self._create_collection("course_content")  # Actual course material
+        
+        # Chunks embedded and written per call, capped by Chroma's own limit
+        self._setup(max_results, embedding_cache_size, embedding_cache_ttl, course_match_max_distance,
+                    min(embedding_batch_size, self.client.get_max_batch_size()),
+                    lexical_index_path, hybrid_candidates, rrf_k)
+    
+    def _setup(self, max_results: int, embedding_cache_size: int, embedding_cache_ttl: Optional[float],
+               course_match_max_distance: float, embedding_batch_size: int,
+               lexical_index_path: Optional[str], hybrid_candidates: int, rrf_k: int):
+        """Build the in-memory indexes and caches shared by every storage backend (storage must be open)"""
+        self.max_results = max_results
+        self.hybrid_candidates = hybrid_candidates  # Results taken from each ranking before fusion
+        self.rrf_k = rrf_k                          # Reciprocal rank fusion constant
+        
+        # Bumped on every write so caches built on search results can detect staleness
+        self.generation = 0
+        self._generation_lock = threading.Lock()
+        
+        self.embedding_batch_size = max(1, embedding_batch_size)
+        
+        # Query text -> embedding, shared by catalog and content searches
+        self.query_embedding_cache = LRUCache(embedding_cache_size, embedding_cache_ttl)
+        
+        # In-memory copy of the catalog so link and title lookups skip the store
+        self.catalog_index = CourseCatalogIndex()
+        self._load_catalog_index()
+        
+        # Lexical title matching first, vector search only as a fallback
+        self.course_resolver = CourseNameResolver(
+            self.catalog_index,
+            self._nearest_course,
+            max_distance=course_match_max_distance
+        )
+        
+        # BM25 over the content chunks, fused with vector results (None = vector search only)
+        self.lexical_index = None
+        if lexical_index_path:
+            self.lexical_index = LexicalIndex(lexical_index_path)
+            self._load_lexical_index()
+    
+    def _bump_generation(self):
+        """Record that stored content or catalog data has changed"""
+        with self._generation_lock:
+            self.generation += 1
+    
+    def _load_catalog_index(self):
+        """Populate the catalog index from the course_catalog collection"""
+        try:
+            results = self.course_catalog.get(include=["metadatas"])
+            self.catalog_index.load(results.get('metadatas') or [])
+        except Exception as e:
+            print(f"Error loading course catalog index: {e}")
+    
+    def _load_lexical_index(self):
+        """Load the persisted lexical index, rebuilding it from Chroma if it is missing or out of step"""
+        loaded = self.lexical_index.load()
+        try:
+            stored = self._content_count()
+            if len(self.lexical_index) == stored and (loaded or not stored):
+                return
+            
+            print(f"Rebuilding lexical index over {stored} chunks...")
+            self.lexical_index.clear()
+            for ids, documents, metadatas in self._content_pages(page_size=5000):
+                self.lexical_index.add_many(
+                    (chunk_id, document, metadata.get("course_title"), metadata.get("lesson_number"))
+                    for chunk_id, document, metadata in zip(ids, documents, metadatas)
+                )
+            self.lexical_index.save()
+        except Exception as e:
+            print(f"Error rebuilding lexical index: {e}")
+    
+    def save_lexical_index(self):
+        """Persist the lexical index if it has changed since it was last saved"""
+        if self.lexical_index is not None and self.lexical_index.dirty:
+            self.lexical_index.save()
+    
+    def flush(self):
+        """
+        Persist in-memory state changed by writes since the last flush.
+        Chroma writes through on its own, so only the lexical index is saved.
+        """
+        self.save_lexical_index()
+    
+    def _content_count(self) -> int:
+        """Number of stored content chunks"""
+        return self.course_content.count()
+    
+    def _content_pages(self, page_size: int) -> Iterator[Tuple[List[str], List[str], List[Dict[str, Any]]]]:
+        """Yield every stored chunk as (ids, documents, metadatas) pages"""
+        for offset in range(0, self._content_count(), page_size):
+            page = self.course_content.get(include=["documents", "metadatas"],
+                                           limit=page_size, offset=offset)
+            yield page["ids"], page["documents"], page["metadatas"]
     
     def _create_collection(self, name: str):
         """Create or get a ChromaDB collection"""
         return self.client.get_or_create_collection(
             name=name,
-            embedding_function=self.embedding_function
+            embedding_function=None  # Vectors always come from self.embedder
         )
     
+    def warm_up(self):
+        """
+        Run one embedding and one content query, so the model's first forward
+        pass and the store's index load happen now instead of on a user query.
+        """
+        embedding = self.embedder.encode(["warm up"])[0]
+        if self._content_count():
+            self._query_content(embedding, 1, None, None)
+    
+    def embed_query(self, text: str):
+        """Embed a query string, reusing the cached vector for repeated text"""
+        embedding = self.query_embedding_cache.get(text)
+        if embedding is None:
+            with EMBEDDING.time():
+                embedding = self.embedder.encode([text])[0]
+            self.query_embedding_cache.set(text, embedding)
+        return embedding
+    
+    def get_embedding_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the query embedding cache"""
+        return self.query_embedding_cache.stats()
+    
     def search(self, 
                query: str,
                course_name: Optional[str] = None,
@@ -78,38 +213,112 @@ class VectorStore:
         # Step 1: Resolve course name if provided
         course_title = None
         if course_name:
-            course_title = self._resolve_course_name(course_name)
+            with COURSE_RESOLUTION.time():
+                course_title = self._resolve_course_name(course_name)
             if not course_title:
                 return SearchResults.empty(f"No course found matching '{course_name}'")
         
-        # Step 2: Build filter for content search
-        filter_dict = self._build_filter(course_title, lesson_number)
-        
-        # Step 3: Search course content
+        # Step 2: Search course content
         # Use provided limit or fall back to configured max_results
         search_limit = limit if limit is not None else self.max_results
         
         try:
-            results = self.course_content.query(
-                query_texts=[query],
-                n_results=search_limit,
-                where=filter_dict
+            if self.lexical_index is not None:
+                return self._hybrid_search(query, course_title, lesson_number, search_limit)
+            
+            embedding = self.embed_query(query)
+            with VECTOR_QUERY.time():
+                hits = self._query_content(embedding, search_limit, course_title, lesson_number)
+            return SearchResults(
+                documents=[document for _, document, _, _ in hits],
+                metadata=[metadata for _, _, metadata, _ in hits],
+                distances=[distance for _, _, _, distance in hits],
+                ids=[chunk_id for chunk_id, _, _, _ in hits]
             )
-            return SearchResults.from_chroma(results)
         except Exception as e:
             return SearchResults.empty(f"Search error: {str(e)}")
     
+    def context_ids(self, query: str) -> Optional[FrozenSet[str]]:
+        """Chunk IDs an unfiltered search for query retrieves (None if the search failed)"""
+        results = self.search(query)
+        return None if results.error else frozenset(results.ids)
+    
+    def _query_content(self, query_embedding, n_results: int, course_title: Optional[str],
+                       lesson_number: Optional[int]) -> List[Tuple[str, str, Dict[str, Any], float]]:
+        """
+        Nearest content chunks to an embedding within the optional course/lesson filter.
+        
+        Returns:
+            (chunk id, document, metadata, distance) tuples, nearest first
+        """
+        results = self.course_content.query(
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            where=self._build_filter(course_title, lesson_number)
+        )
+        if not results['ids'] or not results['ids'][0]:
+            return []
+        return list(zip(results['ids'][0], results['documents'][0],
+                        results['metadatas'][0], results['distances'][0]))
+    
+    def _get_content(self, chunk_ids: List[str]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Fetch stored chunks by id as (chunk id, document, metadata); unknown ids are skipped"""
+        results = self.course_content.get(ids=chunk_ids, include=["documents", "metadatas"])
+        return list(zip(results["ids"], results["documents"], results["metadatas"]))
+    
+    def _hybrid_search(self, query: str, course_title: Optional[str], lesson_number: Optional[int],
+                       limit: int) -> SearchResults:
+        """
+        Fuse vector and BM25 rankings with reciprocal rank fusion.
+        
+        Both rankings honor the same course/lesson filter. Chunks found only
+        lexically have no vector distance, so theirs is reported as NaN.
+        """
+        candidates = max(limit, self.hybrid_candidates)
+        embedding = self.embed_query(query)
+        with VECTOR_QUERY.time():
+            vector = self._query_content(embedding, candidates, course_title, lesson_number)
+        vector_ids = [chunk_id for chunk_id, _, _, _ in vector]
+        found = {
+            chunk_id: (document, metadata, distance)
+            for chunk_id, document, metadata, distance in vector
+        }
+        
+        with LEXICAL_QUERY.time():
+            lexical_ids = [chunk_id for chunk_id, _ in
+                           self.lexical_index.search(query, candidates, course_title, lesson_number)]
+            fused = [chunk_id for chunk_id, _ in
+                     reciprocal_rank_fusion([vector_ids, lexical_ids], self.rrf_k)[:limit]]
+        
+        missing = [chunk_id for chunk_id in fused if chunk_id not in found]
+        if missing:
+            for chunk_id, document, metadata in self._get_content(missing):
+                found[chunk_id] = (document, metadata, float("nan"))
+        
+        hit_ids = [chunk_id for chunk_id in fused if chunk_id in found]
+        hits = [found[chunk_id] for chunk_id in hit_ids]
+        return SearchResults(
+            documents=[document for document, _, _ in hits],
+            metadata=[metadata for _, metadata, _ in hits],
+            distances=[distance for _, _, distance in hits],
+            ids=hit_ids
+        )
+    
     def _resolve_course_name(self, course_name: str) -> Optional[str]:
-        """Use vector search to find best matching course by name"""
+        """Find the catalog title that best matches a user-supplied course name"""
+        return self.course_resolver.resolve(course_name)
+    
+    def _nearest_course(self, course_name: str) -> Optional[Tuple[str, float]]:
+        """Use vector search to find the closest course title and its distance"""
         try:
             results = self.course_catalog.query(
-                query_texts=[course_name],
+                query_embeddings=[self.embed_query(course_name)],
                 n_results=1
             )
             
             if results['documents'][0] and results['metadatas'][0]:
                 # Return the title (which is now the ID)
-                return results['metadatas'][0][0]['title']
+                return results['metadatas'][0][0]['title'], results['distances'][0][0]
         except Exception as e:
             print(f"Error resolving course name: {e}")
         
@@ -132,12 +341,11 @@ class VectorStore:
             
         return {"lesson_number": lesson_number}
     
-    def add_course_metadata(self, course: Course):
-        """Add course information to the catalog for semantic search"""
+    @staticmethod
+    def _catalog_metadata(course: Course) -> Dict[str, Any]:
+        """Catalog record for a course, with its lessons serialized as JSON"""
         import json
 
-        course_text = course.title
-        
         # Build lessons metadata and serialize as JSON string
         lessons_metadata = []
         for lesson in course.lessons:
@@ -147,121 +355,226 @@ class VectorStore:
                 "lesson_link": lesson.lesson_link
             })
         
-        self.course_catalog.add(
+        return {
+            "title": course.title,
+            "instructor": course.instructor,
+            "course_link": course.course_link,
+            "lessons_json": json.dumps(lessons_metadata),  # Serialize as JSON string
+            "lesson_count": len(course.lessons)
+        }
+    
+    def add_course_metadata(self, course: Course):
+        """Add course information to the catalog for semantic search"""
+        course_text = course.title
+        
+        # Upsert so re-ingesting an edited course replaces its catalog entry
+        self.course_catalog.upsert(
             documents=[course_text],
-            metadatas=[{
-                "title": course.title,
-                "instructor": course.instructor,
-                "course_link": course.course_link,
-                "lessons_json": json.dumps(lessons_metadata),  # Serialize as JSON string
-                "lesson_count": len(course.lessons)
-            }],
+            embeddings=self.embedder.encode([course_text]),
+            metadatas=[self._catalog_metadata(course)],
             ids=[course.title]
         )
+        self.catalog_index.add_course(course)
+        self._bump_generation()
+    
+    @staticmethod
+    def _chunk_id(chunk: CourseChunk) -> str:
+        """Use title with chunk index for unique IDs"""
+        return f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}"
+    
+    @staticmethod
+    def _chunk_hash(chunk: CourseChunk) -> str:
+        """Fingerprint of everything stored for a chunk, used to detect edits"""
+        return hashlib.sha1(f"{chunk.lesson_number}\x00{chunk.content}".encode('utf-8')).hexdigest()
     
-    def add_course_content(self, chunks: List[CourseChunk]):
-        """Add course content chunks to the vector store"""
-        if not chunks:
-            return
-        
-        documents = [chunk.content for chunk in chunks]
-        metadatas = [{
-            "course_title": chunk.course_title,
-            "lesson_number": chunk.lesson_number,
-            "chunk_index": chunk.chunk_index
-        } for chunk in chunks]
-        # Use title with chunk index for unique IDs
-        ids = [f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}" for chunk in chunks]
-        
-        self.course_content.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
+    @contextmanager
+    def bulk_encoding(self, processes: int = 0) -> Iterator[Callable[[List[str]], Any]]:
+        """
+        Yield an encode function that uses several processes, if the embedding
+        backend supports it, for add_course_content and upsert_course. Queries
+        and other writes keep encoding in-process.
+        """
+        with self.embedder.parallel(processes) as encode:
+            yield encode
+    
+    @staticmethod
+    def _batched(chunks: Iterable[CourseChunk], size: int) -> Iterator[List[CourseChunk]]:
+        """Group an iterable of chunks into lists of at most size items"""
+        iterator = iter(chunks)
+        while True:
+            batch = list(itertools.islice(iterator, size))
+            if not batch:
+                return
+            yield batch
+    
+    def _write_content(self, chunks: Iterable[CourseChunk], upsert: bool = False,
+                       encode: Optional[Callable[[List[str]], Any]] = None) -> int:
+        """
+        Embed and store chunks in bounded batches, replacing existing IDs when
+        upsert is set. Only one batch is held in memory at a time.
+        
+        Returns:
+            Number of chunks written
+        """
+        encode = encode or self.embedder.encode
+        written = 0
+        
+        for batch in self._batched(chunks, self.embedding_batch_size):
+            documents = [chunk.content for chunk in batch]
+            metadatas = [{
+                "course_title": chunk.course_title,
+                "lesson_number": chunk.lesson_number,
+                "chunk_index": chunk.chunk_index,
+                "content_hash": self._chunk_hash(chunk)
+            } for chunk in batch]
+            ids = [self._chunk_id(chunk) for chunk in batch]
+            
+            self._store_chunks(ids, documents, encode(documents), metadatas, upsert)
+            if self.lexical_index is not None:
+                self.lexical_index.add_many(
+                    (chunk_id, chunk.content, chunk.course_title, chunk.lesson_number)
+                    for chunk_id, chunk in zip(ids, batch)
+                )
+            written += len(batch)
+            self._bump_generation()
+        
+        return written
+    
+    def _store_chunks(self, ids: List[str], documents: List[str], embeddings,
+                      metadatas: List[Dict[str, Any]], upsert: bool):
+        """Write one batch of embedded chunks, replacing existing IDs when upsert is set"""
+        write = self.course_content.upsert if upsert else self.course_content.add
+        write(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
+    
+    def _stored_hashes(self, course_title: str) -> Dict[str, Optional[str]]:
+        """Content hash of every stored chunk of a course, by chunk id"""
+        existing = self.course_content.get(
+            where={"course_title": course_title},
+            include=["metadatas"]
         )
+        return {
+            chunk_id: (metadata or {}).get("content_hash")
+            for chunk_id, metadata in zip(existing["ids"], existing["metadatas"])
+        }
+    
+    def _delete_chunks(self, chunk_ids: List[str]):
+        """Delete stored chunks by id"""
+        self.course_content.delete(ids=chunk_ids)
+    
+    def add_course_content(self, chunks: Iterable[CourseChunk],
+                           encode: Optional[Callable[[List[str]], Any]] = None) -> int:
+        """
+        Add course content chunks to the vector store.
+        
+        Args:
+            chunks: Any iterable of chunks; generators are consumed batch by batch
+            encode: Function embedding the chunks, e.g. from bulk_encoding() (default: the embedder)
+            
+        Returns:
+            Number of chunks added
+        """
+        return self._write_content(chunks, encode=encode)
+    
+    def upsert_course(self, course: Course, chunks: Iterable[CourseChunk],
+                      encode: Optional[Callable[[List[str]], Any]] = None) -> Tuple[int, int]:
+        """
+        Bring a stored course in line with a re-processed document.
+        
+        Only chunks whose content hash differs from the stored one (per
+        chunk_index) are re-embedded; chunks that no longer exist are deleted.
+        
+        Args:
+            course: Course metadata from the new document (complete once chunks are consumed)
+            chunks: All chunks of the new document; generators are consumed batch by batch
+            encode: Function embedding the changed chunks (default: the embedder)
+            
+        Returns:
+            Tuple of (chunks written, chunks deleted)
+        """
+        stored_hashes = self._stored_hashes(course.title)
+        
+        new_ids = set()
+        
+        def changed_chunks() -> Iterator[CourseChunk]:
+            for chunk in chunks:
+                chunk_id = self._chunk_id(chunk)
+                new_ids.add(chunk_id)
+                if stored_hashes.get(chunk_id) != self._chunk_hash(chunk):
+                    yield chunk
+        
+        written = self._write_content(changed_chunks(), upsert=True, encode=encode)
+        
+        # Chunk IDs are per chunk_index, so the writes above never touch an orphan
+        orphans = [chunk_id for chunk_id in stored_hashes if chunk_id not in new_ids]
+        if orphans:
+            self._delete_chunks(orphans)
+            if self.lexical_index is not None:
+                self.lexical_index.remove(orphans)
+            self._bump_generation()
+        self.add_course_metadata(course)
+        
+        return written, len(orphans)
+    
+    def remove_course(self, course_title: str) -> bool:
+        """
+        Delete a course's content chunks and catalog entry.
+        
+        Returns:
+            True if the course was in the catalog
+        """
+        try:
+            self._delete_course(course_title)
+            if self.lexical_index is not None:
+                self.lexical_index.remove_course(course_title)
+        except Exception as e:
+            print(f"Error removing course {course_title}: {e}")
+            return False
+        
+        existed = course_title in self.catalog_index
+        self.catalog_index.remove_course(course_title)
+        self._bump_generation()
+        return existed
+    
+    def _delete_course(self, course_title: str):
+        """Delete a course's content chunks and catalog entry from storage"""
+        self.course_content.delete(where={"course_title": course_title})
+        self.course_catalog.delete(ids=[course_title])
     
     def clear_all_data(self):
         """Clear all data from both collections"""
         try:
-            self.client.delete_collection("course_catalog")
-            self.client.delete_collection("course_content")
-            # Recreate collections
-            self.course_catalog = self._create_collection("course_catalog")
-            self.course_content = self._create_collection("course_content")
+            self._clear_storage()
+            self.catalog_index.clear()
+            if self.lexical_index is not None:
+                self.lexical_index.clear()
+            self._bump_generation()
         except Exception as e:
             print(f"Error clearing data: {e}")
     
+    def _clear_storage(self):
+        """Drop and recreate both collections"""
+        self.client.delete_collection("course_catalog")
+        self.client.delete_collection("course_content")
+        # Recreate collections
+        self.course_catalog = self._create_collection("course_catalog")
+        self.course_content = self._create_collection("course_content")
+    
     def get_existing_course_titles(self) -> List[str]:
-        """Get all existing course titles from the vector store"""
-        try:
-            # Get all documents from the catalog
-            results = self.course_catalog.get()
-            if results and 'ids' in results:
-                return results['ids']
-            return []
-        except Exception as e:
-            print(f"Error getting existing course titles: {e}")
-            return []
+        """Get all existing course titles from the catalog index"""
+        return self.catalog_index.titles()
     
     def get_course_count(self) -> int:
-        """Get the total number of courses in the vector store"""
-        try:
-            results = self.course_catalog.get()
-            if results and 'ids' in results:
-                return len(results['ids'])
-            return 0
-        except Exception as e:
-            print(f"Error getting course count: {e}")
-            return 0
+        """Get the total number of courses in the catalog index"""
+        return len(self.catalog_index)
     
     def get_all_courses_metadata(self) -> List[Dict[str, Any]]:
-        """Get metadata for all courses in the vector store"""
-        import json
-        try:
-            results = self.course_catalog.get()
-            if results and 'metadatas' in results:
-                # Parse lessons JSON for each course
-                parsed_metadata = []
-                for metadata in results['metadatas']:
-                    course_meta = metadata.copy()
-                    if 'lessons_json' in course_meta:
-                        course_meta['lessons'] = json.loads(course_meta['lessons_json'])
-                        del course_meta['lessons_json']  # Remove the JSON string version
-                    parsed_metadata.append(course_meta)
-                return parsed_metadata
-            return []
-        except Exception as e:
-            print(f"Error getting courses metadata: {e}")
-            return []
+        """Get metadata for all courses in the catalog index"""
+        return self.catalog_index.all_metadata()
 
     def get_course_link(self, course_title: str) -> Optional[str]:
         """Get course link for a given course title"""
-        try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and 'metadatas' in results and results['metadatas']:
-                metadata = results['metadatas'][0]
-                return metadata.get('course_link')
-            return None
-        except Exception as e:
-            print(f"Error getting course link: {e}")
-            return None
+        return self.catalog_index.get_course_link(course_title)
     
     def get_lesson_link(self, course_title: str, lesson_number: int) -> Optional[str]:
         """Get lesson link for a given course title and lesson number"""
-        import json
-        try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and 'metadatas' in results and results['metadatas']:
-                metadata = results['metadatas'][0]
-                lessons_json = metadata.get('lessons_json')
-                if lessons_json:
-                    lessons = json.loads(lessons_json)
-                    # Find the lesson with matching number
-                    for lesson in lessons:
-                        if lesson.get('lesson_number') == lesson_number:
-                            return lesson.get('lesson_link')
-            return None
-        except Exception as e:
-            print(f"Error getting lesson link: {e}")
-    
\ No newline at end of file
+        return self.catalog_index.get_lesson_link(course_title, lesson_number)
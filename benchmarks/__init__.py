@@ -0,0 +1,40 @@
+"""
+Benchmarks for the RAG backend.
+
+Run from the repository root, e.g. `uv run python -m benchmarks.query_load`.
+The backend modules use flat imports, so the backend directory is put on
+the import path here.
+"""
+import dataclasses
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BACKEND_DIR = REPO_ROOT / "backend"
+DOCS_DIR = REPO_ROOT / "docs"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def isolated_config(workdir: str, **overrides):
+    """
+    A copy of the app config with every storage path under workdir, so a
+    benchmark never writes to the repository's data directories whichever
+    VECTOR_BACKEND or SESSION_BACKEND is set. The answer cache is off unless
+    overridden: it would turn repeated queries into cache hits.
+    """
+    from config import config
+
+    data_dir = os.path.join(workdir, "chroma_db")
+    settings = dict(
+        CHROMA_PATH=data_dir,
+        INGEST_MANIFEST_PATH=os.path.join(data_dir, "ingest_manifest.json"),
+        LEXICAL_INDEX_PATH=os.path.join(data_dir, "lexical_index.pkl"),
+        NUMPY_STORE_PATH=os.path.join(data_dir, "numpy_store"),
+        SESSION_DB_PATH=os.path.join(data_dir, "sessions.sqlite3"),
+        ANSWER_CACHE_SIZE=0,
+    )
+    settings.update(overrides)
+    return dataclasses.replace(config, **settings)
@@ -0,0 +1,142 @@
+"""
+Concurrency stress check for per-request sources and session history.
+
+Fires hundreds of overlapping `RAGSystem.query` / `query_stream` calls
+against a jittery fake Anthropic client and the real in-process Chroma
+store. Each query is pinned to one course and one session, so any sources
+or history that leak between requests show up as violations. Session
+stores are also hammered directly from a thread pool. Exits non-zero if
+anything leaked.
+
+    uv run python -m benchmarks.concurrency_stress --queries 500 --sessions 40
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from benchmarks import DOCS_DIR, isolated_config
+from benchmarks.fake_anthropic import FakeAsyncAnthropic
+from config import config
+from rag_system import RAGSystem
+from session_manager import SessionManager
+from session_store import InMemorySessionStore, SQLiteSessionStore
+
+QUERY_PATTERN = re.compile(r"\[q(\d+) s(\d+)\]")
+
+
+def history_violations(manager: SessionManager, session_id: str, tag: str) -> List[str]:
+    """Roles must alternate user/assistant and every user turn must carry the session's tag"""
+    problems = []
+    for i, message in enumerate(manager.get_history_messages(session_id) or []):
+        expected_role = "user" if i % 2 == 0 else "assistant"
+        if message["role"] != expected_role:
+            problems.append(f"{session_id}: message {i} is {message['role']}, expected {expected_role}")
+        if message["role"] == "user" and tag not in message["content"]:
+            problems.append(f"{session_id}: foreign message {message['content']!r}")
+    return problems
+
+
+async def stress_queries(rag: RAGSystem, total: int, sessions: int) -> Dict[str, Any]:
+    titles = sorted(rag.vector_store.get_existing_course_titles())
+    session_ids = [rag.session_manager.create_session() for _ in range(sessions)]
+    violations: List[str] = []
+
+    def course_for(i: int) -> str:
+        return titles[i % len(titles)]
+
+    def tool_input(text: str) -> Dict[str, Any]:
+        i = int(QUERY_PATTERN.search(text).group(1))
+        return {"query": text, "course_name": course_for(i)}
+
+    rag.ai_generator.client = FakeAsyncAnthropic(latency=0.005, jitter=0.02, tool_input=tool_input)
+
+    async def one(i: int):
+        s = i % sessions
+        query = f"[q{i} s{s}] What does this course cover?"
+        if i % 2:
+            sources = []
+            async for event, payload in rag.query_stream(query, session_ids[s]):
+                if event == "sources":
+                    sources = payload
+        else:
+            _, sources = await rag.query(query, session_ids[s])
+        if not sources:
+            violations.append(f"q{i}: no sources")
+        for source in sources:
+            if not source["label"].startswith(course_for(i)):
+                violations.append(f"q{i}: got {source['label']!r} while searching {course_for(i)!r}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+
+    for s, session_id in enumerate(session_ids):
+        violations.extend(history_violations(rag.session_manager, session_id, f" s{s}]"))
+
+    return {
+        "queries": total,
+        "sessions": sessions,
+        "seconds": round(elapsed, 2),
+        "violations": len(violations),
+        "examples": violations[:5],
+    }
+
+
+def stress_session_store(manager: SessionManager, threads: int, exchanges: int, sessions: int) -> Dict[str, Any]:
+    session_ids = [manager.create_session() for _ in range(sessions)]
+
+    def write(i: int):
+        s = i % sessions
+        manager.add_exchange(session_ids[s], f"[q{i} s{s}] question", f"answer {i}")
+        manager.get_history_messages(session_ids[s])
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(write, range(exchanges)))
+
+    violations = []
+    for s, session_id in enumerate(session_ids):
+        violations.extend(history_violations(manager, session_id, f" s{s}]"))
+    return {"exchanges": exchanges, "violations": len(violations), "examples": violations[:5]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=32, help="Threads writing to the session stores")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_config = isolated_config(
+            workdir,
+            TOOL_RESULT_CACHE_SIZE=0,  # Every tool call really searches, concurrently
+        )
+        rag = RAGSystem(bench_config)
+        rag.add_course_folder(str(DOCS_DIR))
+
+        report = {"rag_queries": asyncio.run(stress_queries(rag, args.queries, args.sessions))}
+        rag.search_executor.shutdown()
+
+        stores = {
+            "memory": InMemorySessionStore(),
+            "sqlite": SQLiteSessionStore(os.path.join(workdir, "sessions.sqlite3")),
+        }
+        for name, store in stores.items():
+            report[f"{name}_sessions"] = stress_session_store(
+                SessionManager(config.MAX_HISTORY, store), args.threads, args.queries * 4, args.sessions
+            )
+
+    print(json.dumps(report, indent=2))
+    if any(section["violations"] for section in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
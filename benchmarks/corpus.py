@@ -0,0 +1,88 @@
+"""Synthetic course scripts in the `Course Title:/Lesson N:` format, with labelled queries"""
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+WORDS = (
+    "model context data agent prompt token vector index query server client "
+    "request response cache stream batch schema tool memory latency window "
+    "cluster shard replica embedding document chunk ranking filter session "
+    "budget trace metric pipeline worker thread process socket buffer channel"
+).split()
+
+ADJECTIVES = (
+    "amber brisk candid dapper eager fabled gentle hollow ivory jovial keen "
+    "lucid mellow nimble opal placid quaint rustic silken tawny umber vivid "
+    "wistful zesty"
+).split()
+
+NOUNS = (
+    "falcon glacier harbor lantern meadow nebula orchard pebble quarry "
+    "reef summit thicket valley willow yarrow beacon canyon delta ember fjord"
+).split()
+
+
+@dataclass
+class LabelledQuery:
+    """A question whose answer lives in exactly one lesson of the corpus"""
+    query: str
+    course_title: str
+    lesson_number: int
+
+
+def _filler_sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 24))]
+    return words[0].capitalize() + " " + " ".join(words[1:]) + "."
+
+
+def write_corpus(target_dir: str, courses: int = 10, lessons: int = 8,
+                 sentences: int = 60, seed: int = 0) -> List[LabelledQuery]:
+    """
+    Write one script per course into target_dir.
+
+    Every lesson gets one fact sentence about a unique adjective/noun pair,
+    which the returned labelled query asks about.
+    """
+    rng = random.Random(seed)
+    pairs = [(adj, noun) for adj in ADJECTIVES for noun in NOUNS]
+    rng.shuffle(pairs)
+    if courses * lessons > len(pairs):
+        # Disambiguate beyond the vocabulary with a numeric suffix
+        pairs = [(adj, f"{noun}{i}") for i in range(courses * lessons // len(pairs) + 1)
+                 for adj, noun in pairs]
+
+    Path(target_dir).mkdir(parents=True, exist_ok=True)
+    queries = []
+    pair_index = 0
+    for course in range(courses):
+        title = f"Synthetic Course {course}: {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}"
+        lines = [
+            f"Course Title: {title}",
+            f"Course Link: https://example.com/courses/{course}",
+            f"Course Instructor: Instructor {course}",
+            "",
+        ]
+        for lesson in range(lessons):
+            adjective, noun = pairs[pair_index]
+            pair_index += 1
+            handshake = rng.choice(WORDS)
+
+            body = [_filler_sentence(rng) for _ in range(sentences)]
+            fact = f"The {adjective} {noun} protocol always negotiates with the {handshake} handshake."
+            body.insert(rng.randrange(len(body) + 1), fact)
+
+            lines.append(f"Lesson {lesson}: {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}")
+            lines.append(f"Lesson Link: https://example.com/courses/{course}/lessons/{lesson}")
+            lines.append(" ".join(body))
+
+            queries.append(LabelledQuery(
+                query=f"Which handshake does the {adjective} {noun} protocol negotiate with?",
+                course_title=title,
+                lesson_number=lesson
+            ))
+
+        path = Path(target_dir) / f"synthetic_course_{course:05d}.txt"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    return queries
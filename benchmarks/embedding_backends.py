@@ -0,0 +1,147 @@
+"""
+PyTorch vs int8 ONNX Runtime embedding backend comparison.
+
+Embeds every chunk of the bundled course scripts and every lesson title
+with each backend, then reports how closely the ONNX vectors agree with the
+PyTorch ones (cosine similarity per chunk, and recall@k of the ONNX nearest
+chunks against the PyTorch ones with lesson titles as queries), alongside
+ingest throughput, single-query latency and RSS. Each backend runs in its
+own subprocess so memory numbers do not mix. Export the ONNX model first
+with `cd backend && python embeddings.py`.
+
+    uv run python -m benchmarks.embedding_backends --k 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from benchmarks import BACKEND_DIR, DOCS_DIR, REPO_ROOT
+from benchmarks.timing import current_rss_mb, peak_rss_mb, summarize_latencies
+from config import config
+from document_processor import DocumentProcessor
+from embeddings import create_embedding_backend
+
+BACKENDS = ("torch", "onnx")
+
+
+def corpus() -> Tuple[List[str], List[str]]:
+    """Chunk texts of the bundled scripts, and their lesson titles to use as queries"""
+    processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    chunks, queries = [], []
+    for path in sorted(DOCS_DIR.glob("*.txt")):
+        course, course_chunks = processor.process_course_document(str(path))
+        chunks.extend(chunk.content for chunk in course_chunks)
+        queries.extend(lesson.title for lesson in course.lessons)
+    return chunks, queries
+
+
+def bench_backend(backend: str, args) -> Dict[str, Any]:
+    chunks, queries = corpus()
+    baseline_rss = current_rss_mb()
+
+    start = time.perf_counter()
+    embedder = create_embedding_backend(backend, args.model, args.onnx_path, args.threads)
+    embedder.encode(["warm up"])
+    report: Dict[str, Any] = {"load_seconds": round(time.perf_counter() - start, 2)}
+
+    # Ingest-sized batches, as VectorStore embeds them
+    start = time.perf_counter()
+    vectors = [embedder.encode(chunks[offset:offset + args.batch_size])
+               for offset in range(0, len(chunks), args.batch_size)]
+    seconds = time.perf_counter() - start
+    report["ingest"] = {"chunks": len(chunks), "seconds": round(seconds, 2),
+                        "chunks_per_sec": round(len(chunks) / seconds, 1)}
+
+    latencies = []
+    query_vectors = []
+    for _ in range(args.repeat):
+        for query in queries:
+            start = time.perf_counter()
+            query_vectors.append(embedder.encode([query])[0])
+            latencies.append(time.perf_counter() - start)
+    report["query"] = summarize_latencies(latencies)
+
+    rss = current_rss_mb()
+    report["rss_growth_mb"] = round(rss - baseline_rss, 1) if rss is not None else None
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    np.save(args.vectors, np.vstack(vectors + [np.array(query_vectors[:len(queries)])]).astype(np.float32))
+    return report
+
+
+def normalized(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def agreement(reference: np.ndarray, candidate: np.ndarray, chunk_count: int, k: int) -> Dict[str, Any]:
+    """Cosine agreement per chunk, and recall@k of the candidate's neighbours against the reference's"""
+    reference, candidate = normalized(reference), normalized(candidate)
+    cosine = (reference[:chunk_count] * candidate[:chunk_count]).sum(axis=1)
+
+    def top_k(vectors: np.ndarray) -> np.ndarray:
+        scores = vectors[chunk_count:] @ vectors[:chunk_count].T
+        return np.argsort(-scores, axis=1)[:, :k]
+
+    expected, found = top_k(reference), top_k(candidate)
+    hits = sum(len(set(row) & set(other)) for row, other in zip(expected, found))
+    return {
+        "cosine_mean": round(float(cosine.mean()), 5),
+        "cosine_min": round(float(cosine.min()), 5),
+        "cosine_p1": round(float(np.percentile(cosine, 1)), 5),
+        f"recall_at_{k}": round(hits / expected.size, 4),
+        "top1_match": round(float((expected[:, 0] == found[:, 0]).mean()), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL)
+    parser.add_argument("--onnx-path", default=str(BACKEND_DIR / config.EMBEDDING_ONNX_PATH))
+    parser.add_argument("--threads", type=int, default=config.EMBEDDING_THREADS,
+                        help="ONNX Runtime intra-op threads (0 = runtime default)")
+    parser.add_argument("--batch-size", type=int, default=config.EMBEDDING_BATCH_SIZE,
+                        help="Chunks per encode call while ingesting")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the lesson-title queries")
+    parser.add_argument("--k", type=int, default=config.MAX_RESULTS)
+    parser.add_argument("--backend", choices=BACKENDS, help="Run one backend in this process")
+    parser.add_argument("--vectors", help="Where --backend saves its embeddings (.npy)")
+    args = parser.parse_args()
+
+    if args.backend:
+        print(json.dumps(bench_backend(args.backend, args)))
+        return
+
+    chunk_count, query_count = (len(texts) for texts in corpus())
+    report: Dict[str, Any] = {"model": args.model, "chunks": chunk_count, "queries": query_count}
+    vectors = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in BACKENDS:
+            path = os.path.join(workdir, f"{backend}.npy")
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.embedding_backends", *sys.argv[1:],
+                 "--backend", backend, "--vectors", path],
+                cwd=REPO_ROOT, capture_output=True, text=True
+            )
+            if child.returncode != 0:
+                print(child.stderr, file=sys.stderr)
+                sys.exit(child.returncode)
+            report[backend] = json.loads(child.stdout.strip().splitlines()[-1])
+            vectors[backend] = np.load(path)
+
+    report["onnx_vs_torch"] = agreement(vectors["torch"], vectors["onnx"], chunk_count, args.k)
+    report["onnx_vs_torch"]["ingest_speedup"] = round(
+        report["onnx"]["ingest"]["chunks_per_sec"] / report["torch"]["ingest"]["chunks_per_sec"], 2)
+    report["onnx_vs_torch"]["query_p50_speedup"] = round(
+        report["torch"]["query"]["p50_ms"] / report["onnx"]["query"]["p50_ms"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
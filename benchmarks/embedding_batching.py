@@ -0,0 +1,113 @@
+"""
+Query-embedding throughput with and without micro-batching, as served.
+
+Concurrent requests run the search tool the way /api/query does: on the
+RAG system's search executor, through VectorStore.search, which embeds one
+query per call. First the store embeds straight through the backend, then
+through a MicroBatchingEmbedder. A batch can only hold queries whose search
+threads are waiting on it, so it never exceeds SEARCH_WORKERS; the report
+repeats every concurrency level for each --search-workers value to show
+what that pool size allows. For each run it reports searches/sec,
+per-search latency (including time queued for a search thread) and the
+mean batch size the batcher formed. Every query text is distinct and the
+embedding and tool-result caches are off, so neither de-duplication nor a
+cache flatters the numbers.
+
+    uv run python -m benchmarks.embedding_batching --concurrency 1,8,32,64 --search-workers 4,32
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks import BACKEND_DIR, DOCS_DIR, isolated_config
+from benchmarks.embedding_backends import corpus
+from benchmarks.timing import summarize_latencies
+from config import config
+from embeddings import MicroBatchingEmbedder
+from rag_system import RAGSystem
+
+
+async def run(rag: RAGSystem, queries: List[str], concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(text: str):
+        async with slots:
+            start = time.perf_counter()
+            await rag.tool_manager.execute_tool_async("search_course_content", query=text)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in queries))
+    elapsed = time.perf_counter() - started
+    return {
+        "searches_per_sec": round(len(queries) / elapsed, 1),
+        "latency": summarize_latencies(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", default=config.EMBEDDING_BACKEND, choices=("torch", "onnx"))
+    parser.add_argument("--onnx-path", default=str(BACKEND_DIR / config.EMBEDDING_ONNX_PATH))
+    parser.add_argument("--threads", type=int, default=config.EMBEDDING_THREADS)
+    parser.add_argument("--concurrency", default="1,8,32,64", help="Comma-separated in-flight requests")
+    parser.add_argument("--search-workers", default=str(config.SEARCH_WORKERS),
+                        help="Comma-separated search executor sizes")
+    parser.add_argument("--queries", type=int, default=1000, help="Searches per run")
+    parser.add_argument("--max-batch-size", type=int, default=config.EMBEDDING_MICRO_BATCH_SIZE)
+    parser.add_argument("--max-wait", type=float, default=config.EMBEDDING_MICRO_BATCH_WAIT,
+                        help="Seconds the batcher waits for more queries once several are queued")
+    args = parser.parse_args()
+
+    titles = corpus()[1]
+    queries = [f"{titles[i % len(titles)]} ({i})" for i in range(args.queries)]
+
+    report: Dict[str, Any] = {
+        "backend": args.backend,
+        "queries": args.queries,
+        "max_batch_size": args.max_batch_size,
+        "max_wait_ms": round(args.max_wait * 1000, 3),
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for workers in (int(size) for size in args.search_workers.split(",")):
+            bench_config = isolated_config(
+                workdir,
+                EMBEDDING_BACKEND=args.backend,
+                EMBEDDING_ONNX_PATH=args.onnx_path,
+                EMBEDDING_THREADS=args.threads,
+                EMBEDDING_MICRO_BATCH=False,  # Wrapped below, per run
+                SEARCH_WORKERS=workers,
+                EMBEDDING_CACHE_SIZE=0,
+                TOOL_RESULT_CACHE_SIZE=0,
+            )
+            rag = RAGSystem(bench_config)
+            rag.add_course_folder(str(DOCS_DIR))  # Only the first system embeds; later ones reuse the store
+            rag.warm_up()
+            store = rag.vector_store
+            embedder = store.embedder
+
+            levels = {}
+            for concurrency in (int(level) for level in args.concurrency.split(",")):
+                store.embedder = embedder
+                direct = asyncio.run(run(rag, queries, concurrency))
+                batcher = MicroBatchingEmbedder(embedder, args.max_batch_size, args.max_wait)
+                store.embedder = batcher
+                batched = asyncio.run(run(rag, queries, concurrency))
+                batched["mean_batch_size"] = batcher.stats()["mean_batch_size"]
+                levels[f"concurrency_{concurrency}"] = {
+                    "direct": direct,
+                    "micro_batched": batched,
+                    "throughput_gain": round(batched["searches_per_sec"] / direct["searches_per_sec"], 2),
+                }
+            store.embedder = embedder
+            rag.search_executor.shutdown()
+            report[f"search_workers_{workers}"] = levels
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Offline stand-in for `anthropic.AsyncAnthropic` used by the benchmarks"""
+import asyncio
+import dataclasses
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class FakeTextBlock:
+    text: str
+    type: str = "text"
+
+
+@dataclass
+class FakeToolUseBlock:
+    id: str
+    name: str
+    input: Dict[str, Any]
+    type: str = "tool_use"
+
+
+@dataclass
+class FakeUsage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+
+@dataclass
+class FakeMessage:
+    content: List[Any]
+    stop_reason: str
+    usage: FakeUsage = field(default_factory=FakeUsage)
+
+
+def _response_block(value: Any) -> Dict[str, Any]:
+    """Serialize content blocks of a fake response sent back in a follow-up, as the SDK does its models"""
+    if isinstance(value, (FakeTextBlock, FakeToolUseBlock)):
+        return dataclasses.asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _FakeStream:
+    """Async context manager mirroring `AsyncMessageStream`'s text interface"""
+
+    def __init__(self, client: "FakeAsyncAnthropic", params: Dict[str, Any]):
+        self._client = client
+        self._params = params
+        self._message = client.reply(params)
+
+    async def __aenter__(self) -> "_FakeStream":
+        self._client.check_request(self._params)
+        self._client.calls += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    @property
+    async def text_stream(self):
+        # A quarter of the latency before the first token, the rest spread over the answer
+        latency = self._client.call_latency()
+        await asyncio.sleep(latency / 4)
+        texts = [block.text for block in self._message.content if block.type == "text"]
+        words = " ".join(texts).split(" ") if texts else []
+        for i, word in enumerate(words):
+            await asyncio.sleep(latency * 0.75 / len(words))
+            yield word if i == len(words) - 1 else word + " "
+        if not words:
+            await asyncio.sleep(latency * 0.75)
+
+    async def get_final_message(self) -> FakeMessage:
+        return self._message
+
+
+class _FakeMessages:
+    def __init__(self, client: "FakeAsyncAnthropic"):
+        self._client = client
+
+    async def create(self, **params) -> FakeMessage:
+        self._client.check_request(params)
+        self._client.calls += 1
+        if self._client.blocking:
+            # Emulates the synchronous client: the event loop is stalled for the whole call
+            time.sleep(self._client.call_latency())
+        else:
+            await asyncio.sleep(self._client.call_latency())
+        return self._client.reply(params)
+
+    def stream(self, **params) -> _FakeStream:
+        return _FakeStream(self._client, params)
+
+
+class FakeAsyncAnthropic:
+    """
+    Replays a search tool_use on the first turn and a canned answer after the
+    tool result, with a fixed per-call latency plus up to `jitter` seconds.
+
+    tool_input maps the user's message to the tool input to replay; by
+    default the whole message is searched for. A non-empty preamble is sent
+    as text before the tool_use block, as Claude often does.
+
+    Every query request is checked for a prompt-cacheable shape (a
+    cache-marked static system block, no history spliced into it,
+    alternating turns) and usage
+    reports a cache write the first time a tools + system prefix is seen and
+    a cache read afterwards, at roughly four characters per token.
+    """
+
+    def __init__(self, latency: float = 0.2, blocking: bool = False,
+                 answer: str = "Stubbed answer.",
+                 tool_input: Optional[Callable[[str], Dict[str, Any]]] = None,
+                 jitter: float = 0.0, preamble: str = ""):
+        self.latency = latency
+        self.jitter = jitter
+        self.blocking = blocking
+        self.answer = answer
+        self.preamble = preamble
+        self.tool_input = tool_input or (lambda text: {"query": text})
+        self.calls = 0
+        self.messages = _FakeMessages(self)
+        self._cached_prefixes = set()
+
+    def call_latency(self) -> float:
+        return self.latency + random.uniform(0, self.jitter) if self.jitter else self.latency
+
+    def check_request(self, params: Dict[str, Any]) -> None:
+        system = params["system"]
+        if isinstance(system, str) and not params.get("tools"):
+            return  # Auxiliary call such as a conversation summary
+        assert isinstance(system, list) and system, "system must be a list of content blocks"
+        assert system[0].get("cache_control") == {"type": "ephemeral"}, "system prefix is not cache-marked"
+        assert "Previous conversation" not in system[0]["text"], "history was spliced into the system prompt"
+        roles = [message["role"] for message in params["messages"]]
+        assert roles[0] == "user" and all(a != b for a, b in zip(roles, roles[1:])), \
+            f"messages must alternate starting with user, got {roles}"
+
+    def usage(self, params: Dict[str, Any]) -> FakeUsage:
+        # Everything up to and including the cache-marked system block
+        prefix = json.dumps([params.get("tools"), params["system"][:1]], sort_keys=True)
+        prefix_tokens = len(prefix) // 4
+        rest_tokens = len(json.dumps(params["messages"], default=_response_block)) // 4
+        if prefix in self._cached_prefixes:
+            return FakeUsage(input_tokens=rest_tokens, cache_read_input_tokens=prefix_tokens)
+        self._cached_prefixes.add(prefix)
+        return FakeUsage(input_tokens=rest_tokens, cache_creation_input_tokens=prefix_tokens)
+
+    def reply(self, params: Dict[str, Any]) -> FakeMessage:
+        messages = params["messages"]
+        last = messages[-1]["content"]
+        usage = self.usage(params)
+        tool_choice = params.get("tool_choice", {}).get("type")
+        if params.get("tools") and tool_choice != "none" and isinstance(last, str):
+            tool_use = FakeToolUseBlock(
+                id=f"toolu_{self.calls}",
+                name="search_course_content",
+                input=self.tool_input(last)
+            )
+            content = [FakeTextBlock(self.preamble), tool_use] if self.preamble else [tool_use]
+            return FakeMessage(content=content, stop_reason="tool_use", usage=usage)
+        return FakeMessage(content=[FakeTextBlock(self.answer)], stop_reason="end_turn", usage=usage)
@@ -0,0 +1,78 @@
+"""
+Ingestion throughput benchmark for `RAGSystem.add_course_folder`.
+
+Copies the bundled `docs/course*_script.txt` files `--scale` times (each copy
+gets its own course title) and reports chunks/sec for a cold ingest into a
+fresh Chroma directory.
+
+    uv run python -m benchmarks.ingest_throughput --scale 100 --batch-size 256
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import DOCS_DIR, isolated_config
+from config import config
+from rag_system import RAGSystem
+
+
+def write_scaled_corpus(target_dir: str, scale: int) -> int:
+    """Write scale copies of every bundled course script, returning the file count"""
+    sources = sorted(DOCS_DIR.glob("course*_script.txt"))
+    count = 0
+    for source in sources:
+        title_line, _, body = source.read_text(encoding="utf-8").partition("\n")
+        for copy in range(scale):
+            target = Path(target_dir) / f"{source.stem}_{copy:04d}.txt"
+            target.write_text(f"{title_line} (copy {copy})\n{body}", encoding="utf-8")
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=int, default=100, help="Copies of each bundled script")
+    parser.add_argument("--batch-size", type=int, default=config.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--processes", type=int, default=config.EMBEDDING_PROCESSES,
+                        help="sentence-transformers encoder processes (0 = in-process)")
+    parser.add_argument("--ingest-workers", type=int, default=config.INGEST_WORKERS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        docs_dir = os.path.join(workdir, "docs")
+        os.makedirs(docs_dir)
+        files = write_scaled_corpus(docs_dir, args.scale)
+
+        bench_config = isolated_config(
+            workdir,
+            EMBEDDING_BATCH_SIZE=args.batch_size,
+            EMBEDDING_PROCESSES=args.processes,
+            INGEST_WORKERS=args.ingest_workers,
+        )
+        rag = RAGSystem(bench_config)
+
+        start = time.perf_counter()
+        courses, chunks = rag.add_course_folder(docs_dir)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rag.add_course_folder(docs_dir)
+        warm = time.perf_counter() - start
+
+        print(json.dumps({
+            "files": files,
+            "courses": courses,
+            "chunks": chunks,
+            "batch_size": rag.vector_store.embedding_batch_size,
+            "processes": args.processes,
+            "cold_seconds": round(cold, 2),
+            "chunks_per_sec": round(chunks / cold, 1) if cold else None,
+            "warm_restart_seconds": round(warm, 3),
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Scale benchmark for the BM25 `LexicalIndex`.
+
+Builds an index over synthetic chunks whose vocabulary follows a Zipf
+distribution (so a few terms have huge postings and most are rare, like
+identifiers in transcripts), then reports build time, memory, save/load
+time and file size, and query latency with and without course/lesson
+filters.
+
+    uv run python -m benchmarks.lexical_scale --chunks 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from benchmarks.timing import current_rss_mb, peak_rss_mb, summarize_latencies
+from lexical_index import LexicalIndex
+
+
+def synthetic_chunks(count: int, vocabulary: int, words_per_chunk: int, courses: int,
+                     lessons: int, seed: int) -> Iterator[Tuple[str, str, str, int]]:
+    """Yield (chunk id, text, course title, lesson number) with Zipf-distributed words"""
+    rng = np.random.default_rng(seed)
+    words = [f"term{i}" for i in range(vocabulary)]
+    for start in range(0, count, 10000):
+        size = min(10000, count - start)
+        ranks = np.minimum(rng.zipf(1.2, size=(size, words_per_chunk)), vocabulary) - 1
+        for offset, row in enumerate(ranks):
+            i = start + offset
+            yield (f"chunk_{i}", " ".join(words[r] for r in row),
+                   f"Course {i % courses}", (i // courses) % lessons)
+
+
+def random_queries(count: int, vocabulary: int, seed: int) -> List[str]:
+    """Two to five words per query, drawn uniformly from the first 5000 ranks (mixes common and rare)"""
+    rng = np.random.default_rng(seed + 1)
+    return [" ".join(f"term{r}" for r in rng.integers(0, min(vocabulary, 5000), size=rng.integers(2, 6)))
+            for _ in range(count)]
+
+
+def time_searches(index: LexicalIndex, queries: List[str], **filters) -> Dict[str, float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, 20, **filters)
+        latencies.append(time.perf_counter() - start)
+    return summarize_latencies(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=200_000)
+    parser.add_argument("--words", type=int, default=120, help="Words per chunk (~800 characters)")
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--lessons", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=256, help="Chunks per add_many call, as during ingestion")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"chunks": args.chunks, "vocabulary": args.vocabulary, "words_per_chunk": args.words}
+    with tempfile.TemporaryDirectory() as workdir:
+        index = LexicalIndex(os.path.join(workdir, "lexical_index.pkl"))
+
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        batch = []
+        for chunk in synthetic_chunks(args.chunks, args.vocabulary, args.words,
+                                      args.courses, args.lessons, args.seed):
+            batch.append(chunk)
+            if len(batch) == args.batch:
+                index.add_many(batch)
+                batch = []
+        index.add_many(batch)
+        build_seconds = time.perf_counter() - start
+        rss_after = current_rss_mb()
+        report["build"] = {
+            "seconds": round(build_seconds, 2),
+            "chunks_per_sec": round(args.chunks / build_seconds, 1),
+            "rss_growth_mb": round(rss_after - rss_before, 1) if rss_after is not None else None,
+            "terms": len(index._postings),
+        }
+
+        queries = random_queries(args.queries, args.vocabulary, args.seed)
+        report["search"] = time_searches(index, queries)
+        report["search_course"] = time_searches(index, queries, course_title="Course 7")
+        report["search_course_lesson"] = time_searches(index, queries, course_title="Course 7", lesson_number=3)
+
+        start = time.perf_counter()
+        index.save()
+        save_seconds = time.perf_counter() - start
+        loaded = LexicalIndex(index.path)
+        start = time.perf_counter()
+        loaded.load()
+        report["persistence"] = {
+            "save_seconds": round(save_seconds, 2),
+            "load_seconds": round(time.perf_counter() - start, 2),
+            "file_mb": round(os.path.getsize(index.path) / 1e6, 1),
+        }
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
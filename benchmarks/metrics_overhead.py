@@ -0,0 +1,112 @@
+"""
+Cost of the Prometheus instrumentation on the query path.
+
+Counts the histogram observations and counter increments one `RAGSystem.query`
+makes, read back from the metrics registry, and times one of each in
+isolation. Their product is compared with the whole query's time against a
+zero-latency fake client, both when the tool result is cached (the leanest
+path, so the worst case for relative overhead) and when every query runs a
+fresh search. Also reports how long a /metrics scrape takes to render.
+
+    uv run python -m benchmarks.metrics_overhead --iterations 2000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from prometheus_client import REGISTRY, generate_latest
+
+from benchmarks import DOCS_DIR, isolated_config
+from benchmarks.fake_anthropic import FakeAsyncAnthropic
+from metrics import FORMAT, TOOL_CALLS, RAGSystemCollector
+from rag_system import RAGSystem
+
+QUERY = "What is covered in lesson 1 of the MCP course?"
+HOT_PATH_METRICS = ("rag_query_seconds", "rag_stage_seconds", "rag_claude_request_seconds")
+
+
+def metric_operations() -> float:
+    """Observations and increments recorded so far by the hot-path metrics"""
+    total = 0.0
+    for family in REGISTRY.collect():
+        for sample in family.samples:
+            if family.name in HOT_PATH_METRICS and sample.name.endswith("_count"):
+                total += sample.value
+            elif family.name == "rag_tool_calls" and sample.name.endswith("_total"):
+                total += sample.value
+    return total
+
+
+def per_call_seconds(fn: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def time_timer() -> None:
+    with FORMAT.time():
+        pass
+
+
+def run_queries(rag: RAGSystem, queries: List[str]) -> List[float]:
+    async def run() -> List[float]:
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            await rag.query(query)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    return asyncio.run(run())
+
+
+def measure(rag: RAGSystem, queries: List[str], operation_seconds: float) -> Dict[str, Any]:
+    before = metric_operations()
+    latencies = run_queries(rag, queries)
+    operations = (metric_operations() - before) / len(queries)
+    mean = statistics.fmean(latencies)
+    overhead = operations * operation_seconds
+    return {
+        "query_mean_us": round(mean * 1e6, 1),
+        "metric_operations_per_query": round(operations, 2),
+        "instrumentation_us_per_query": round(overhead * 1e6, 2),
+        "overhead_percent": round(overhead / mean * 100, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    # A histogram timer is the costlier of the two operations, so it prices every one
+    operation_seconds = max(per_call_seconds(time_timer, 200000),
+                            per_call_seconds(lambda: TOOL_CALLS.labels("search_course_content").inc(), 200000))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_config = isolated_config(workdir)
+        rag = RAGSystem(bench_config)
+        REGISTRY.register(RAGSystemCollector(rag))
+        rag.add_course_folder(str(DOCS_DIR))
+        rag.ai_generator.client = FakeAsyncAnthropic(latency=0)
+        run_queries(rag, [QUERY])  # Warm the tool-result and embedding caches
+
+        report: Dict[str, Any] = {
+            "metric_operation_us": round(operation_seconds * 1e6, 3),
+            "cached_tool_results": measure(rag, [QUERY] * args.iterations, operation_seconds),
+            "fresh_search": measure(rag, [f"{QUERY} ({i})" for i in range(args.iterations)], operation_seconds),
+        }
+        scrape = per_call_seconds(generate_latest, 200)
+        report["scrape_ms"] = round(scrape * 1000, 3)
+        rag.search_executor.shutdown()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
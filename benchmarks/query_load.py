@@ -0,0 +1,93 @@
+"""
+Load benchmark for `RAGSystem.query` against a stubbed Anthropic client.
+
+Compares a "blocking" client, which stalls the event loop for each Claude
+call the way the synchronous SDK did, with the async path and with the
+streaming path (which also reports time-to-first-token). Retrieval uses the
+real VectorStore over the bundled docs.
+
+    uv run python -m benchmarks.query_load --requests 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks import DOCS_DIR, isolated_config
+from benchmarks.fake_anthropic import FakeAsyncAnthropic
+from benchmarks.timing import percentile
+from rag_system import RAGSystem
+
+QUERIES = [
+    "What is covered in lesson 1 of the MCP course?",
+    "How does prompt caching work?",
+    "Explain cross-encoder re-ranking",
+    "What tools does computer use rely on?",
+    "How do MCP clients talk to servers?",
+]
+
+
+async def run_load(rag: RAGSystem, total: int, concurrency: int,
+                   stream: bool = False) -> Dict[str, float]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    first_token: List[float] = []
+
+    async def one(i: int):
+        async with gate:
+            start = time.perf_counter()
+            if stream:
+                ttft = None
+                async for event, _ in rag.query_stream(QUERIES[i % len(QUERIES)]):
+                    if event == "token" and ttft is None:
+                        ttft = time.perf_counter() - start
+                first_token.append(ttft)
+            else:
+                await rag.query(QUERIES[i % len(QUERIES)])
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "requests": total,
+        "concurrency": concurrency,
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "requests_per_sec": round(total / elapsed, 1),
+    }
+    if stream:
+        report["ttft_p50_ms"] = round(statistics.median(first_token) * 1000, 1)
+        report["ttft_p99_ms"] = round(percentile(first_token, 99) * 1000, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stubbed seconds per Claude call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_config = isolated_config(workdir)
+        report = {}
+        for mode in ("blocking", "async", "stream"):
+            rag = RAGSystem(bench_config)
+            rag.add_course_folder(str(DOCS_DIR))
+            rag.ai_generator.client = FakeAsyncAnthropic(
+                latency=args.latency, blocking=(mode == "blocking")
+            )
+            report[mode] = asyncio.run(
+                run_load(rag, args.requests, args.concurrency, stream=(mode == "stream"))
+            )
+            rag.search_executor.shutdown()
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-request Python overhead of the query path, excluding the network.
+
+Times building tool definitions and request parameters on their own, then
+whole `RAGSystem.query` calls against a zero-latency fake client once the
+search tool results are cached, and once more when the answer itself is
+served from the answer cache. What remains is the fixed CPU cost we pay on
+every query.
+
+    uv run python -m benchmarks.request_overhead --iterations 5000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks import DOCS_DIR, isolated_config
+from benchmarks.fake_anthropic import FakeAsyncAnthropic
+from benchmarks.timing import percentile
+from answer_cache import AnswerCache
+from config import config
+from rag_system import RAGSystem
+
+QUERY = "What is covered in lesson 1 of the MCP course?"
+HISTORY = [
+    {"role": "user", "content": "What is MCP?"},
+    {"role": "assistant", "content": "A protocol for giving models tools and context."},
+]
+
+
+def summarize_micros(seconds: List[float]) -> Dict[str, float]:
+    """p50/p99/mean in microseconds, the scale these costs live at"""
+    return {
+        "p50_us": round(statistics.median(seconds) * 1e6, 2),
+        "p99_us": round(percentile(seconds, 99) * 1e6, 2),
+        "mean_us": round(statistics.fmean(seconds) * 1e6, 2),
+    }
+
+
+def time_sync(fn: Callable[[], Any], iterations: int) -> List[float]:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def time_queries(rag: RAGSystem, iterations: int) -> List[float]:
+    async def run() -> List[float]:
+        await rag.query(QUERY)  # Warm the tool-result and embedding caches
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await rag.query(QUERY)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_config = isolated_config(workdir)
+        rag = RAGSystem(bench_config)
+        rag.add_course_folder(str(DOCS_DIR))
+        rag.ai_generator.client = FakeAsyncAnthropic(latency=0)
+
+        tools = rag.tool_manager.get_tool_definitions()
+        report: Dict[str, Any] = {
+            "tool_definitions": summarize_micros(
+                time_sync(rag.tool_manager.get_tool_definitions, args.iterations)),
+            "build_params": summarize_micros(
+                time_sync(lambda: rag.ai_generator._build_params(QUERY, HISTORY, tools), args.iterations)),
+            "query_cached_tool_results": summarize_micros(time_queries(rag, args.iterations)),
+        }
+
+        rag.answer_cache = AnswerCache(config.ANSWER_CACHE_SIZE)
+        report["query_cached_answer"] = summarize_micros(time_queries(rag, args.iterations))
+
+        rag.search_executor.shutdown()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Import-time budget check for the API server.
+
+Imports `app` in a fresh interpreter, as uvicorn does before it can accept
+connections, and exits non-zero if that takes longer than --budget seconds.
+The slowest imports from `python -X importtime` are listed so regressions
+are easy to trace. With --warm-up it also times `RAGSystem.warm_up()`, the
+work /readyz waits for (this loads the embedding model).
+
+    uv run python -m benchmarks.startup_time --budget 2.0
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from benchmarks import BACKEND_DIR
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app
+report = {"import_seconds": round(time.perf_counter() - start, 3)}
+if %(warm_up)r:
+    start = time.perf_counter()
+    report["warm_up"] = app.rag_system.warm_up()
+    report["warm_up_seconds"] = round(time.perf_counter() - start, 3)
+print(json.dumps(report))
+"""
+
+
+def slowest_imports(importtime_log: str, count: int, max_depth: int = 2) -> List[Dict[str, Any]]:
+    """Modules with the largest cumulative import time, down to max_depth levels below the top"""
+    entries = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if 0 < depth <= max_depth:
+            entries.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+    entries.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return entries[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget", type=float, default=2.0, help="Seconds allowed for `import app`")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--warm-up", action="store_true", help="Also time RAGSystem.warm_up()")
+    args = parser.parse_args()
+
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD % {"warm_up": args.warm_up}],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if child.returncode != 0:
+        print(child.stderr, file=sys.stderr)
+        sys.exit(child.returncode)
+
+    report = json.loads(child.stdout.strip().splitlines()[-1])
+    report["budget_seconds"] = args.budget
+    report["within_budget"] = report["import_seconds"] <= args.budget
+    report["slowest_imports"] = slowest_imports(child.stderr, args.top)
+    print(json.dumps(report, indent=2))
+    if not report["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
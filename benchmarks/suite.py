@@ -0,0 +1,169 @@
+"""
+Retrieval hot-path benchmark suite.
+
+Generates a synthetic corpus, ingests it into a fresh store and measures
+`DocumentProcessor.chunk_text`, `add_course_folder`, `VectorStore.search`,
+`CourseSearchTool.execute` (optionally with cross-encoder re-ranking) and
+`RAGSystem.query` (against a replaying fake Anthropic client), plus
+recall@k on the corpus's labelled queries and peak RSS. Results are
+printed (or written) as JSON so runs can be compared across commits.
+
+    uv run python -m benchmarks.suite --courses 20 --lessons 8 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks import REPO_ROOT, isolated_config
+from benchmarks.corpus import LabelledQuery, write_corpus
+from benchmarks.fake_anthropic import FakeAsyncAnthropic
+from benchmarks.timing import peak_rss_mb, summarize_latencies
+from config import config
+from rag_system import RAGSystem
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def time_calls(fn: Callable[[Any], Any], inputs: List[Any]) -> List[float]:
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_chunking(rag: RAGSystem, corpus_dir: str) -> Dict[str, Any]:
+    paths = sorted(Path(corpus_dir).glob("*.txt"))
+    total_bytes = sum(path.stat().st_size for path in paths)
+    start = time.perf_counter()
+    chunks = 0
+    for path in paths:
+        _, course_chunks = rag.document_processor.stream_course_document(str(path))
+        chunks += sum(1 for _ in course_chunks)
+    elapsed = time.perf_counter() - start
+    return {
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "chunks_per_sec": round(chunks / elapsed, 1),
+        "mb_per_sec": round(total_bytes / elapsed / 1e6, 2),
+    }
+
+
+def bench_ingest(rag: RAGSystem, corpus_dir: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    courses, chunks = rag.add_course_folder(corpus_dir)
+    elapsed = time.perf_counter() - start
+    return {
+        "courses": courses,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "chunks_per_sec": round(chunks / elapsed, 1) if elapsed else None,
+    }
+
+
+def recall_at_k(rag: RAGSystem, queries: List[LabelledQuery], k: int) -> float:
+    hits = 0
+    for labelled in queries:
+        results = rag.vector_store.search(labelled.query, limit=k)
+        if any(meta.get("course_title") == labelled.course_title
+               and meta.get("lesson_number") == labelled.lesson_number
+               for meta in results.metadata):
+            hits += 1
+    return round(hits / len(queries), 4)
+
+
+def bench_queries(rag: RAGSystem, queries: List[LabelledQuery]) -> Dict[str, Any]:
+    """Time RAGSystem.query with a zero-latency fake client, so only our own work is measured"""
+    by_prompt = {q.query: q for q in queries}
+
+    def tool_input(text: str) -> Dict[str, Any]:
+        labelled = by_prompt.get(text.split(": ", 1)[-1])
+        if labelled is None:
+            return {"query": text}
+        return {"query": labelled.query, "course_name": labelled.course_title}
+
+    rag.ai_generator.client = FakeAsyncAnthropic(latency=0, tool_input=tool_input)
+
+    async def run() -> List[float]:
+        latencies = []
+        for labelled in queries:
+            start = time.perf_counter()
+            await rag.query(labelled.query)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    return summarize_latencies(asyncio.run(run()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--courses", type=int, default=10)
+    parser.add_argument("--lessons", type=int, default=8)
+    parser.add_argument("--sentences", type=int, default=60, help="Filler sentences per lesson")
+    parser.add_argument("--queries", type=int, default=200, help="Labelled queries to time")
+    parser.add_argument("--k", type=int, default=config.MAX_RESULTS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rerank", action="store_true", help="Re-rank search tool results with the cross-encoder")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_dir = os.path.join(workdir, "corpus")
+        labelled = write_corpus(corpus_dir, args.courses, args.lessons, args.sentences, args.seed)
+        queries = labelled[:args.queries]
+
+        bench_config = isolated_config(workdir, RERANK=args.rerank)
+        rag = RAGSystem(bench_config)
+        if rag.reranker:
+            rag.reranker.load(background=False)
+
+        report = {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "corpus": {"courses": args.courses, "lessons": args.lessons,
+                       "sentences": args.sentences, "seed": args.seed},
+            "chunking": bench_chunking(rag, corpus_dir),
+            "ingest": bench_ingest(rag, corpus_dir),
+        }
+
+        store = rag.vector_store
+        report["vector_search"] = summarize_latencies(
+            time_calls(lambda q: store.search(q.query), queries))
+        report["vector_search_filtered"] = summarize_latencies(
+            time_calls(lambda q: store.search(q.query, course_name=q.course_title,
+                                              lesson_number=q.lesson_number), queries))
+        report["search_tool"] = summarize_latencies(
+            time_calls(lambda q: rag.search_tool.execute(q.query, course_name=q.course_title), queries))
+        report["rag_query"] = bench_queries(rag, queries)
+        report[f"recall_at_{args.k}"] = recall_at_k(rag, queries, args.k)
+        if rag.reranker:
+            report["reranker"] = rag.reranker.stats()
+        report["peak_rss_mb"] = peak_rss_mb()
+
+        rag.search_executor.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Latency and memory measurements shared by the benchmarks"""
+import os
+import platform
+import resource
+import statistics
+from typing import Dict, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize_latencies(seconds: List[float]) -> Dict[str, float]:
+    """p50/p90/p99/mean in milliseconds"""
+    return {
+        "count": len(seconds),
+        "p50_ms": round(statistics.median(seconds) * 1000, 3),
+        "p90_ms": round(percentile(seconds, 90) * 1000, 3),
+        "p99_ms": round(percentile(seconds, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(seconds) * 1000, 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size from /proc (None where that is unavailable)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / 1e6, 1)
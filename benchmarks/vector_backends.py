@@ -0,0 +1,143 @@
+"""
+Chroma vs NumPy vector backend comparison.
+
+Stores synthetic clustered embeddings (one cluster per course lesson) in
+each backend through the storage hooks, skipping the embedding model, then
+times unfiltered, course-filtered and course+lesson-filtered top-k queries
+and reports recall against exact search plus RSS. Each backend runs in its
+own subprocess so memory numbers do not mix.
+
+    uv run python -m benchmarks.vector_backends --chunks 50000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks import REPO_ROOT, isolated_config
+from benchmarks.timing import current_rss_mb, peak_rss_mb, summarize_latencies
+from config import config
+from rag_system import RAGSystem
+
+BACKENDS = ("chroma", "numpy")
+
+
+def synthetic_embeddings(chunks: int, dim: int, courses: int, lessons: int, seed: int):
+    """Unit vectors scattered around one random center per (course, lesson)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((courses * lessons, dim)).astype(np.float32)
+    clusters = rng.integers(0, courses * lessons, size=chunks)
+    vectors = centers[clusters] + 0.8 * rng.standard_normal((chunks, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors, clusters // lessons, clusters % lessons
+
+
+def time_queries(run: Callable[[int], List[str]], count: int) -> List[float]:
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        run(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_backend(backend: str, args) -> Dict[str, Any]:
+    vectors, courses, lessons = synthetic_embeddings(args.chunks, args.dim, args.courses, args.lessons, args.seed)
+    titles = [f"Course {c}" for c in range(args.courses)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_config = isolated_config(
+            workdir,
+            VECTOR_BACKEND=backend,
+            NUMPY_STORE_DTYPE=args.dtype,
+            HYBRID_SEARCH=False,  # Compare the vector engines alone
+        )
+        store = RAGSystem._create_vector_store(bench_config)
+        baseline_rss = current_rss_mb()
+
+        start = time.perf_counter()
+        batch = store.embedding_batch_size
+        for offset in range(0, args.chunks, batch):
+            rows = range(offset, min(offset + batch, args.chunks))
+            store._store_chunks(
+                ids=[f"chunk_{row}" for row in rows],
+                documents=[f"synthetic chunk {row}" for row in rows],
+                embeddings=vectors[offset:offset + len(rows)],
+                metadatas=[{
+                    "course_title": titles[courses[row]],
+                    "lesson_number": int(lessons[row]),
+                    "chunk_index": row,
+                    "content_hash": "",
+                } for row in rows],
+                upsert=False
+            )
+        store.flush()
+        insert_seconds = time.perf_counter() - start
+
+        rng = np.random.default_rng(args.seed + 1)
+        picks = rng.integers(0, args.chunks, size=args.queries)
+        queries = vectors[picks] + 0.3 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        def query(i: int, course: Optional[str] = None, lesson: Optional[int] = None) -> List[str]:
+            hits = store._query_content(queries[i], args.k, course, lesson)
+            return [chunk_id for chunk_id, _, _, _ in hits]
+
+        store._query_content(queries[0], args.k, None, None)  # Warm up (loads HNSW / maps pages)
+        report = {
+            "insert": {
+                "seconds": round(insert_seconds, 2),
+                "chunks_per_sec": round(args.chunks / insert_seconds, 1),
+            },
+            "query": summarize_latencies(time_queries(query, args.queries)),
+            "query_course": summarize_latencies(time_queries(
+                lambda i: query(i, titles[courses[picks[i]]]), args.queries)),
+            "query_course_lesson": summarize_latencies(time_queries(
+                lambda i: query(i, titles[courses[picks[i]]], int(lessons[picks[i]])), args.queries)),
+        }
+
+        # Recall of the unfiltered top-k against exact search
+        exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+        found = sum(len({f"chunk_{row}" for row in exact[i]} & set(query(i))) for i in range(args.queries))
+        report[f"recall_at_{args.k}"] = round(found / (args.queries * args.k), 4)
+
+        rss = current_rss_mb()
+        report["rss_growth_mb"] = round(rss - baseline_rss, 1) if rss is not None else None
+        report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384, help="Embedding size (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--lessons", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=config.MAX_RESULTS)
+    parser.add_argument("--dtype", default=config.NUMPY_STORE_DTYPE, help="NumPy backend storage precision")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=BACKENDS, help="Run one backend in this process")
+    args = parser.parse_args()
+
+    if args.backend:
+        print(json.dumps(bench_backend(args.backend, args)))
+        return
+
+    report: Dict[str, Any] = {"chunks": args.chunks, "dim": args.dim, "dtype": args.dtype}
+    for backend in BACKENDS:
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.vector_backends", *sys.argv[1:], "--backend", backend],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        report[backend] = json.loads(child.stdout.strip().splitlines()[-1])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -65,7 +65,7 @@ async function sendMessage() {
     chatMessages.scrollTop = chatMessages.scrollHeight;
 
     try {
-        const response = await fetch(`${API_URL}/query`, {
+        const response = await fetch(`${API_URL}/query/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -76,18 +76,39 @@ async function sendMessage() {
             })
         });
 
-        if (!response.ok) throw new Error('Query failed');
+        if (!response.ok || !response.body) throw new Error('Query failed');
 
-        const data = await response.json();
-        
-        // Update session ID if new
-        if (!currentSessionId) {
-            currentSessionId = data.session_id;
-        }
+        let answer = '';
+        let assistantMessage = null;
 
-        // Replace loading message with response
-        loadingMessage.remove();
-        addMessage(data.answer, 'assistant', data.sources);
+        await readEventStream(response, (event, data) => {
+            if (event === 'session') {
+                // Update session ID if new
+                if (!currentSessionId) {
+                    currentSessionId = data.session_id;
+                }
+            } else if (event === 'token') {
+                // Replace loading message with the answer as soon as the first token arrives
+                if (!assistantMessage) {
+                    loadingMessage.remove();
+                    assistantMessage = createMessageElement('assistant');
+                }
+                answer += data.text;
+                renderMessageContent(assistantMessage.content, answer, 'assistant');
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            } else if (event === 'sources') {
+                if (assistantMessage) {
+                    appendSources(assistantMessage.element, data.sources);
+                }
+            } else if (event === 'error') {
+                throw new Error(data.detail || 'Query failed');
+            }
+        });
+
+        if (!assistantMessage) {
+            loadingMessage.remove();
+            addMessage(answer, 'assistant');
+        }
 
     } catch (error) {
         // Replace loading message with error
@@ -100,6 +121,36 @@ async function sendMessage() {
     }
 }
 
+// Read a text/event-stream response body and dispatch each parsed event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            frame.split('\n').forEach((line) => {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    data += line.slice(5).trim();
+                }
+            });
+            onEvent(event, data ? JSON.parse(data) : {});
+        }
+    }
+}
+
 function createLoadingMessage() {
     const messageDiv = document.createElement('div');
     messageDiv.className = 'message assistant';
@@ -115,7 +166,7 @@ function createLoadingMessage() {
     return messageDiv;
 }
 
-function addMessage(content, type, sources = null, isWelcome = false) {
+function createMessageElement(type, isWelcome = false) {
     const messageId = Date.now();
     const messageDiv = document.createElement('div');
     messageDiv.className = `message ${type}${isWelcome ? ' welcome-message' : ''}`;
@@ -123,7 +174,15 @@ function addMessage(content, type, sources = null, isWelcome = false) {
     
     const messageContent = document.createElement('div');
     messageContent.className = 'message-content';
+    messageDiv.appendChild(messageContent);
+    
+    chatMessages.appendChild(messageDiv);
+    chatMessages.scrollTop = chatMessages.scrollHeight;
     
+    return { id: messageId, element: messageDiv, content: messageContent };
+}
+
+function renderMessageContent(messageContent, content, type) {
     if (type === 'assistant') {
         const hasMarked = typeof window !== 'undefined' && window.marked && typeof window.marked.parse === 'function';
         const rendered = hasMarked ? window.marked.parse(content) : escapeHtml(content);
@@ -131,51 +190,56 @@ function addMessage(content, type, sources = null, isWelcome = false) {
     } else {
         messageContent.textContent = content;
     }
+}
+
+function appendSources(messageDiv, sources) {
+    if (!sources || sources.length === 0) return;
     
-    messageDiv.appendChild(messageContent);
+    const details = document.createElement('details');
+    details.className = 'sources-collapsible';
     
-    if (sources && sources.length > 0) {
-        const details = document.createElement('details');
-        details.className = 'sources-collapsible';
-        
-        const summary = document.createElement('summary');
-        summary.className = 'sources-header';
-        summary.textContent = 'Sources';
+    const summary = document.createElement('summary');
+    summary.className = 'sources-header';
+    summary.textContent = 'Sources';
+    
+    const sourcesContainer = document.createElement('div');
+    sourcesContainer.className = 'sources-content';
+    
+    sources.forEach((source) => {
+        const sourceLabel = typeof source === 'object' && source !== null
+            ? (source.label || '')
+            : source;
+        const displayLabel = sourceLabel || 'Source';
         
-        const sourcesContainer = document.createElement('div');
-        sourcesContainer.className = 'sources-content';
+        const sourceLine = document.createElement('div');
         
-        sources.forEach((source) => {
-            const sourceLabel = typeof source === 'object' && source !== null
-                ? (source.label || '')
-                : source;
-            const displayLabel = sourceLabel || 'Source';
-            
-            const sourceLine = document.createElement('div');
-            
-            if (typeof source === 'object' && source !== null && source.url) {
-                const link = document.createElement('a');
-                link.href = source.url;
-                link.target = '_blank';
-                link.rel = 'noopener noreferrer';
-                link.textContent = displayLabel;
-                sourceLine.appendChild(link);
-            } else {
-                sourceLine.textContent = displayLabel;
-            }
-            
-            sourcesContainer.appendChild(sourceLine);
-        });
+        if (typeof source === 'object' && source !== null && source.url) {
+            const link = document.createElement('a');
+            link.href = source.url;
+            link.target = '_blank';
+            link.rel = 'noopener noreferrer';
+            link.textContent = displayLabel;
+            sourceLine.appendChild(link);
+        } else {
+            sourceLine.textContent = displayLabel;
+        }
         
-        details.appendChild(summary);
-        details.appendChild(sourcesContainer);
-        messageDiv.appendChild(details);
-    }
+        sourcesContainer.appendChild(sourceLine);
+    });
     
-    chatMessages.appendChild(messageDiv);
+    details.appendChild(summary);
+    details.appendChild(sourcesContainer);
+    messageDiv.appendChild(details);
+    chatMessages.scrollTop = chatMessages.scrollHeight;
+}
+
+function addMessage(content, type, sources = null, isWelcome = false) {
+    const message = createMessageElement(type, isWelcome);
+    renderMessageContent(message.content, content, type);
+    appendSources(message.element, sources);
     chatMessages.scrollTop = chatMessages.scrollHeight;
     
-    return messageId;
+    return message.id;
 }
 
 // Helper function to escape HTML for user messages
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from ai_generator import AIGenerator
+from benchmarks.fake_anthropic import FakeAsyncAnthropic
+from search_tools import Tool, ToolManager, ToolResult
+
+
+class StubSearchTool(Tool):
+    def get_tool_definition(self):
+        return {
+            "name": "search_course_content",
+            "description": "Search course materials",
+            "input_schema": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]},
+        }
+
+    def execute(self, query):
+        return ToolResult(f"Results for {query}", [{"label": "Course - Lesson 1"}])
+
+
+def make_generator(**client_options):
+    generator = AIGenerator(api_key="test", model="test-model")
+    generator.client = FakeAsyncAnthropic(latency=0, **client_options)
+    tool_manager = ToolManager()
+    tool_manager.register_tool(StubSearchTool())
+    return generator, tool_manager
+
+
+async def both_answers(generator, tool_manager, query):
+    tools = tool_manager.get_tool_definitions()
+    answer, sources = await generator.generate_response(query, tools=tools, tool_manager=tool_manager)
+    tokens, streamed_sources = [], []
+    async for event, payload in generator.stream_response(query, tools=tools, tool_manager=tool_manager):
+        if event == "token":
+            tokens.append(payload)
+        else:
+            streamed_sources = payload
+    return (answer, sources), ("".join(tokens), streamed_sources)
+
+
+@pytest.mark.parametrize("preamble", ["", "I'll search the course materials for that."])
+def test_stream_and_blocking_answers_match_after_a_search(preamble):
+    generator, tool_manager = make_generator(answer="MCP servers expose tools to clients.", preamble=preamble)
+    (answer, sources), (streamed, streamed_sources) = asyncio.run(
+        both_answers(generator, tool_manager, "What does an MCP server expose?"))
+
+    assert answer == "MCP servers expose tools to clients."
+    assert streamed == answer
+    assert streamed_sources == sources == [{"label": "Course - Lesson 1"}]
+
+
+def test_direct_answer_is_streamed_in_full():
+    generator, _ = make_generator(answer="Python is a programming language.")
+
+    async def stream():
+        # No tools offered, so the fake answers directly
+        return [payload async for event, payload in generator.stream_response("What is Python?")
+                if event == "token"]
+
+    assert "".join(asyncio.run(stream())) == "Python is a programming language."
@@ -0,0 +1,66 @@
+"""
+Golden tests for the document parser and chunker.
+
+chunk_baseline.json was recorded with the parser that read each document
+whole and re-scanned sentences per chunk, before parsing was streamed. Every
+course and chunk must still come out the same; update the baseline only when
+chunking is meant to change. Keys are "<path>@<chunk size>/<overlap>", and
+chunks are recorded as [lesson number, chunk index, sha1 of the content].
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from document_processor import DocumentProcessor
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+BASELINE = json.loads((FIXTURES / "chunk_baseline.json").read_text())
+
+
+def parse(key: str):
+    path, settings = key.split("@")
+    chunk_size, chunk_overlap = (int(value) for value in settings.split("/"))
+    return DocumentProcessor(chunk_size, chunk_overlap).process_course_document(str(REPO_ROOT / path))
+
+
+@pytest.mark.parametrize("key", sorted(BASELINE))
+def test_output_matches_baseline(key):
+    course, chunks = parse(key)
+    expected = BASELINE[key]
+
+    lessons = [[lesson.lesson_number, lesson.title, lesson.lesson_link] for lesson in course.lessons]
+    assert [course.title, course.course_link, course.instructor, lessons] == expected["course"]
+    assert all(chunk.course_title == course.title for chunk in chunks)
+    assert [[chunk.lesson_number, chunk.chunk_index, hashlib.sha1(chunk.content.encode()).hexdigest()[:16]]
+            for chunk in chunks] == expected["chunks"]
+
+
+def test_baseline_covers_every_bundled_script_and_fixture():
+    paths = {key.split("@")[0] for key in BASELINE}
+    documents = sorted(REPO_ROOT.glob("docs/*.txt")) + sorted((FIXTURES / "documents").glob("*.txt"))
+    assert {str(path.relative_to(REPO_ROOT)) for path in documents} <= paths
+
+
+def test_abandoned_stream_leaves_no_file_open(monkeypatch):
+    opened = []
+    open_document = DocumentProcessor._open_document
+
+    def tracking_open(file_path):
+        file = open_document(file_path)
+        opened.append(file)
+        return file
+
+    monkeypatch.setattr(DocumentProcessor, "_open_document", staticmethod(tracking_open))
+    processor = DocumentProcessor(800, 100)
+    path = str(REPO_ROOT / "docs" / "course1_script.txt")
+
+    course, chunks = processor.stream_course_document(path)  # Never iterated
+    assert course.title and all(file.closed for file in opened)
+
+    course, chunks = processor.stream_course_document(path)
+    next(chunks)
+    chunks.close()  # Abandoned part-way through
+    assert len(opened) == 3 and all(file.closed for file in opened)
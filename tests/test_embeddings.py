@@ -0,0 +1,74 @@
+import threading
+
+import numpy as np
+import pytest
+
+from embeddings import EmbeddingBackend, MicroBatchingEmbedder
+
+
+class FakeBackend(EmbeddingBackend):
+    """Encodes each text as a vector of its length; raises what `fail` returns for a text, if anything"""
+
+    def __init__(self, fail=lambda text: None):
+        self.fail = fail
+
+    def encode(self, texts):
+        for text in texts:
+            error = self.fail(text)
+            if error is not None:
+                raise error
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def encode_concurrently(embedder, texts):
+    """Encode each text from its own thread; returns text -> vector or raised exception"""
+    results = {}
+
+    def call(text):
+        try:
+            results[text] = embedder.encode([text])[0]
+        except BaseException as e:
+            results[text] = e
+
+    threads = [threading.Thread(target=call, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads), "encode calls hung"
+    return results
+
+
+def test_bad_text_fails_only_its_caller():
+    embedder = MicroBatchingEmbedder(FakeBackend(lambda text: ValueError(text) if text == "bad" else None),
+                                     max_batch_size=8, max_wait=0.05)
+    results = encode_concurrently(embedder, ["a", "bb", "bad", "ccc"])
+
+    assert isinstance(results["bad"], ValueError)
+    for text in ("a", "bb", "ccc"):
+        assert results[text][0] == len(text)
+
+
+@pytest.mark.parametrize("error", [KeyboardInterrupt(), SystemExit(1)])
+def test_batcher_survives_base_exceptions(error):
+    failing = {"boom"}
+    embedder = MicroBatchingEmbedder(FakeBackend(lambda text: error if text in failing else None))
+
+    with pytest.raises(type(error)):
+        embedder.encode(["boom"])
+
+    failing.clear()
+    assert encode_concurrently(embedder, ["after"])["after"][0] == len("after")
+
+
+def test_batcher_survives_a_row_count_mismatch():
+    class ShortBackend(FakeBackend):
+        def encode(self, texts):
+            return super().encode(texts)[:-1]
+
+    embedder = MicroBatchingEmbedder(ShortBackend())
+    with pytest.raises(RuntimeError):
+        embedder.encode(["first"])
+
+    embedder.embedder = FakeBackend()
+    assert embedder.encode(["second"])[0][0] == len("second")
@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Loaded only when the vector store opens or a model is warmed up, never by `import app`
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "chromadb", "onnxruntime")
+
+# Generous, so a slow machine does not fail it; benchmarks.startup_time holds the tighter 2 s budget
+IMPORT_BUDGET_SECONDS = 5.0
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app
+seconds = time.perf_counter() - start
+print(json.dumps({"import_seconds": seconds, "loaded": [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def test_importing_app_loads_no_model_libraries():
+    # A fresh interpreter, run from backend/ as uvicorn is
+    child = subprocess.run([sys.executable, "-c", CHILD], cwd=BACKEND_DIR,
+                           capture_output=True, text=True, timeout=120)
+    assert child.returncode == 0, child.stderr
+    report = json.loads(child.stdout.strip().splitlines()[-1])
+
+    assert report["loaded"] == []
+    assert report["import_seconds"] < IMPORT_BUDGET_SECONDS